@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自适应并发控制 - 按主机的AIMD（加性增、乘性减）并发上限
+- 请求成功且延迟正常：并发上限每轮（约等于当前上限个成功请求）加1
+- 超时、连接错误、HTTP 429/503：并发上限减半（同一个延迟周期内只减一次）
+ContentFetcher 每次请求前占用一个并发槽位，请求结束后按结果调整上限
+"""
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+# 请求结果分类
+SUCCESS = 'success'     # HTTP 200
+OVERLOAD = 'overload'   # 超时、连接错误、429、503（站点过载或限流）
+IGNORE = 'ignore'       # 其他状态码（404等），不影响并发上限
+
+OVERLOAD_STATUS_CODES = (429, 503)
+
+
+def classify_status(status_code: int) -> str:
+    """按HTTP状态码分类请求结果"""
+    if status_code == 200:
+        return SUCCESS
+    if status_code in OVERLOAD_STATUS_CODES:
+        return OVERLOAD
+    return IGNORE
+
+
+class AIMDLimiter:
+    """单个主机的并发上限（线程安全）"""
+
+    def __init__(self, initial: int, min_limit: int = 1, max_limit: int = 20,
+                 latency_tolerance: float = 2.0, decrease_factor: float = 0.5):
+        """
+        :param initial: 初始并发上限
+        :param min_limit: 最小并发上限
+        :param max_limit: 最大并发上限
+        :param latency_tolerance: 延迟超过基准延迟的多少倍时不再增加并发
+        :param decrease_factor: 过载时并发上限的缩减比例
+        """
+        self.cond = threading.Condition()
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self.latency_tolerance = latency_tolerance
+        self.decrease_factor = decrease_factor
+        self.in_flight = 0
+        self.avg_latency: Optional[float] = None   # 成功请求延迟的指数移动平均
+        self.base_latency: Optional[float] = None  # 观察到的最低平均延迟（健康基准）
+        self.last_decrease = 0.0
+
+    @property
+    def current(self) -> int:
+        """当前并发上限"""
+        return int(self.limit)
+
+    def try_acquire(self) -> bool:
+        """尝试占用一个并发槽位（不阻塞）"""
+        with self.cond:
+            if self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return True
+            return False
+
+    def acquire(self):
+        """占用一个并发槽位，达到上限时阻塞等待"""
+        with self.cond:
+            while self.in_flight >= int(self.limit):
+                self.cond.wait()
+            self.in_flight += 1
+
+    def release(self, outcome: str, latency: Optional[float] = None):
+        """
+        释放并发槽位并按请求结果调整上限
+        :param outcome: SUCCESS | OVERLOAD | IGNORE
+        :param latency: 请求耗时（秒，仅成功请求需要）
+        """
+        with self.cond:
+            self.in_flight -= 1
+            if outcome == SUCCESS and latency is not None:
+                self._on_success(latency)
+            elif outcome == OVERLOAD:
+                self._on_overload()
+            self.cond.notify_all()
+
+    def _on_success(self, latency: float):
+        if self.avg_latency is None:
+            self.avg_latency = latency
+        else:
+            self.avg_latency = 0.8 * self.avg_latency + 0.2 * latency
+        if self.base_latency is None or self.avg_latency < self.base_latency:
+            self.base_latency = self.avg_latency
+
+        # 延迟正常才增加（每个成功请求加 1/上限，约每轮加1）
+        if latency <= self.base_latency * self.latency_tolerance:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def _on_overload(self):
+        # 同一批并发请求的连续失败只算一次过载
+        now = time.monotonic()
+        if now - self.last_decrease < (self.avg_latency or 0):
+            return
+        self.last_decrease = now
+        self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+
+
+class AdaptiveConcurrency:
+    """按主机维护AIMD并发上限（每个爬虫任务一份）"""
+
+    def __init__(self, initial: int, min_limit: int = 1, max_limit: int = 20,
+                 latency_tolerance: float = 2.0):
+        """
+        :param initial: 每个主机的初始并发上限（通常为用户设置的并发线程数）
+        :param min_limit: 最小并发上限
+        :param max_limit: 最大并发上限（线程池引擎下即下载线程数）
+        :param latency_tolerance: 延迟超过基准延迟的多少倍时不再增加并发
+        """
+        self.initial = initial
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.latency_tolerance = latency_tolerance
+        self.lock = threading.Lock()
+        self.hosts: Dict[str, AIMDLimiter] = {}
+
+    def for_url(self, url: str) -> AIMDLimiter:
+        """获取URL所属主机的并发上限"""
+        host = urlparse(url).netloc
+        with self.lock:
+            limiter = self.hosts.get(host)
+            if limiter is None:
+                limiter = self.hosts[host] = AIMDLimiter(
+                    self.initial, self.min_limit, self.max_limit, self.latency_tolerance
+                )
+            return limiter
+
+    def level(self, url: str) -> int:
+        """获取URL所属主机当前的并发上限（尚未请求过时为初始值）"""
+        host = urlparse(url).netloc
+        with self.lock:
+            limiter = self.hosts.get(host)
+        return limiter.current if limiter else min(max(self.initial, self.min_limit), self.max_limit)
+
+    def levels(self) -> Dict[str, int]:
+        """获取所有主机当前的并发上限"""
+        with self.lock:
+            return {host: limiter.current for host, limiter in self.hosts.items()}
+
+
+def create_adaptive_concurrency(config: Optional[Dict], initial: int) -> Optional[AdaptiveConcurrency]:
+    """
+    根据配置创建自适应并发控制
+    :param config: ConfigManager.get_adaptive_concurrency() 的返回值，None表示未启用
+    :param initial: 初始并发上限
+    """
+    if not config:
+        return None
+    return AdaptiveConcurrency(initial, min_limit=config['min'], max_limit=config['max'],
+                               latency_tolerance=config['latency_tolerance'])
@@ -11,12 +11,13 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 import os
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-from flask_socketio import SocketIO, emit
+from flask_socketio import SocketIO, emit, join_room, leave_room
 from loguru import logger
 from backend.routes.crawler import crawler_bp
 from backend.routes.reader import reader_bp
 from backend.routes.crawler_v5 import crawler_v5_bp
 from backend.routes.auth import auth_bp
+from backend.progress_broadcaster import task_room
 
 # 导入数据库初始化函数
 from scripts.init_reader_tables import init_database_tables
@@ -73,6 +74,12 @@ def _init_db_on_startup():
 # 仅在首次导入时执行数据库初始化（优化启动速度）
 _init_db_on_startup()
 
+# 恢复服务重启前中断的任务，启动定时任务调度器（按数据库中的计划自动创建更新任务）
+from backend.task_manager import task_manager
+from backend.routes.crawler import build_scheduled_crawler_factory
+task_manager.resume_interrupted_tasks(build_scheduled_crawler_factory)
+task_manager.start_scheduler(build_scheduled_crawler_factory)
+
 
 # WebSocket 事件
 @socketio.on('connect')
@@ -88,11 +95,21 @@ def handle_disconnect():
 
 @socketio.on('subscribe_task')
 def handle_subscribe_task(data):
-    """订阅任务更新"""
+    """订阅任务更新（加入任务房间，之后只收到已订阅任务的进度和日志）"""
     task_id = data.get('task_id')
-    logger.info(f"📡 客户端订阅任务: {task_id} (SID: {request.sid})")
+    if not task_id:
+        return
+    join_room(task_room(task_id))
+    logger.debug(f"📡 客户端订阅任务: {task_id} (SID: {request.sid})")
     emit('subscribed', {'task_id': task_id})
 
+@socketio.on('unsubscribe_task')
+def handle_unsubscribe_task(data):
+    """取消订阅任务更新"""
+    task_id = data.get('task_id')
+    if task_id:
+        leave_room(task_room(task_id))
+
 
 @app.route('/', methods=['GET'])
 def index():
@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+asyncio下载引擎 - 线程池之外的可选下载引擎
+单个事件循环上用协程并发抓取（aiohttp，keep-alive连接池），
+HTML解码/解析、数据库和Redis等阻塞操作放到线程池执行，
+章节/文章的跳过判断、解析和保存逻辑与线程池引擎共用爬虫上的同一套方法
+
+启用方式（配置文件 crawler_config）:
+    "engine": "asyncio",
+    "async_concurrency": 100
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+import aiohttp
+from loguru import logger
+
+from backend.adaptive_concurrency import AdaptiveConcurrency, OVERLOAD, IGNORE, classify_status
+from backend.circuit_breaker import HostCircuitBreakers
+from backend.content_fetcher import DEFAULT_HEADERS, ConnectionStats, decode_content
+from backend.rate_limiter import RateLimiter
+from backend.retry_policy import RetryPolicy, RetryBudget, is_retryable_status
+
+# 等待自适应并发槽位的轮询间隔（秒）
+SLOT_POLL_INTERVAL = 0.01
+# 熔断器打开时检查恢复的间隔（秒）
+CIRCUIT_POLL_INTERVAL = 0.5
+
+
+class AsyncContentFetcher:
+    """基于aiohttp的内容获取器（重试、编码、代理语义与 ContentFetcher 一致）"""
+
+    def __init__(self, headers: Dict = None, timeout: int = 30, encoding: str = None,
+                 proxy_utils=None, concurrency: int = 100, executor: ThreadPoolExecutor = None,
+                 stats: ConnectionStats = None, rate_limiter: Optional[RateLimiter] = None,
+                 adaptive_concurrency: Optional[AdaptiveConcurrency] = None,
+                 retry_policy: Optional[RetryPolicy] = None, retry_budget: Optional[RetryBudget] = None,
+                 stop_flag=None, circuit_breakers: Optional[HostCircuitBreakers] = None):
+        """
+        初始化异步内容获取器（需在事件循环内 open）
+        :param headers: 请求头
+        :param timeout: 超时时间
+        :param encoding: 编码
+        :param proxy_utils: 代理工具
+        :param concurrency: 最大并发连接数
+        :param executor: 解码和获取代理使用的线程池
+        :param stats: 连接统计（与同步获取器共用时进度中的连接数保持连续）
+        :param rate_limiter: 按主机的限速器（与同步获取器共用同一组令牌桶）
+        :param adaptive_concurrency: 按主机的自适应并发上限（与同步获取器共用）
+        :param retry_policy: 重试退避策略
+        :param retry_budget: 任务级重试预算（与同步获取器共用）
+        :param stop_flag: 停止标志（threading.Event）
+        :param circuit_breakers: 按主机的熔断器（进程内共享）
+        """
+        self.headers = headers or DEFAULT_HEADERS
+        self.timeout = timeout
+        self.encoding = encoding
+        self.proxy_utils = proxy_utils
+        self.concurrency = max(1, concurrency)
+        self.executor = executor
+        self.connection_stats = stats or ConnectionStats()
+        self.rate_limiter = rate_limiter
+        self.adaptive_concurrency = adaptive_concurrency
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.retry_budget = retry_budget or RetryBudget()
+        self.stop_flag = stop_flag
+        self.circuit_breakers = circuit_breakers
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def open(self):
+        """创建Session和连接池"""
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_connection_create_end.append(self._on_connection_created)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reused)
+
+        connector = aiohttp.TCPConnector(limit=self.concurrency, ssl=False)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            headers=self.headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            trace_configs=[trace_config]
+        )
+
+    async def close(self):
+        """关闭Session，释放连接池"""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    # ==================== 连接统计 ====================
+
+    async def _on_request_start(self, session, ctx, params):
+        ctx.host = params.url.host
+
+    async def _on_connection_created(self, session, ctx, params):
+        self.connection_stats.record(getattr(ctx, 'host', ''), reused=False)
+
+    async def _on_connection_reused(self, session, ctx, params):
+        self.connection_stats.record(getattr(ctx, 'host', ''), reused=True)
+
+    def get_connection_stats(self) -> Dict[str, int]:
+        """获取连接统计 {'opened': 新建连接数, 'reused': 复用连接数}"""
+        return self.connection_stats.totals()
+
+    # ==================== 请求 ====================
+
+    async def _run_blocking(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def _get_proxy(self, url: str) -> Optional[str]:
+        """获取代理（aiohttp 每个请求只接受一个代理地址）"""
+        proxies = await self._run_blocking(self.proxy_utils.get_proxy)
+        if not proxies:
+            logger.warning(f"⚠️  代理获取失败，使用直连")
+            return None
+        scheme = 'https' if url.startswith('https') else 'http'
+        proxy = proxies.get(scheme) or proxies.get('http')
+        logger.debug(f"🔄 使用代理: {(proxy or 'N/A')[:50]}...")
+        return proxy
+
+    async def get_page(self, url: str, max_retries: int = 20) -> Optional[str]:
+        """
+        获取网页内容（重试退避和重试预算与 ContentFetcher 一致）
+        :param url: 目标URL
+        :param max_retries: 最大尝试次数
+        :return: HTML内容
+        """
+        retry_delay = 0.0
+        for i in range(max_retries):
+            # 首次请求补充重试预算；重试前先申请预算，再退避等待
+            if i == 0:
+                self.retry_budget.record_request()
+            else:
+                if not self.retry_budget.try_spend():
+                    logger.warning(f"⚠️  重试预算已耗尽，放弃重试: {url[:50]}...")
+                    return None
+                await asyncio.sleep(retry_delay)
+                if self.stop_flag is not None and self.stop_flag.is_set():
+                    return None
+
+            # 熔断器打开时等待站点恢复（任务暂停），收到停止信号时放弃
+            breaker = self.circuit_breakers.for_url(url) if self.circuit_breakers else None
+            permit = None
+            if breaker:
+                permit = breaker.try_acquire()
+                while not permit:
+                    if self.stop_flag is not None and self.stop_flag.is_set():
+                        return None
+                    await asyncio.sleep(CIRCUIT_POLL_INTERVAL)
+                    permit = breaker.try_acquire()
+
+            slot = None
+            outcome = IGNORE
+            latency = None
+            host_failed = True
+            cancelled = False
+            try:
+                proxy = await self._get_proxy(url) if self.proxy_utils else None
+
+                # 按主机限速（预约令牌后在事件循环上等待，不占用线程）
+                if self.rate_limiter:
+                    wait = self.rate_limiter.reserve(url)
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+
+                # 按主机的自适应并发上限（槽位由线程锁保护，这里轮询等待以免阻塞事件循环）
+                if self.adaptive_concurrency:
+                    slot = self.adaptive_concurrency.for_url(url)
+                    while not slot.try_acquire():
+                        await asyncio.sleep(SLOT_POLL_INTERVAL)
+
+                started = time.monotonic()
+                async with self.session.get(url, proxy=proxy) as response:
+                    body = await response.read()
+                    latency = time.monotonic() - started
+                    outcome = classify_status(response.status)
+                    host_failed = is_retryable_status(response.status)
+                    if response.status == 200:
+                        # 编码检测是CPU操作，放到线程池
+                        return await self._run_blocking(decode_content, body, self.encoding)
+
+                    if not host_failed:
+                        logger.warning(f"⚠️  HTTP {response.status} (不重试): {url[:50]}...")
+                        return None
+
+                    logger.warning(f"⚠️  HTTP {response.status} (第{i+1}次): {url[:50]}...")
+                    retry_delay = self.retry_policy.delay(i, response.headers.get('Retry-After'))
+
+            except asyncio.CancelledError:
+                # 请求被取消（任务停止或同一章节的其他分页失败）：归还槽位和许可，不计成功或失败
+                outcome = IGNORE
+                latency = None
+                cancelled = True
+                raise
+            except asyncio.TimeoutError:
+                outcome = OVERLOAD
+                retry_delay = self.retry_policy.backoff(i)
+                logger.warning(f"⚠️  请求超时 (第{i+1}次): {url[:50]}...")
+            except aiohttp.ClientConnectionError:
+                outcome = OVERLOAD
+                retry_delay = self.retry_policy.backoff(i)
+                logger.warning(f"⚠️  连接错误 (第{i+1}次): {url[:50]}...")
+            except Exception as e:
+                retry_delay = self.retry_policy.backoff(i)
+                logger.warning(f"⚠️  请求异常 (第{i+1}次): {e}")
+            finally:
+                if slot:
+                    slot.release(outcome, latency)
+                if breaker:
+                    if cancelled:
+                        breaker.release(permit)
+                    elif host_failed:
+                        breaker.record_failure(permit)
+                    else:
+                        breaker.record_success(permit)
+
+        logger.error(f"❌ 获取页面失败 ({max_retries}次): {url[:50]}...")
+        return None
+
+
+class AsyncCrawlEngine:
+    """asyncio下载引擎（GenericNovelCrawler / GenericArticleCrawler 共用）"""
+
+    def __init__(self, crawler, concurrency: int = 100):
+        """
+        :param crawler: 爬虫实例（提供配置、解析、保存和进度方法）
+        :param concurrency: 并发协程数（同时进行的请求数）
+        """
+        self.crawler = crawler
+        self.concurrency = max(1, concurrency)
+        self.fetcher: Optional[AsyncContentFetcher] = None
+        # 解析、数据库、Redis、进度回调都是阻塞操作，线程数沿用爬虫的并发线程数
+        self.executor: Optional[ThreadPoolExecutor] = None
+
+    def run_chapters(self, indices: Iterable[int], error_label: str = '下载失败'):
+        """下载并保存指定章节（阻塞直到全部完成或收到停止信号）"""
+        def on_error(index, e):
+            logger.error(f"❌ 章节 {index + 1} {error_label}: {e}")
+
+        self._run(self._download_and_save_chapter, list(indices), on_error)
+
+    def run_articles(self, articles: List[Dict]):
+        """下载并保存指定文章（阻塞直到全部完成或收到停止信号）"""
+        def on_error(article, e):
+            self.crawler._log('ERROR', f"❌ 文章 [{article['num']}] 下载异常: {e}")
+
+        self._run(self._download_article, list(articles), on_error)
+
+    def _run(self, handler: Callable, items: List, on_error: Callable):
+        self.executor = ThreadPoolExecutor(max_workers=max(1, self.crawler.max_workers),
+                                           thread_name_prefix='async-engine')
+        try:
+            asyncio.run(self._run_workers(handler, items, on_error))
+        finally:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+    async def _run_workers(self, handler: Callable, items: List, on_error: Callable):
+        """固定数量的协程从同一个迭代器取任务，避免一次性为所有章节创建协程"""
+        crawler = self.crawler
+        fetcher = crawler.fetcher
+        async with AsyncContentFetcher(
+            headers=fetcher.headers,
+            timeout=fetcher.timeout,
+            encoding=fetcher.encoding,
+            proxy_utils=fetcher.proxy_utils,
+            concurrency=self.concurrency,
+            executor=self.executor,
+            stats=fetcher.connection_stats,
+            rate_limiter=fetcher.rate_limiter,
+            adaptive_concurrency=fetcher.adaptive_concurrency,
+            retry_policy=fetcher.retry_policy,
+            retry_budget=fetcher.retry_budget,
+            stop_flag=fetcher.stop_flag,
+            circuit_breakers=fetcher.circuit_breakers
+        ) as self.fetcher:
+            queue = iter(items)
+
+            async def worker():
+                for item in queue:
+                    try:
+                        await handler(item)
+                    except Exception as e:
+                        on_error(item, e)
+                    if crawler._check_stop():
+                        break
+
+            await asyncio.gather(*(worker() for _ in range(min(self.concurrency, len(items)))))
+
+    async def _to_thread(self, func, *args):
+        """在线程池中执行阻塞操作"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    # ==================== 小说章节 ====================
+
+    async def _download_and_save_chapter(self, index: int) -> bool:
+        """下载并保存单个章节（对应 GenericNovelCrawler.download_and_save_chapter）"""
+        crawler = self.crawler
+        if crawler._check_stop():
+            crawler._log('WARNING', '⚠️  收到停止信号，终止下载')
+            return False
+
+        chapter = crawler.chapters[index]
+        content = await self._download_chapter_content(chapter.url, chapter.title)
+        return await self._to_thread(crawler._save_chapter, index, content)
+
+    async def _download_chapter_content(self, chapter_url: str, chapter_title: str = '') -> str:
+        """下载章节内容（对应 GenericNovelCrawler.download_chapter_content，第2页起并发获取）"""
+        crawler = self.crawler
+        content_plan = crawler.plan.chapter_content
+        if content_plan is None:
+            logger.error("❌ chapter_content 配置应为字典类型")
+            return ''
+
+        all_content = []
+        max_retries = crawler.config_manager.get_max_retries()
+        html = await self.fetcher.get_page(chapter_url, max_retries=max_retries)
+        if not html:
+            logger.warning(f"⚠️  第1页获取失败")
+            return await self._to_thread(crawler._merge_content, all_content)
+
+        content, max_pages = await self._to_thread(crawler._parse_content_page, html, 1,
+                                                   content_plan.max_pages_manual)
+        duplicate_page_count = crawler._collect_page_content(all_content, content, 1, 0)
+
+        page_urls = crawler._content_page_urls(chapter_url, max_pages)
+        tasks = [asyncio.ensure_future(self._fetch_content_page(page_url, page_num, max_pages, max_retries))
+                 for page_num, page_url in page_urls]
+        try:
+            for (page_num, page_url), task in zip(page_urls, tasks):
+                await self._to_thread(crawler._report_content_page, chapter_title, page_num, max_pages)
+                content = await task
+                if content is None:
+                    logger.warning(f"⚠️  第{page_num}页获取失败")
+                    break
+
+                duplicate_page_count = crawler._collect_page_content(all_content, content, page_num,
+                                                                     duplicate_page_count)
+                if duplicate_page_count >= 2:
+                    logger.info(f"⚠️  连续2页内容重复，停止翻页")
+                    break
+        finally:
+            # 提前结束时取消其余分页请求
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        return await self._to_thread(crawler._merge_content, all_content)
+
+    async def _fetch_content_page(self, page_url: str, page_num: int, max_pages: int,
+                                  max_retries: int) -> Optional[str]:
+        """获取并解析章节的单个分页（获取失败返回None）"""
+        if self.crawler._check_stop():
+            return None
+        html = await self.fetcher.get_page(page_url, max_retries=max_retries)
+        if not html:
+            return None
+        content, _ = await self._to_thread(self.crawler._parse_content_page, html, page_num, max_pages)
+        return content or ''
+
+    # ==================== 文章 ====================
+
+    async def _download_article(self, article: Dict) -> bool:
+        """下载单篇文章（对应 GenericArticleCrawler.download_article）"""
+        crawler = self.crawler
+        if crawler._check_stop():
+            crawler._log('WARNING', f"⏸️  用户停止，跳过: [{article['num']}] {article['title']}")
+            return False
+
+        try:
+            if await self._to_thread(crawler._skip_if_downloaded, article):
+                return True
+
+            try:
+                await self._to_thread(crawler._report_article_start, article)
+                html = await self.fetcher.get_page(article['url'],
+                                                   max_retries=crawler.config_manager.get_max_retries())
+                content = None
+                if html:
+                    content = await self._to_thread(crawler.parse_article_html, html, article['url'])
+                return await self._to_thread(crawler._save_article, article, content)
+            except Exception as e:
+                return await self._to_thread(crawler._fail_article, article, e)
+        finally:
+            await self._to_thread(crawler._report_download_progress)
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+章节工作项 - 爬虫 self.chapters 中的章节记录
+- 使用 __slots__，每章只保存索引、URL、标题、状态和字数，不保存正文
+- 正文只存在于写入缓冲中，落库后即释放，万章级书籍的内存占用与正文大小无关
+"""
+from typing import Dict, Iterable, List
+
+# 章节状态（与任务检查点中的每章状态字符一致）
+PENDING = '0'   # 未完成
+DONE = '1'      # 已保存
+FAILED = '2'    # 失败
+
+
+class ChapterRecord:
+    """章节工作项"""
+
+    __slots__ = ('index', 'url', 'title', 'status', 'word_count')
+
+    def __init__(self, index: int, url: str, title: str):
+        self.index = index
+        self.url = url
+        self.title = title
+        self.status = PENDING
+        self.word_count = 0
+
+    def to_dict(self) -> Dict:
+        return {'title': self.title, 'url': self.url}
+
+    def __repr__(self):
+        return f"<ChapterRecord({self.index}, {self.title!r}, status={self.status})>"
+
+
+def build_records(chapters: Iterable[Dict], start: int = 0) -> List[ChapterRecord]:
+    """
+    把解析出的章节字典转换为章节工作项
+    :param chapters: [{'title', 'url'}]
+    :param start: 第一个章节的索引
+    """
+    return [ChapterRecord(index, chapter['url'], chapter['title'])
+            for index, chapter in enumerate(chapters, start)]
+
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+章节写入缓冲 - 批量写入数据库（write-behind）
+下载线程保存章节时只放入缓冲区，满足以下任一条件时整批写入：
+- 缓冲的章节数达到 batch_size（由放入章节的线程直接写入）
+- 距离上次写入超过 flush_interval 秒（后台线程写入）
+- 下载结束或任务停止时 close()
+每批只需一次 INSERT ... ON DUPLICATE KEY UPDATE，写入结果通过 on_flushed 回调通知爬虫
+（爬虫据此更新Redis记录和进度，保证Redis中的成功记录都已落库）
+"""
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from loguru import logger
+
+
+class ChapterSink:
+    """章节批量写入缓冲（线程安全）"""
+
+    def __init__(self, db, novel_id: int, on_flushed: Callable[[List[Dict], bool], None],
+                 batch_size: int = 50, flush_interval: float = 2.0):
+        """
+        :param db: NovelDatabase 实例
+        :param novel_id: 小说ID
+        :param on_flushed: 每批写入后的回调 on_flushed(chapters, success)
+        :param batch_size: 每批最多写入的章节数
+        :param flush_interval: 缓冲区最长停留时间（秒）
+        """
+        self.db = db
+        self.novel_id = novel_id
+        self.on_flushed = on_flushed
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.cond = threading.Condition()
+        self.flush_lock = threading.Lock()
+        self.buffer: List[Dict] = []
+        self.oldest = 0.0
+        self.closed = False
+        self.batches = 0
+        self.written = 0
+        self.thread = threading.Thread(target=self._flush_loop, name='chapter-sink', daemon=True)
+        self.thread.start()
+
+    def add(self, chapter: Dict):
+        """
+        放入一个待写入的章节
+        :param chapter: {'chapter_num', 'title', 'content', 'source_url', ...}（其他字段原样传给 on_flushed）
+        """
+        with self.cond:
+            if self.closed:
+                raise RuntimeError('章节写入缓冲已关闭')
+            if not self.buffer:
+                self.oldest = time.monotonic()
+                self.cond.notify()
+            self.buffer.append(chapter)
+            full = len(self.buffer) >= self.batch_size
+        if full:
+            self.flush()
+
+    def flush(self):
+        """立即写入缓冲区中的所有章节"""
+        with self.flush_lock:
+            with self.cond:
+                batch, self.buffer = self.buffer, []
+            if batch:
+                self._write(batch)
+
+    def close(self):
+        """写入剩余章节并停止后台线程"""
+        with self.cond:
+            self.closed = True
+            self.cond.notify()
+        self.thread.join()
+        self.flush()
+        if self.batches:
+            logger.info(f"💾 章节批量写入: {self.written} 章 / {self.batches} 批")
+
+    def _flush_loop(self):
+        while True:
+            with self.cond:
+                while not self.closed:
+                    if self.buffer:
+                        remaining = self.oldest + self.flush_interval - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self.cond.wait(timeout=remaining)
+                    else:
+                        self.cond.wait()
+                if self.closed:
+                    return
+            self.flush()
+
+    def _write(self, batch: List[Dict]):
+        try:
+            self.db.upsert_chapters(self.novel_id, batch)
+            success = True
+            self.batches += 1
+            self.written += len(batch)
+        except Exception as e:
+            logger.error(f"❌ 批量写入 {len(batch)} 个章节失败: {e}")
+            success = False
+        try:
+            self.on_flushed(batch, success)
+        except Exception as e:
+            logger.error(f"章节写入回调失败: {e}")
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+熔断器 - 按主机的断路器（closed / open / half_open），进程内所有任务共享
+- closed: 正常请求，连续失败达到阈值后打开
+- open: 不再向该主机发请求，请求线程等待；超过恢复时间后进入 half_open
+- half_open: 只放行一个探测请求，成功则关闭（所有等待的请求继续），失败则重新打开
+- 每次放行返回一个许可（记录放行时的打开次数），熔断器打开之前放行的请求结果不再影响状态，
+  只有探测请求的结果能关闭或重新打开半开的熔断器
+状态变化会通知监听者（TaskManager 据此暂停/恢复受影响的任务）
+可选通过Redis在多个进程间共享打开状态
+"""
+import math
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+from loguru import logger
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Redis中打开状态的键（值为打开时间，过期时间为恢复时间）
+REDIS_KEY_PREFIX = 'circuit:open:'
+# 检查Redis中其他进程打开状态的最小间隔（秒）
+REDIS_CHECK_INTERVAL = 1.0
+
+
+class BreakerPermit:
+    """一次请求的放行许可（请求结束后传给 record_success/record_failure）"""
+
+    __slots__ = ('generation', 'probe')
+
+    def __init__(self, generation: int, probe: bool = False):
+        self.generation = generation  # 放行时熔断器已打开的次数
+        self.probe = probe            # 是否为半开状态的探测请求
+
+
+class CircuitBreaker:
+    """单个主机的断路器（线程安全）"""
+
+    def __init__(self, host: str, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 registry: 'CircuitBreakerRegistry' = None):
+        """
+        :param host: 主机名（含端口）
+        :param failure_threshold: 连续失败多少次后打开
+        :param reset_timeout: 打开后多久进入半开状态发送探测请求（秒）
+        :param registry: 所属注册表（用于通知监听者和访问Redis）
+        """
+        self.host = host
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.registry = registry
+        self.cond = threading.Condition()
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.generation = 0  # 已打开的次数
+        self.redis_checked = 0.0
+
+    def try_acquire(self) -> Optional[BreakerPermit]:
+        """
+        是否允许发出请求（不阻塞），允许时返回许可，否则返回None
+        half_open 状态下只有拿到探测权的调用方得到许可，该调用方必须随后调用 record_success/record_failure
+        """
+        changed = None
+        with self.cond:
+            if self.state == CLOSED:
+                if not self._opened_remotely():
+                    return BreakerPermit(self.generation)
+                changed = self._open(remote=True)
+            now = time.monotonic()
+            if self.state == OPEN and now - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                self.probing = False
+            if self.state == HALF_OPEN and not self.probing:
+                self.probing = True
+                logger.info(f"🔌 熔断器半开，发送探测请求: {self.host}")
+                permit = BreakerPermit(self.generation, probe=True)
+            else:
+                permit = None
+        self._notify(changed)
+        return permit
+
+    def acquire(self, stop_flag: Optional[threading.Event] = None,
+                poll_interval: float = 0.5) -> Optional[BreakerPermit]:
+        """
+        等待直到允许发出请求
+        :return: 许可，None 表示等待期间收到停止信号
+        """
+        while True:
+            permit = self.try_acquire()
+            if permit:
+                return permit
+            if stop_flag is not None and stop_flag.is_set():
+                return None
+            with self.cond:
+                self.cond.wait(timeout=poll_interval)
+
+    def record_success(self, permit: Optional[BreakerPermit] = None):
+        """
+        记录一次成功（站点可达）
+        只有探测请求的成功能关闭熔断器；熔断器打开之前放行的请求的结果被忽略
+        :param permit: try_acquire/acquire 返回的许可
+        """
+        changed = None
+        with self.cond:
+            if permit is not None and permit.generation != self.generation:
+                return
+            if self.state == CLOSED:
+                self.failures = 0
+            elif self.state == HALF_OPEN and permit is not None and permit.probe:
+                self.state = CLOSED
+                self.failures = 0
+                self.probing = False
+                changed = CLOSED
+                self._clear_remote()
+                self.cond.notify_all()
+        if changed:
+            logger.success(f"✅ 熔断器关闭，恢复请求: {self.host}")
+        self._notify(changed)
+
+    def record_failure(self, permit: Optional[BreakerPermit] = None):
+        """
+        记录一次失败（超时、连接错误、429或5xx）
+        :param permit: try_acquire/acquire 返回的许可
+        """
+        changed = None
+        with self.cond:
+            if permit is not None and permit.generation != self.generation:
+                return
+            if self.state == HALF_OPEN:
+                if permit is not None and permit.probe:
+                    changed = self._open()
+            elif self.state == CLOSED:
+                self.failures += 1
+                if self.failures >= self.failure_threshold:
+                    changed = self._open()
+        self._notify(changed)
+
+    def release(self, permit: Optional[BreakerPermit] = None):
+        """
+        归还没有结果的许可（请求被取消），不计成功或失败
+        探测请求被取消时熔断器保持半开，下一个请求重新探测
+        :param permit: try_acquire/acquire 返回的许可
+        """
+        with self.cond:
+            if permit is None or not permit.probe or permit.generation != self.generation:
+                return
+            if self.state == HALF_OPEN and self.probing:
+                self.probing = False
+                self.cond.notify_all()
+
+    def _open(self, remote: bool = False) -> str:
+        was_probing = self.state == HALF_OPEN
+        self.state = OPEN
+        self.probing = False
+        self.generation += 1
+        self.opened_at = time.monotonic()
+        if remote:
+            logger.warning(f"⚠️  其他进程已打开熔断器: {self.host} ({self.reset_timeout:.0f}秒后探测)")
+            return OPEN
+        self._publish_remote()
+        if was_probing:
+            logger.warning(f"⚠️  探测失败，熔断器重新打开: {self.host} ({self.reset_timeout:.0f}秒后重试)")
+        else:
+            logger.warning(f"⚠️  连续失败 {self.failures} 次，熔断器打开: {self.host} ({self.reset_timeout:.0f}秒后探测)")
+        return OPEN
+
+    def _notify(self, state: Optional[str]):
+        if state and self.registry is not None:
+            self.registry.notify(self.host, state)
+
+    # ==================== Redis共享（可选） ====================
+
+    def _redis(self):
+        return self.registry.redis_cli if self.registry is not None else None
+
+    def _opened_remotely(self) -> bool:
+        """其他进程是否已打开该主机的熔断器（限频检查）"""
+        redis_cli = self._redis()
+        now = time.monotonic()
+        if redis_cli is None or now - self.redis_checked < REDIS_CHECK_INTERVAL:
+            return False
+        self.redis_checked = now
+        try:
+            return bool(redis_cli.exists(REDIS_KEY_PREFIX + self.host))
+        except Exception as e:
+            logger.debug(f"熔断器读取Redis失败: {e}")
+            return False
+
+    def _publish_remote(self):
+        redis_cli = self._redis()
+        if redis_cli is None:
+            return
+        try:
+            redis_cli.set(REDIS_KEY_PREFIX + self.host, time.time(), ex=max(1, math.ceil(self.reset_timeout)))
+        except Exception as e:
+            logger.debug(f"熔断器写入Redis失败: {e}")
+
+    def _clear_remote(self):
+        redis_cli = self._redis()
+        if redis_cli is None:
+            return
+        try:
+            redis_cli.delete(REDIS_KEY_PREFIX + self.host)
+        except Exception as e:
+            logger.debug(f"熔断器清除Redis失败: {e}")
+
+
+class CircuitBreakerRegistry:
+    """进程内共享的断路器注册表（按主机）"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.listeners: List[Callable[[str, str], None]] = []
+        self.redis_cli = None
+
+    def get(self, host: str, failure_threshold: int = 5, reset_timeout: float = 30.0) -> CircuitBreaker:
+        """获取主机的断路器（不存在时创建，参数按最新配置更新）"""
+        with self.lock:
+            breaker = self.breakers.get(host)
+            if breaker is None:
+                breaker = self.breakers[host] = CircuitBreaker(host, failure_threshold, reset_timeout, self)
+            else:
+                breaker.failure_threshold = max(1, failure_threshold)
+                breaker.reset_timeout = reset_timeout
+            return breaker
+
+    def enable_redis(self, redis_cli):
+        """通过Redis在多个进程间共享打开状态"""
+        self.redis_cli = redis_cli
+
+    def add_listener(self, listener: Callable[[str, str], None]):
+        """注册状态变化监听者 listener(host, state)"""
+        with self.lock:
+            if listener not in self.listeners:
+                self.listeners.append(listener)
+
+    def notify(self, host: str, state: str):
+        with self.lock:
+            listeners = list(self.listeners)
+        for listener in listeners:
+            try:
+                listener(host, state)
+            except Exception as e:
+                logger.error(f"熔断器监听者处理失败: {e}")
+
+    def states(self) -> Dict[str, str]:
+        """获取所有主机的断路器状态"""
+        with self.lock:
+            return {host: breaker.state for host, breaker in self.breakers.items()}
+
+
+# 进程内唯一的注册表
+circuit_breakers = CircuitBreakerRegistry()
+
+
+class HostCircuitBreakers:
+    """按请求URL的主机获取共享断路器（ContentFetcher 每次请求前调用）"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 registry: CircuitBreakerRegistry = None):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.registry = registry or circuit_breakers
+
+    def for_url(self, url: str) -> CircuitBreaker:
+        return self.registry.get(urlparse(url).netloc, self.failure_threshold, self.reset_timeout)
+
+
+def create_circuit_breakers(config: Optional[Dict], redis_cli=None) -> Optional[HostCircuitBreakers]:
+    """
+    根据配置创建熔断器
+    :param config: ConfigManager.get_circuit_breaker() 的返回值，None表示未启用
+    :param redis_cli: Redis客户端（配置了 shared_redis 时用于跨进程共享）
+    """
+    if not config:
+        return None
+    if config['shared_redis'] and redis_cli is not None:
+        circuit_breakers.enable_redis(redis_cli)
+    return HostCircuitBreakers(config['failure_threshold'], config['reset_timeout'])
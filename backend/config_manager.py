@@ -4,12 +4,14 @@
 配置管理器 - 负责加载和验证爬虫配置
 """
 import json
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 from urllib.parse import urljoin
 
 from loguru import logger
 
+from backend.extraction_plan import ExtractionPlan, compile_plan
+
 
 class ConfigManager:
     """配置管理器"""
@@ -22,6 +24,8 @@ class ConfigManager:
         self.config_file = config_file
         self.config = self.load_config()
         self.validate_config()
+        # 预编译解析计划（加载时一次完成，热路径不再解释配置）
+        self.extraction_plan = compile_plan(self.get_parsers())
     
     def load_config(self) -> Dict:
         """加载配置文件"""
@@ -110,6 +114,10 @@ class ConfigManager:
         """获取解析器配置"""
         return self.config.get('parsers', {})
     
+    def get_extraction_plan(self) -> ExtractionPlan:
+        """获取预编译的解析计划"""
+        return self.extraction_plan
+    
     def get_content_type(self) -> str:
         """获取内容类型"""
         return self.config.get('content_type', 'novel')
@@ -138,13 +146,135 @@ class ConfigManager:
         """获取编码"""
         return self.get_request_config().get('encoding')
     
+    def get_pool_size(self, default: int = 10) -> int:
+        """获取每个主机的HTTP连接池大小（默认与并发线程数一致）"""
+        return self._safe_int(self.get_request_config().get('pool_size', default), default)
+    
     def get_delay(self) -> float:
         """获取延迟时间"""
         return self._safe_float(self.get_crawler_config().get('delay', 0.3), 0.3)
     
+    def get_rate_limit(self) -> Tuple[float, int]:
+        """
+        获取每个主机的限速配置 (每秒请求数, 突发请求数)
+        优先使用 crawler_config.rate_limit，未配置时由 delay 换算（每秒 1/delay 个请求）
+        每秒请求数为0表示不限速
+        """
+        rate_limit = self.get_crawler_config().get('rate_limit')
+        if isinstance(rate_limit, dict):
+            rate = self._safe_float(rate_limit.get('requests_per_second', 0), 0)
+            burst = self._safe_int(rate_limit.get('burst', max(1, int(rate))), 1)
+            return rate, max(1, burst)
+        delay = self.get_delay()
+        return (1 / delay if delay > 0 else 0.0), 1
+    
+    def get_adaptive_concurrency(self, max_limit: int) -> Optional[Dict]:
+        """
+        获取自适应并发（AIMD）配置，未启用时返回None
+        :param max_limit: 最大并发上限（任务的并发数，配置的max不能超过）
+        :return: {'min': 最小并发, 'max': 最大并发, 'latency_tolerance': 延迟容忍倍数}
+        """
+        adaptive_config = self.get_crawler_config().get('adaptive_concurrency')
+        if not isinstance(adaptive_config, dict) or not adaptive_config.get('enabled', False):
+            return None
+        max_limit = max(1, max_limit)
+        max_concurrency = min(max(1, self._safe_int(adaptive_config.get('max', max_limit), max_limit)), max_limit)
+        return {
+            'min': min(max(1, self._safe_int(adaptive_config.get('min', 1), 1)), max_concurrency),
+            'max': max_concurrency,
+            'latency_tolerance': self._safe_float(adaptive_config.get('latency_tolerance', 2.0), 2.0),
+        }
+    
+    def get_circuit_breaker(self) -> Optional[Dict]:
+        """
+        获取熔断器配置（crawler_config.circuit_breaker，默认启用），未启用时返回None
+        :return: {'failure_threshold': 连续失败次数, 'reset_timeout': 探测间隔秒数, 'shared_redis': 是否跨进程共享}
+        """
+        breaker_config = self.get_crawler_config().get('circuit_breaker')
+        if not isinstance(breaker_config, dict):
+            breaker_config = {}
+        if not breaker_config.get('enabled', True):
+            return None
+        return {
+            'failure_threshold': max(1, self._safe_int(breaker_config.get('failure_threshold', 10), 10)),
+            'reset_timeout': self._safe_float(breaker_config.get('reset_timeout', 30), 30.0),
+            'shared_redis': bool(breaker_config.get('shared_redis', False)),
+        }
+    
+    def get_engine(self) -> str:
+        """获取下载引擎: thread（线程池，默认）| asyncio"""
+        engine = str(self.get_crawler_config().get('engine', 'thread')).lower()
+        return engine if engine in ('thread', 'asyncio') else 'thread'
+    
+    def get_async_concurrency(self, max_limit: int) -> int:
+        """
+        获取asyncio引擎的并发请求数
+        :param max_limit: 最大并发请求数（任务的并发数，配置的async_concurrency不能超过）
+        """
+        concurrency = max(1, self._safe_int(self.get_crawler_config().get('async_concurrency', 100), 100))
+        return min(concurrency, max(1, max_limit))
+    
     def get_max_retries(self) -> int:
-        """获取最大重试次数"""
-        return self._safe_int(self.get_crawler_config().get('max_retries', 20), 20)
+        """获取单个请求的最大尝试次数"""
+        return max(1, self._safe_int(self.get_crawler_config().get('max_retries', 5), 5))
+    
+    def get_retry_config(self) -> Dict:
+        """
+        获取重试退避和重试预算配置（crawler_config.retry）
+        :return: {'base_delay', 'max_delay', 'max_retry_after', 'budget_ratio', 'budget_min'}
+        """
+        retry_config = self.get_crawler_config().get('retry')
+        if not isinstance(retry_config, dict):
+            retry_config = {}
+        return {
+            'base_delay': self._safe_float(retry_config.get('base_delay', 0.5), 0.5),
+            'max_delay': self._safe_float(retry_config.get('max_delay', 30), 30.0),
+            'max_retry_after': self._safe_float(retry_config.get('max_retry_after', 120), 120.0),
+            'budget_ratio': self._safe_float(retry_config.get('budget_ratio', 0.2), 0.2),
+            'budget_min': self._safe_int(retry_config.get('budget_min', 20), 20),
+        }
+    
+    def get_write_batch(self) -> Dict:
+        """
+        获取章节批量写入配置（crawler_config.write_batch）
+        :return: {'size': 每批章节数, 'interval': 最长缓冲秒数}
+        """
+        batch_config = self.get_crawler_config().get('write_batch')
+        if not isinstance(batch_config, dict):
+            batch_config = {}
+        return {
+            'size': max(1, self._safe_int(batch_config.get('size', 50), 50)),
+            'interval': max(0.1, self._safe_float(batch_config.get('interval', 2), 2.0)),
+        }
+    
+    def get_distributed(self) -> Optional[Dict]:
+        """
+        获取分布式下载配置（crawler_config.distributed，默认不启用），未启用时返回None
+        :return: {'local_workers': 本机启动的工作进程数, 'worker_threads': 每个工作进程的下载线程数,
+                  'visibility_timeout': 工作项认领后的超时秒数, 'max_attempts': 每个章节最多认领次数}
+        """
+        dist_config = self.get_crawler_config().get('distributed')
+        if not isinstance(dist_config, dict) or not dist_config.get('enabled', False):
+            return None
+        return {
+            'local_workers': max(0, self._safe_int(dist_config.get('local_workers', 2), 2)),
+            'worker_threads': max(1, self._safe_int(dist_config.get('worker_threads', 4), 4)),
+            'visibility_timeout': max(10.0, self._safe_float(dist_config.get('visibility_timeout', 300), 300.0)),
+            'max_attempts': max(1, self._safe_int(dist_config.get('max_attempts', 3), 3)),
+        }
+    
+    def get_catalog_cache(self) -> Optional[Dict]:
+        """
+        获取目录缓存配置（crawler_config.catalog_cache，默认启用），未启用时返回None
+        :return: {'ttl': 缓存有效期（秒）}
+        """
+        cache_config = self.get_crawler_config().get('catalog_cache')
+        if not isinstance(cache_config, dict):
+            cache_config = {}
+        if not cache_config.get('enabled', True):
+            return None
+        ttl = self._safe_int(cache_config.get('ttl', 86400), 86400)
+        return {'ttl': ttl} if ttl > 0 else None
     
     def build_url(self, url_type: str, **kwargs) -> Optional[str]:
         """
@@ -2,11 +2,24 @@
 # -*- coding: utf-8 -*-
 """
 内容获取器 - 负责HTTP请求和内容获取
+每个获取器持有一个带连接池的Session（HTTP/1.1 keep-alive），
+同一主机的请求复用TCP/TLS连接，并统计新建/复用的连接数
 """
-import requests
+import threading
+import time
 from typing import Optional, Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.compat import chardet
 from loguru import logger
 from urllib3 import disable_warnings
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from backend.adaptive_concurrency import AdaptiveConcurrency, OVERLOAD, IGNORE, classify_status
+from backend.circuit_breaker import HostCircuitBreakers
+from backend.rate_limiter import RateLimiter
+from backend.retry_policy import RetryPolicy, RetryBudget, is_retryable_status
 
 disable_warnings()
 
@@ -14,33 +27,192 @@ DEFAULT_HEADERS = {
     'user-agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/140.0.0.0 Safari/537.36'
 }
 
+
+def decode_content(content: bytes, encoding: str = None) -> str:
+    """
+    解码响应内容（与 requests 的 response.text 行为一致）
+    :param content: 响应字节
+    :param encoding: 配置的编码，为空时自动检测
+    :return: 文本
+    """
+    if not encoding:
+        encoding = (chardet.detect(content)['encoding'] if chardet else None) or 'utf-8'
+    try:
+        return str(content, encoding, errors='replace')
+    except (LookupError, TypeError):
+        return str(content, errors='replace')
+
+
+class ConnectionStats:
+    """连接统计（按主机记录新建/复用的连接数，线程安全）"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.hosts: Dict[str, Dict[str, int]] = {}
+
+    def record(self, host: str, reused: bool):
+        """记录一次连接获取"""
+        with self.lock:
+            stats = self.hosts.setdefault(host, {'opened': 0, 'reused': 0})
+            stats['reused' if reused else 'opened'] += 1
+
+    def totals(self) -> Dict[str, int]:
+        """汇总所有主机"""
+        with self.lock:
+            return {
+                'opened': sum(s['opened'] for s in self.hosts.values()),
+                'reused': sum(s['reused'] for s in self.hosts.values()),
+            }
+
+    def by_host(self) -> Dict[str, Dict[str, int]]:
+        """按主机的统计快照"""
+        with self.lock:
+            return {host: dict(stats) for host, stats in self.hosts.items()}
+
+
+class _CountingPoolMixin:
+    """
+    连接池统计混入类
+    从池中取出的连接若仍持有socket即为复用，否则需要新建TCP（和TLS）连接
+    """
+    stats: Optional[ConnectionStats] = None
+
+    def _get_conn(self, timeout=None):
+        conn = super()._get_conn(timeout)
+        if self.stats is not None:
+            self.stats.record(self.host, reused=getattr(conn, 'sock', None) is not None)
+        return conn
+
+
+def _counting_pool_classes(stats: ConnectionStats) -> Dict:
+    """生成绑定到指定统计对象的连接池类"""
+    return {
+        'http': type('CountingHTTPConnectionPool', (_CountingPoolMixin, HTTPConnectionPool), {'stats': stats}),
+        'https': type('CountingHTTPSConnectionPool', (_CountingPoolMixin, HTTPSConnectionPool), {'stats': stats}),
+    }
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """带连接统计的连接池适配器（每个主机一个连接池）"""
+
+    def __init__(self, stats: ConnectionStats, pool_size: int = 10, **kwargs):
+        self.stats = stats
+        self.pool_classes = _counting_pool_classes(stats)
+        super().__init__(pool_connections=pool_size, pool_maxsize=pool_size, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = self.pool_classes
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        if proxy not in self.proxy_manager:
+            # 代理轮换时限制缓存的代理连接池数量，淘汰最早的
+            while len(self.proxy_manager) >= self._pool_connections:
+                oldest = next(iter(self.proxy_manager))
+                self.proxy_manager.pop(oldest).clear()
+        manager = super().proxy_manager_for(proxy, **proxy_kwargs)
+        if hasattr(manager, 'pool_classes_by_scheme'):
+            manager.pool_classes_by_scheme = self.pool_classes
+        return manager
+
+
 class ContentFetcher:
     """HTTP内容获取器"""
     
     def __init__(self, headers: Dict = None, timeout: int = 30, 
-                 encoding: str = None, proxy_utils=None):
+                 encoding: str = None, proxy_utils=None, pool_size: int = 10,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 adaptive_concurrency: Optional[AdaptiveConcurrency] = None,
+                 retry_policy: Optional[RetryPolicy] = None, retry_budget: Optional[RetryBudget] = None,
+                 stop_flag: Optional[threading.Event] = None,
+                 circuit_breakers: Optional[HostCircuitBreakers] = None,
+                 max_concurrency: Optional[int] = None):
         """
         初始化内容获取器
         :param headers: 请求头
         :param timeout: 超时时间
         :param encoding: 编码
         :param proxy_utils: 代理工具
+        :param pool_size: 每个主机的连接池大小（应与并发线程数一致）
+        :param rate_limiter: 按主机的限速器（每次请求前取令牌，None表示不限速）
+        :param adaptive_concurrency: 按主机的自适应并发上限（None表示不限制，由线程数决定）
+        :param retry_policy: 重试退避策略
+        :param retry_budget: 任务级重试预算（每个爬虫任务一份）
+        :param stop_flag: 停止标志（退避等待期间收到停止信号时立即返回）
+        :param circuit_breakers: 按主机的熔断器（进程内共享，None表示不启用）
+        :param max_concurrency: 同时进行的请求数上限（所有线程共用，None表示不限制）
         """
         self.headers = headers or DEFAULT_HEADERS
         self.timeout = timeout
         self.encoding = encoding
         self.proxy_utils = proxy_utils
+        self.pool_size = max(1, pool_size)
+        self.rate_limiter = rate_limiter
+        self.adaptive_concurrency = adaptive_concurrency
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.retry_budget = retry_budget or RetryBudget()
+        self.stop_flag = stop_flag
+        self.circuit_breakers = circuit_breakers
+        self.request_slots = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+        
+        # 连接池Session（keep-alive，线程间共享）
+        self.connection_stats = ConnectionStats()
+        self.session = requests.Session()
+        adapter = PooledHTTPAdapter(self.connection_stats, pool_size=self.pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+    
+    def get_connection_stats(self) -> Dict[str, int]:
+        """获取连接统计 {'opened': 新建连接数, 'reused': 复用连接数}"""
+        return self.connection_stats.totals()
+    
+    def get_concurrency_level(self, url: str) -> Optional[int]:
+        """获取URL所属主机当前的并发上限（未启用自适应并发时返回None）"""
+        return self.adaptive_concurrency.level(url) if self.adaptive_concurrency else None
+    
+    def _wait_before_retry(self, seconds: float) -> bool:
+        """重试前退避等待，返回是否收到停止信号"""
+        if self.stop_flag is not None:
+            return self.stop_flag.wait(seconds)
+        time.sleep(seconds)
+        return False
+    
+    def close(self):
+        """关闭Session，释放连接池"""
+        self.session.close()
     
     def get_page(self, url: str, max_retries: int = 20) -> Optional[str]:
         """
-        获取网页内容（带重试）
+        获取网页内容（可重试的失败按指数退避重试，受任务重试预算限制）
         :param url: 目标URL
-        :param max_retries: 最大重试次数
+        :param max_retries: 最大尝试次数
         :return: HTML内容
         """
         proxies = None
+        retry_delay = 0.0
         
         for i in range(max_retries):
+            # 首次请求补充重试预算；重试前先申请预算，再退避等待
+            if i == 0:
+                self.retry_budget.record_request()
+            else:
+                if not self.retry_budget.try_spend():
+                    logger.warning(f"⚠️  重试预算已耗尽，放弃重试: {url[:50]}...")
+                    return None
+                if self._wait_before_retry(retry_delay):
+                    return None
+            
+            # 熔断器打开时等待站点恢复（任务暂停），收到停止信号时放弃
+            breaker = self.circuit_breakers.for_url(url) if self.circuit_breakers else None
+            permit = breaker.acquire(self.stop_flag) if breaker else None
+            if breaker and not permit:
+                return None
+            
+            slot = None
+            request_slot = False
+            outcome = IGNORE
+            latency = None
+            host_failed = True
             try:
                 # 获取代理
                 if self.proxy_utils:
@@ -50,14 +222,31 @@ class ContentFetcher:
                     else:
                         logger.warning(f"⚠️  代理获取失败，使用直连")
                 
+                # 按主机限速（包括重试、章节翻页和列表翻页的每一次请求）
+                if self.rate_limiter:
+                    self.rate_limiter.acquire(url)
+                
+                # 同时进行的请求数上限
+                if self.request_slots:
+                    self.request_slots.acquire()
+                    request_slot = True
+                
+                # 按主机的自适应并发上限
+                if self.adaptive_concurrency:
+                    slot = self.adaptive_concurrency.for_url(url)
+                    slot.acquire()
+                
                 # 发起请求
-                response = requests.get(
+                started = time.monotonic()
+                response = self.session.get(
                     url,
                     headers=self.headers,
                     proxies=proxies,
                     timeout=self.timeout,
                     verify=False
                 )
+                latency = time.monotonic() - started
+                outcome = classify_status(response.status_code)
                 
                 # 处理编码
                 if self.encoding:
@@ -65,21 +254,38 @@ class ContentFetcher:
                 else:
                     response.encoding = response.apparent_encoding or 'utf-8'
                 
+                host_failed = is_retryable_status(response.status_code)
                 if response.status_code == 200:
                     return response.text
-                else:
-                    logger.warning(f"⚠️  HTTP {response.status_code}: {url[:50]}...")
+                
+                if not host_failed:
+                    logger.warning(f"⚠️  HTTP {response.status_code} (不重试): {url[:50]}...")
+                    return None
+                
+                logger.warning(f"⚠️  HTTP {response.status_code} (第{i+1}次): {url[:50]}...")
+                retry_delay = self.retry_policy.delay(i, response.headers.get('Retry-After'))
                     
             except requests.exceptions.Timeout:
+                outcome = OVERLOAD
+                retry_delay = self.retry_policy.backoff(i)
                 logger.warning(f"⚠️  请求超时 (第{i+1}次): {url[:50]}...")
             except requests.exceptions.ConnectionError:
+                outcome = OVERLOAD
+                retry_delay = self.retry_policy.backoff(i)
                 logger.warning(f"⚠️  连接错误 (第{i+1}次): {url[:50]}...")
             except Exception as e:
+                retry_delay = self.retry_policy.backoff(i)
                 logger.warning(f"⚠️  请求异常 (第{i+1}次): {e}")
-            
-            # 最后一次重试失败
-            if i == max_retries - 1:
-                logger.error(f"❌ 获取页面失败 ({max_retries}次): {url[:50]}...")
+            finally:
+                if slot:
+                    slot.release(outcome, latency)
+                if request_slot:
+                    self.request_slots.release()
+                if breaker:
+                    if host_failed:
+                        breaker.record_failure(permit)
+                    else:
+                        breaker.record_success(permit)
         
+        logger.error(f"❌ 获取页面失败 ({max_retries}次): {url[:50]}...")
         return None
-
@@ -0,0 +1,536 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分布式章节下载 - 通过Redis工作队列把一本书的章节分给多个进程/机器下载
+- 发起任务的爬虫（DistributedDownload）把待下载章节发布到 Redis 工作队列，
+  并订阅进度频道，把各工作进程的结果汇总到原有的进度回调（任务进度和WebSocket推送）
+- 工作进程（DistributedWorker，python -m backend.distributed worker）无状态：
+  从任务集合中选取任务，认领章节，下载解析后批量写入数据库，再确认工作项并发布进度
+- 可靠队列：认领时工作项从 pending 移到 processing 并登记租约（visibility timeout），
+  工作进程崩溃或超时未确认的工作项由发起方重新入队，超过 max_attempts 次记为失败
+- 保证至少处理一次：章节写入是幂等的（INSERT ... ON DUPLICATE KEY UPDATE），重复处理不会产生重复章节；
+  每个章节号只计数和发布一次进度（已处理章节号集合），租约过期后被重复处理的章节不会重复计数
+
+Redis键（{job} 为任务ID）：
+- novel:dist:jobs            活跃任务集合
+- novel:dist:{job}:meta      任务信息（站点配置、书籍ID、小说ID、代理）
+- novel:dist:{job}:pending   待认领工作项（list）
+- novel:dist:{job}:processing 已认领未确认工作项（list）
+- novel:dist:{job}:leases    租约到期时间（zset）
+- novel:dist:{job}:stats     完成/失败计数（hash）
+- novel:dist:{job}:done      已计数的章节号（set）
+- novel:dist:{job}:events    进度频道（pub/sub）
+"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import json
+import os
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from backend.chapter_record import DONE, FAILED
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+JOBS_KEY = 'novel:dist:jobs'
+# 任务相关键的过期时间（发起方每次检查租约时续期）
+JOB_TTL = 24 * 3600
+# 发起方检查过期租约的间隔（秒）
+REAP_INTERVAL = 5.0
+
+
+class WorkQueue:
+    """一个分布式任务的Redis可靠工作队列"""
+
+    def __init__(self, redis_cli, job_id: str, visibility_timeout: float = 300.0, max_attempts: int = 3):
+        """
+        :param redis_cli: Redis客户端
+        :param job_id: 任务ID
+        :param visibility_timeout: 工作项认领后未确认的超时时间（秒）
+        :param max_attempts: 每个工作项最多认领次数
+        """
+        self.redis = redis_cli
+        self.job_id = job_id
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        prefix = f'novel:dist:{job_id}'
+        self.meta_key = f'{prefix}:meta'
+        self.pending_key = f'{prefix}:pending'
+        self.processing_key = f'{prefix}:processing'
+        self.leases_key = f'{prefix}:leases'
+        self.stats_key = f'{prefix}:stats'
+        self.done_key = f'{prefix}:done'
+        self.channel = f'{prefix}:events'
+
+    def publish(self, meta: Dict, items: List[Dict], chunk_size: int = 1000):
+        """
+        发布任务：写入任务信息和工作项，加入活跃任务集合
+        :param meta: 任务信息
+        :param items: 工作项 {'n': 章节号, 't': 标题, 'u': URL}
+        """
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hset(self.meta_key, mapping=meta)
+        pipe.hset(self.stats_key, mapping={'completed': 0, 'failed': 0})
+        # LPUSH + 认领时从右端取出 = 先进先出
+        for start in range(0, len(items), chunk_size):
+            pipe.lpush(self.pending_key, *(json.dumps({**item, 'a': 0}, ensure_ascii=False)
+                                           for item in items[start:start + chunk_size]))
+        self._expire(pipe)
+        pipe.sadd(JOBS_KEY, self.job_id)
+        pipe.execute()
+
+    def get_meta(self) -> Dict:
+        meta = self.redis.hgetall(self.meta_key)
+        return {self._str(k): self._str(v) for k, v in meta.items()}
+
+    def is_active(self) -> bool:
+        return bool(self.redis.sismember(JOBS_KEY, self.job_id))
+
+    def claim(self, timeout: int = 1) -> Optional[Tuple[bytes, Dict]]:
+        """
+        认领一个工作项（阻塞最多timeout秒）
+        :return: (原始工作项, 工作项字典)，队列为空时返回None
+        """
+        raw = self.redis.brpoplpush(self.pending_key, self.processing_key, timeout)
+        if raw is None:
+            return None
+        self.redis.zadd(self.leases_key, {raw: time.time() + self.visibility_timeout})
+        return raw, json.loads(raw)
+
+    def ack(self, raws: List[bytes]):
+        """确认工作项已处理"""
+        if not raws:
+            return
+        pipe = self.redis.pipeline(transaction=False)
+        for raw in raws:
+            pipe.lrem(self.processing_key, 1, raw)
+        pipe.zrem(self.leases_key, *raws)
+        pipe.execute()
+
+    def is_done(self, chapter_num: int) -> bool:
+        """章节是否已处理并计数（租约过期后重新入队的重复工作项）"""
+        return bool(self.redis.sismember(self.done_key, chapter_num))
+
+    def report(self, worker_id: str, chapters: List[Dict], success: bool):
+        """
+        记录一批章节的处理结果并发布进度事件（每个章节号只记录一次，重复报告的章节被忽略）
+        :param chapters: [{'n': 章节号, 'title', 'words'}]
+        """
+        if not chapters:
+            return
+        pipe = self.redis.pipeline(transaction=False)
+        for chapter in chapters:
+            pipe.sadd(self.done_key, chapter['n'])
+        chapters = [chapter for chapter, added in zip(chapters, pipe.execute()) if added]
+        if not chapters:
+            return
+        event = {'worker': worker_id, 'success': success, 'chapters': chapters}
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.expire(self.done_key, JOB_TTL)
+        pipe.hincrby(self.stats_key, 'completed' if success else 'failed', len(chapters))
+        pipe.expire(self.stats_key, JOB_TTL)
+        pipe.publish(self.channel, json.dumps(event, ensure_ascii=False))
+        pipe.execute()
+
+    def requeue_expired(self) -> List[Dict]:
+        """
+        把租约已过期的工作项重新放回队列（优先认领），并续期任务键
+        :return: 超过最大认领次数、不再重试的工作项
+        """
+        now = time.time()
+        # 已移入processing但还没登记租约的工作项（认领后进程立即崩溃）也给一个租约
+        processing = self.redis.lrange(self.processing_key, 0, -1)
+        if processing:
+            self.redis.zadd(self.leases_key, {raw: now + self.visibility_timeout for raw in processing}, nx=True)
+
+        dead = []
+        for raw in self.redis.zrangebyscore(self.leases_key, '-inf', now):
+            removed = self.redis.lrem(self.processing_key, 1, raw)
+            self.redis.zrem(self.leases_key, raw)
+            if not removed:
+                continue  # 刚刚被确认
+            item = json.loads(raw)
+            if self.is_done(item['n']):
+                continue  # 已处理并计数，只是还没确认
+            item['a'] = item.get('a', 0) + 1
+            if item['a'] >= self.max_attempts:
+                dead.append(item)
+            else:
+                self.redis.rpush(self.pending_key, json.dumps(item, ensure_ascii=False))
+
+        pipe = self.redis.pipeline(transaction=False)
+        self._expire(pipe)
+        pipe.execute()
+        return dead
+
+    def remaining(self) -> int:
+        """尚未确认的工作项数（待认领 + 处理中）"""
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.llen(self.pending_key)
+        pipe.llen(self.processing_key)
+        return sum(pipe.execute())
+
+    def pending_count(self) -> int:
+        return self.redis.llen(self.pending_key)
+
+    def stats(self) -> Dict[str, int]:
+        stats = self.redis.hgetall(self.stats_key)
+        return {self._str(k): int(v) for k, v in stats.items()}
+
+    def close(self):
+        """停止分发：移出活跃任务集合并清空待认领工作项（已认领的工作项仍可写入和确认）"""
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.srem(JOBS_KEY, self.job_id)
+        pipe.delete(self.pending_key)
+        pipe.execute()
+
+    def delete(self):
+        """结束任务：移出活跃任务集合并删除所有键（工作进程随后停止认领）"""
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.srem(JOBS_KEY, self.job_id)
+        pipe.delete(self.meta_key, self.pending_key, self.processing_key, self.leases_key, self.stats_key,
+                    self.done_key)
+        pipe.execute()
+
+    def _expire(self, pipe):
+        for key in (self.meta_key, self.pending_key, self.processing_key, self.leases_key, self.stats_key,
+                    self.done_key):
+            pipe.expire(key, JOB_TTL)
+
+    @staticmethod
+    def _str(value) -> str:
+        return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
+class DistributedDownload:
+    """发起方：发布章节工作项，启动本机工作进程，汇总进度直到所有工作项完成"""
+
+    def __init__(self, crawler, config: Dict):
+        """
+        :param crawler: GenericNovelCrawler 实例（已获取章节列表并确定 novel_id）
+        :param config: ConfigManager.get_distributed() 的返回值
+        """
+        self.crawler = crawler
+        self.config = config
+        self.job_id = uuid.uuid4().hex
+        self.queue = WorkQueue(crawler.redis_cli, self.job_id, config['visibility_timeout'],
+                               config['max_attempts'])
+        self.workers: List[subprocess.Popen] = []
+
+    def run(self, indices: List[int]):
+        """
+        分布式下载指定章节（返回时所有工作项已完成，或任务已停止）
+        :param indices: 章节索引列表
+        """
+        crawler = self.crawler
+        base_completed = crawler.completed_count
+        base_failed = crawler.failed_count
+
+        pubsub = crawler.redis_cli.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self.queue.channel)
+        items = [{'n': crawler.chapter_offset + index + 1,
+                  't': crawler.chapters[index].title,
+                  'u': crawler.chapters[index].url} for index in indices]
+        self.queue.publish({
+            'config': json.dumps(crawler.config_manager.config, ensure_ascii=False),
+            'book_id': crawler.book_id,
+            'novel_id': crawler.novel_id,
+            'use_proxy': int(crawler.use_proxy),
+            'visibility_timeout': self.config['visibility_timeout']
+        }, items)
+        crawler._log('INFO', f"🌐 分布式下载: {len(items)} 章已发布到工作队列 (任务: {self.job_id})")
+        self._start_local_workers()
+
+        next_reap = time.monotonic() + REAP_INTERVAL
+        try:
+            while True:
+                message = pubsub.get_message(timeout=1.0)
+                if message and message.get('type') == 'message':
+                    self._on_event(json.loads(message['data']), base_completed, base_failed)
+
+                if crawler._check_stop():
+                    crawler._log('WARNING', '⚠️  收到停止信号，取消分布式下载任务')
+                    break
+
+                if time.monotonic() >= next_reap:
+                    next_reap = time.monotonic() + REAP_INTERVAL
+                    self._handle_dead(self.queue.requeue_expired())
+                if self.queue.remaining() == 0:
+                    break
+        finally:
+            # 停止分发，等本机工作进程写入手上的章节后退出，再读取剩余事件并按计数器修正进度
+            self.queue.close()
+            self._stop_local_workers()
+            while True:
+                message = pubsub.get_message(timeout=0.1)
+                if not message:
+                    break
+                if message.get('type') == 'message':
+                    self._on_event(json.loads(message['data']), base_completed, base_failed)
+            self._sync_counts(base_completed, base_failed)
+            if crawler.checkpoint:
+                crawler.checkpoint.flush()
+            self.queue.delete()
+            pubsub.close()
+
+    def _on_event(self, event: Dict, base_completed: int, base_failed: int):
+        """工作进程完成一批章节"""
+        crawler = self.crawler
+        status_icon = "✅" if event.get('success') else "❌"
+        state = DONE if event.get('success') else FAILED
+        with crawler.progress_lock:
+            self._sync_counts(base_completed, base_failed, update_progress=False)
+            total = len(crawler.chapters)
+            progress = (crawler.completed_count / total) * 100 if total else 100.0
+            indices = []
+            for chapter in event.get('chapters', []):
+                index = chapter.get('n', 0) - crawler.chapter_offset - 1
+                if 0 <= index < total:
+                    crawler.chapters[index].status = state
+                    indices.append(index)
+                if event.get('success'):
+                    crawler.total_words += chapter['words']
+                msg = (f"{status_icon} [{crawler.completed_count}/{total}] {chapter['title']} "
+                       f"({chapter['words']} 字) - 进度: {progress:.1f}% [{event.get('worker')}]")
+                crawler._log('INFO' if event.get('success') else 'ERROR', msg)
+            # 工作进程已落库的章节记入检查点（服务重启后从检查点继续时跳过）
+            if crawler.checkpoint and indices:
+                crawler.checkpoint.mark(indices, state)
+            chapters = event.get('chapters') or [{'title': ''}]
+            crawler._update_progress(
+                stage='downloading',
+                detail='分布式下载',
+                total=total,
+                completed=crawler.completed_count,
+                failed=crawler.failed_count,
+                current=chapters[-1]['title']
+            )
+
+    def _sync_counts(self, base_completed: int, base_failed: int, update_progress: bool = True):
+        """按Redis中的计数器更新爬虫的完成/失败数"""
+        try:
+            stats = self.queue.stats()
+        except Exception as e:
+            logger.warning(f"⚠️  读取分布式任务计数失败: {e}")
+            return
+        completed = stats.get('completed', 0) + stats.get('failed', 0)
+        self.crawler.completed_count = base_completed + completed
+        self.crawler.failed_count = base_failed + stats.get('failed', 0)
+        if update_progress:
+            self.crawler._update_progress(
+                stage='downloading',
+                detail='分布式下载',
+                total=len(self.crawler.chapters),
+                completed=self.crawler.completed_count,
+                failed=self.crawler.failed_count
+            )
+
+    def _handle_dead(self, dead: List[Dict]):
+        """超过最大认领次数的工作项记为失败"""
+        if not dead:
+            return
+        with self.crawler.progress_lock:
+            self.crawler.mark_chapters_failed([item['u'] for item in dead])
+        self.crawler._log('WARNING', f"⚠️  {len(dead)} 个章节超过最大认领次数 ({self.config['max_attempts']})，记为失败")
+        self.queue.report('coordinator', [{'n': item['n'], 'title': item['t'], 'words': 0} for item in dead], False)
+
+    def _start_local_workers(self):
+        """在本机启动工作进程（其他机器可另外运行 python -m backend.distributed worker）"""
+        for _ in range(self.config['local_workers']):
+            self.workers.append(subprocess.Popen(
+                [sys.executable, '-m', 'backend.distributed', 'worker', '--job', self.job_id,
+                 '--threads', str(self.config['worker_threads'])],
+                cwd=str(PROJECT_ROOT)
+            ))
+        if self.workers:
+            self.crawler._log('INFO', f"🧩 已启动 {len(self.workers)} 个本机工作进程 "
+                                      f"(每个 {self.config['worker_threads']} 线程)")
+
+    def _stop_local_workers(self, timeout: float = 30):
+        """任务已停止分发，工作进程写入手上的章节后自行退出"""
+        for process in self.workers:
+            try:
+                process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                logger.warning(f"⚠️  工作进程 {process.pid} 未在 {timeout} 秒内退出，强制结束")
+                process.kill()
+        self.workers = []
+
+
+class DistributedWorker:
+    """无状态工作进程：从活跃任务中认领章节，下载解析并批量写入数据库"""
+
+    def __init__(self, redis_cli, threads: int = 4, job_id: Optional[str] = None,
+                 stop_flag: Optional[threading.Event] = None):
+        """
+        :param redis_cli: Redis客户端
+        :param threads: 下载线程数
+        :param job_id: 只处理指定任务（任务结束后退出）；不指定时持续处理所有活跃任务
+        :param stop_flag: 停止标志
+        """
+        self.redis = redis_cli
+        self.threads = max(1, threads)
+        self.job_id = job_id
+        self.stop_flag = stop_flag or threading.Event()
+        self.worker_id = f'{socket.gethostname()}:{os.getpid()}'
+        # 最近处理的任务的爬虫实例（同一任务重复进入时复用）
+        self.crawler_cache: Optional[Tuple[str, object]] = None
+
+    def run(self):
+        logger.info(f"👷 分布式工作进程启动: {self.worker_id} (线程数: {self.threads})")
+        while not self.stop_flag.is_set():
+            job_id = self.job_id or self._pick_job()
+            if job_id is None:
+                self.stop_flag.wait(1.0)
+                continue
+
+            queue = WorkQueue(self.redis, job_id)
+            processed = 0
+            if queue.is_active():
+                try:
+                    processed = self._run_job(queue)
+                except Exception as e:
+                    logger.error(f"❌ 处理分布式任务 {job_id} 失败: {e}")
+
+            if self.job_id and (not queue.is_active() or queue.remaining() == 0):
+                break
+            if not processed:
+                # 剩余工作项都在其他进程手上，等待超时重新入队或新任务
+                self.stop_flag.wait(1.0)
+        logger.info(f"👷 分布式工作进程退出: {self.worker_id}")
+
+    def _pick_job(self) -> Optional[str]:
+        job_id = self.redis.srandmember(JOBS_KEY)
+        if job_id is None:
+            return None
+        job_id = WorkQueue._str(job_id)
+        queue = WorkQueue(self.redis, job_id)
+        if not self.redis.exists(queue.meta_key):
+            self.redis.srem(JOBS_KEY, job_id)  # 发起方已不存在，清理过期任务
+            return None
+        return job_id
+
+    def _get_crawler(self, job_id: str, meta: Dict):
+        """按任务信息创建爬虫实例（只用于下载章节内容和记录Redis状态）"""
+        if self.crawler_cache and self.crawler_cache[0] == job_id:
+            return self.crawler_cache[1]
+
+        from backend.generic_crawler import GenericNovelCrawler
+        with tempfile.NamedTemporaryFile('w', suffix='.json', encoding='utf-8', delete=False) as f:
+            f.write(meta['config'])
+            config_file = f.name
+        try:
+            crawler = GenericNovelCrawler(config_file, meta['book_id'], max_workers=self.threads,
+                                          use_proxy=meta.get('use_proxy') == '1', stop_flag=self.stop_flag)
+        finally:
+            os.unlink(config_file)
+        crawler.novel_id = int(meta['novel_id'])
+        self.crawler_cache = (job_id, crawler)
+        return crawler
+
+    def _run_job(self, queue: WorkQueue) -> int:
+        """
+        处理一个任务的工作项，直到队列中没有待认领的工作项或任务结束
+        :return: 本次处理的工作项数
+        """
+        from backend.chapter_sink import ChapterSink
+
+        meta = queue.get_meta()
+        if not meta:
+            return 0
+        queue.visibility_timeout = float(meta.get('visibility_timeout', queue.visibility_timeout))
+        crawler = self._get_crawler(queue.job_id, meta)
+        processed = [0]
+
+        def on_flushed(batch: List[Dict], success: bool):
+            urls = [item['source_url'] for item in batch]
+            with crawler.progress_lock:
+                if success:
+                    crawler.mark_chapters_success(urls)
+                else:
+                    crawler.mark_chapters_failed(urls)
+            # 先发布进度再确认，发起方看到队列清空时已经收到所有事件
+            queue.report(self.worker_id, [{'n': item['chapter_num'], 'title': item['title'],
+                                           'words': len(item['content'])} for item in batch], success)
+            queue.ack([item['raw'] for item in batch])
+
+        write_batch = crawler.config_manager.get_write_batch()
+        sink = ChapterSink(crawler.db, crawler.novel_id, on_flushed, write_batch['size'], write_batch['interval'])
+        try:
+            threads = [threading.Thread(target=self._work, args=(queue, crawler, sink, processed), daemon=True)
+                       for _ in range(self.threads)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sink.close()
+        if processed[0]:
+            logger.info(f"👷 分布式任务 {queue.job_id}: 本轮处理 {processed[0]} 章")
+        return processed[0]
+
+    def _work(self, queue: WorkQueue, crawler, sink, processed: List[int]):
+        """下载线程：认领、下载、放入写入缓冲"""
+        while not self.stop_flag.is_set():
+            try:
+                if not queue.is_active():
+                    return
+                claimed = queue.claim(timeout=1)
+                if claimed is None:
+                    if queue.pending_count() == 0:
+                        return
+                    continue
+
+                raw, item = claimed
+                if queue.is_done(item['n']):
+                    # 租约过期后重新入队，但之前的认领者已经处理完成
+                    queue.ack([raw])
+                    continue
+                processed[0] += 1
+                content = crawler.download_chapter_content(item['u'], item['t'])
+                if not content or not content.strip():
+                    logger.error(f"❌ {item['t']} 内容为空")
+                    with crawler.progress_lock:
+                        crawler.mark_chapters_failed([item['u']])
+                    queue.report(self.worker_id, [{'n': item['n'], 'title': item['t'], 'words': 0}], False)
+                    queue.ack([raw])
+                    continue
+
+                sink.add({'chapter_num': item['n'], 'title': item['t'], 'content': content,
+                          'source_url': item['u'], 'raw': raw})
+            except Exception as e:
+                logger.error(f"❌ 分布式下载线程出错: {e}")
+                self.stop_flag.wait(1.0)
+
+
+def main():
+    import argparse
+    import signal
+
+    parser = argparse.ArgumentParser(description='分布式章节下载工作进程')
+    parser.add_argument('command', choices=['worker'], help='worker: 启动工作进程')
+    parser.add_argument('--threads', type=int, default=4, help='下载线程数')
+    parser.add_argument('--job', default=None, help='只处理指定任务，任务结束后退出')
+    args = parser.parse_args()
+
+    from backend.generic_crawler import redis_cli
+
+    stop_flag = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop_flag.set())
+    try:
+        DistributedWorker(redis_cli, threads=args.threads, job_id=args.job, stop_flag=stop_flag).run()
+    except KeyboardInterrupt:
+        stop_flag.set()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+解析计划 - 将解析器配置预编译为不可变的执行计划
+配置加载时一次性完成：
+- XPath 编译为 lxml etree.XPath
+- 正则编译为 re.Pattern
+- 后处理链绑定为可直接调用的函数
+章节下载的热路径只执行预编译步骤，不再重复读取配置字典和按字符串分派
+"""
+import re
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Pattern, Tuple
+
+from loguru import logger
+from lxml import etree
+
+from backend.parser import (
+    HtmlDocument, HtmlParser,
+    process_strip, process_replace, process_regex_replace, process_join,
+    process_split, process_extract_first, process_extract_index
+)
+
+# 与 parsel 一致，支持 re:test 等 EXSLT 正则函数
+XPATH_NAMESPACES = {'re': 'http://exslt.org/regular-expressions'}
+
+# 索引特殊值：999 = 获取所有元素
+INDEX_ALL = 999
+
+
+def _to_str(node) -> str:
+    """将XPath结果转换为字符串（与 parsel Selector.get() 保持一致）"""
+    try:
+        return etree.tostring(node, method='html', encoding='unicode', with_tail=False)
+    except (AttributeError, TypeError):
+        if node is True:
+            return '1'
+        if node is False:
+            return '0'
+        return str(node)
+
+
+def _all_nodes(result) -> List:
+    """XPath结果统一为列表（数值、布尔、字符串结果包装为单元素列表）"""
+    return result if isinstance(result, list) else [result]
+
+
+@dataclass(frozen=True)
+class PostProcessChain:
+    """后处理链（每一步为 (方法名, 预绑定函数)）"""
+    steps: Tuple[Tuple[str, Callable[[Any], Any]], ...] = ()
+
+    def __call__(self, data: Any) -> Any:
+        for method, func in self.steps:
+            try:
+                data = func(data)
+            except Exception as e:
+                logger.warning(f"⚠️  后处理失败 ({method}): {e}")
+        return data
+
+    def __bool__(self) -> bool:
+        return bool(self.steps)
+
+
+@dataclass(frozen=True)
+class FieldPlan:
+    """单个字段的解析计划（对应一个解析器配置）"""
+    expression: str
+    xpath: Optional[etree.XPath] = None
+    regex: Optional[Pattern] = None
+    index: Optional[int] = 0
+    default: Any = None
+    process: PostProcessChain = PostProcessChain()
+
+    def values(self, doc: HtmlDocument) -> List:
+        """提取所有匹配结果"""
+        if self.xpath is not None:
+            return [_to_str(node) for node in _all_nodes(self.xpath(doc.root))]
+        if self.regex is not None:
+            return self.regex.findall(doc.html)
+        # 编译失败的表达式（编译时已告警），直接走默认值
+        return []
+
+    def execute(self, doc: HtmlDocument) -> Any:
+        """执行解析（语义与 HtmlParser.parse_with_config 一致）"""
+        try:
+            all_results = self.values(doc)
+
+            if self.index is None or self.index == INDEX_ALL:
+                result = all_results
+            elif all_results:
+                try:
+                    result = all_results[self.index]
+                except IndexError:
+                    logger.warning(f"⚠️  索引 {self.index} 超出范围，共 {len(all_results)} 个元素")
+                    result = None
+            else:
+                result = None
+
+            if result is not None and self.process:
+                result = self.process(result)
+
+            if result is None or (isinstance(result, list) and len(result) == 0):
+                result = self.default
+        except Exception as e:
+            logger.warning(f"⚠️  解析失败: {e}")
+            result = self.default
+
+        return result
+
+    def first(self, node) -> Optional[str]:
+        """在节点上执行XPath并返回第一个结果（章节列表条目使用，不做后处理）"""
+        results = _all_nodes(self.xpath(node))
+        return _to_str(results[0]) if results else None
+
+
+@dataclass(frozen=True)
+class ChapterListPlan:
+    """章节列表解析计划"""
+    items: etree.XPath
+    title: FieldPlan
+    url: FieldPlan
+    pagination_enabled: bool = False
+    max_page: Optional[FieldPlan] = None
+    max_page_manual: Any = 100
+
+    def extract(self, doc: HtmlDocument) -> List[Tuple[str, str]]:
+        """
+        从页面提取章节条目
+        :return: [(标题, 相对URL), ...]（已应用后处理）
+        """
+        entries = []
+        for item in _all_nodes(self.items(doc.root)):
+            try:
+                title = self.title.first(item)
+                url = self.url.first(item)
+                if title and url:
+                    if self.title.process:
+                        title = self.title.process(title)
+                    if self.url.process:
+                        url = self.url.process(url)
+                    entries.append((title, url))
+            except Exception as e:
+                logger.warning(f"⚠️  解析章节项失败: {e}")
+        return entries
+
+
+@dataclass(frozen=True)
+class ChapterContentPlan:
+    """章节内容解析计划"""
+    content: FieldPlan
+    next_page_enabled: bool = False
+    max_page: Optional[FieldPlan] = None
+    max_pages_manual: Any = 5
+    clean: PostProcessChain = PostProcessChain()
+
+
+@dataclass(frozen=True)
+class ExtractionPlan:
+    """整份配置的解析计划"""
+    novel_info: Tuple[Tuple[str, FieldPlan], ...] = ()
+    chapter_list: Optional[ChapterListPlan] = None
+    chapter_content: Optional[ChapterContentPlan] = None
+
+
+# ==================== 编译 ====================
+
+def _compile_xpath(expression: str) -> Optional[etree.XPath]:
+    """编译XPath，失败时返回None（执行时返回默认值）"""
+    try:
+        return etree.XPath(expression, namespaces=XPATH_NAMESPACES, smart_strings=False)
+    except Exception as e:
+        logger.warning(f"⚠️  XPath编译失败: {expression!r} ({e})")
+        return None
+
+
+def compile_post_process(processes: List[Dict]) -> PostProcessChain:
+    """
+    编译后处理链
+    :param processes: 处理步骤列表（同 HtmlParser.apply_post_process）
+    :return: PostProcessChain
+    """
+    steps = []
+    for process in processes or []:
+        method = process.get('method', '')
+        params = process.get('params', {})
+
+        try:
+            if method == 'strip':
+                func = partial(process_strip, chars=params.get('chars', None))
+            elif method == 'replace':
+                func = partial(process_replace, old=params.get('old', ''), new=params.get('new', ''))
+            elif method == 'regex_replace':
+                func = partial(process_regex_replace, pattern=re.compile(params.get('pattern', '')),
+                               repl=params.get('repl', ''))
+            elif method == 'join':
+                func = partial(process_join, separator=params.get('separator', ''))
+            elif method == 'split':
+                func = partial(process_split, separator=params.get('separator', ' '))
+            elif method == 'extract_first':
+                func = process_extract_first
+            elif method == 'extract_index':
+                func = partial(process_extract_index, idx=params.get('index', 0))
+            else:
+                logger.warning(f"⚠️  不支持的后处理方法: {method}")
+                continue
+        except Exception as e:
+            logger.warning(f"⚠️  后处理编译失败 ({method}): {e}")
+            continue
+
+        steps.append((method, func))
+
+    return PostProcessChain(tuple(steps))
+
+
+def compile_field(parser_config: Dict, force_xpath: bool = False) -> FieldPlan:
+    """
+    编译单个解析器配置
+    :param parser_config: 解析器配置（同 HtmlParser.parse_with_config）
+    :param force_xpath: 忽略type强制按XPath编译（章节列表条目内的title/url）
+    :return: FieldPlan
+    """
+    if not isinstance(parser_config, dict):
+        logger.warning(f"⚠️  parser_config 应为字典类型，实际为 {type(parser_config).__name__}，值为: {parser_config}")
+        return FieldPlan(expression='')
+
+    parse_type = 'xpath' if force_xpath else parser_config.get('type', 'xpath')
+    expression = parser_config.get('expression', '')
+    default = parser_config.get('default', None)
+    index = HtmlParser._safe_int(parser_config.get('index', 0), 0)
+    process = compile_post_process(parser_config.get('process', []))
+
+    xpath = None
+    regex = None
+    if parse_type == 'xpath':
+        xpath = _compile_xpath(expression)
+    elif parse_type == 'regex':
+        try:
+            regex = re.compile(expression)
+        except re.error as e:
+            logger.warning(f"⚠️  正则编译失败: {expression!r} ({e})")
+    else:
+        logger.warning(f"⚠️  不支持的解析类型: {parse_type}")
+
+    return FieldPlan(expression=expression, xpath=xpath, regex=regex, index=index,
+                     default=default, process=process)
+
+
+def compile_chapter_list(chapter_list_config: Dict) -> Optional[ChapterListPlan]:
+    """
+    编译章节列表配置
+    配置不完整时返回None，由爬虫回退到逐次解释的路径（并给出原有的错误信息）
+    """
+    if not isinstance(chapter_list_config, dict):
+        return None
+
+    items_config = chapter_list_config.get('items')
+    title_config = chapter_list_config.get('title')
+    url_config = chapter_list_config.get('url')
+    if not all(isinstance(c, dict) and c.get('expression') for c in (items_config, title_config, url_config)):
+        return None
+
+    items = _compile_xpath(items_config['expression'])
+    title = compile_field(title_config, force_xpath=True)
+    url = compile_field(url_config, force_xpath=True)
+    if items is None or title.xpath is None or url.xpath is None:
+        return None
+
+    pagination_config = chapter_list_config.get('pagination') or {}
+    max_page_config = pagination_config.get('max_page_xpath') or pagination_config.get('max_page')
+
+    return ChapterListPlan(
+        items=items,
+        title=title,
+        url=url,
+        pagination_enabled=bool(pagination_config.get('enabled', False)),
+        max_page=compile_field(max_page_config) if max_page_config else None,
+        max_page_manual=pagination_config.get('max_page_manual', 100)
+    )
+
+
+def compile_chapter_content(chapter_content_config: Dict) -> Optional[ChapterContentPlan]:
+    """编译章节内容配置"""
+    if not isinstance(chapter_content_config, dict):
+        return None
+
+    next_page_config = chapter_content_config.get('next_page', {}) or chapter_content_config.get('pagination', {})
+    max_page_config = next_page_config.get('max_page_xpath')
+    clean_config = chapter_content_config.get('clean', [])
+
+    return ChapterContentPlan(
+        content=compile_field(chapter_content_config.get('content', {})),
+        next_page_enabled=bool(next_page_config and next_page_config.get('enabled', False)),
+        max_page=compile_field(max_page_config) if max_page_config else None,
+        max_pages_manual=next_page_config.get('max_pages_manual') or chapter_content_config.get('max_pages', 5),
+        clean=compile_post_process(clean_config)
+    )
+
+
+def compile_plan(parsers: Dict) -> ExtractionPlan:
+    """
+    编译整份解析器配置
+    :param parsers: 配置中的 parsers 字段
+    :return: ExtractionPlan
+    """
+    novel_info_config = parsers.get('novel_info', {})
+    novel_info = ()
+    if isinstance(novel_info_config, dict):
+        novel_info = tuple(
+            (field, compile_field(parser_config))
+            for field, parser_config in novel_info_config.items()
+            if not field.startswith('_')
+        )
+
+    return ExtractionPlan(
+        novel_info=novel_info,
+        chapter_list=compile_chapter_list(parsers.get('chapter_list', {})),
+        chapter_content=compile_chapter_content(parsers.get('chapter_content', {}))
+    )
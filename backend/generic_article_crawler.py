@@ -30,8 +30,12 @@ from shared.utils.config import DB_CONFIG, REDIS_CONFIG
 from backend.models.database import NovelDatabase
 from shared.utils.proxy_utils import ProxyUtils
 from backend.config_manager import ConfigManager
-from backend.parser import HtmlParser
+from backend.parser import HtmlParser, HtmlDocument
 from backend.content_fetcher import ContentFetcher
+from backend.rate_limiter import create_rate_limiter
+from backend.adaptive_concurrency import create_adaptive_concurrency
+from backend.retry_policy import RetryPolicy, RetryBudget
+from backend.circuit_breaker import create_circuit_breakers
 
 # 从配置读取Redis连接信息
 REDIS_URL = f"redis://{REDIS_CONFIG['host']}:{REDIS_CONFIG['port']}/{REDIS_CONFIG['db']}"
@@ -69,8 +73,9 @@ class GenericArticleCrawler:
         self.site_name = site_info.get('name')
         self.base_url = site_info.get('base_url')
 
-        # 初始化HTML解析器
+        # 初始化HTML解析器和预编译的解析计划
         self.parser = HtmlParser(self.base_url)
+        self.plan = self.config_manager.get_extraction_plan()
 
         # 初始化代理工具
         proxy_utils = None
@@ -78,12 +83,28 @@ class GenericArticleCrawler:
             proxy_utils = ProxyUtils()
             self._log('INFO', "✅ 已启用代理")
 
-        # 初始化内容获取器
+        # 自适应并发（AIMD）：从 max_workers 起步，请求过载时按主机降低并发，最多恢复到 max_workers
+        self.adaptive_concurrency = create_adaptive_concurrency(
+            self.config_manager.get_adaptive_concurrency(max_workers), initial=max_workers
+        )
+        # 下载线程数、asyncio并发请求数都不超过 max_workers（任务队列分配的线程预算）
+        self.download_workers = max_workers
+
+        # 初始化内容获取器（重试预算按任务计算）
+        retry_config = self.config_manager.get_retry_config()
         self.fetcher = ContentFetcher(
             headers=self.config_manager.get_headers(),
             timeout=self.config_manager.get_timeout(),
             encoding=self.config_manager.get_encoding(),
-            proxy_utils=proxy_utils
+            proxy_utils=proxy_utils,
+            pool_size=self.config_manager.get_pool_size(self.download_workers),
+            rate_limiter=create_rate_limiter(*self.config_manager.get_rate_limit()),
+            adaptive_concurrency=self.adaptive_concurrency,
+            retry_policy=RetryPolicy(retry_config['base_delay'], retry_config['max_delay'],
+                                     retry_config['max_retry_after']),
+            retry_budget=RetryBudget(retry_config['budget_ratio'], retry_config['budget_min']),
+            stop_flag=stop_flag,
+            circuit_breakers=create_circuit_breakers(self.config_manager.get_circuit_breaker(), redis_cli)
         )
 
         # 数据存储
@@ -140,6 +161,12 @@ class GenericArticleCrawler:
                     'failed': kwargs.get('failed', self.failed_count),
                     'current': kwargs.get('current', ''),
                 }
+                # 连接池统计（新建/复用的连接数）
+                connection_stats = self.fetcher.get_connection_stats()
+                progress_data['connections_opened'] = connection_stats['opened']
+                progress_data['connections_reused'] = connection_stats['reused']
+                # 当前有效并发数（自适应并发启用时为主机的AIMD上限）
+                progress_data['concurrency'] = self.fetcher.get_concurrency_level(self.start_url) or self.max_workers
                 progress_data.update(kwargs)
                 self.progress_callback(**progress_data)
             except Exception as e:
@@ -177,21 +204,18 @@ class GenericArticleCrawler:
         except Exception as e:
             logger.warning(f"⚠️  Redis记录失败失败: {e}")
 
-    def parse_site_info(self, html: str) -> Dict:
+    def parse_site_info(self, html) -> Dict:
         """解析网站/页面信息（类似parse_novel_info）"""
         site_data = {}
+        doc = self.parser.document(html)
         parsers = self.config_manager.get_parsers().get('novel_info', {})
 
         if not isinstance(parsers, dict):
             return site_data
 
-        for field, parser_config in parsers.items():
-            if field.startswith('_'):
-                continue
-
+        for field, field_plan in self.plan.novel_info:
             try:
-                value = self.parser.parse_with_config(html, parser_config)
-                site_data[field] = value
+                site_data[field] = field_plan.execute(doc)
             except Exception as e:
                 logger.warning(f"⚠️  解析字段 {field} 失败: {e}")
                 site_data[field] = None
@@ -204,13 +228,16 @@ class GenericArticleCrawler:
         self._update_progress(stage='parsing_list', detail='正在获取列表页...')
 
         try:
-            html = self.fetcher.get_page(self.start_url)
+            html = self.fetcher.get_page(self.start_url, max_retries=self.config_manager.get_max_retries())
             if not html:
                 self._log('ERROR', f"❌ 获取列表页失败: {self.start_url}")
                 return False
 
+            # 列表页只解析一次，网站信息和文章列表共用
+            doc = HtmlDocument(html)
+
             # 解析网站/页面信息
-            self.site_info_data = self.parse_site_info(html)
+            self.site_info_data = self.parse_site_info(doc)
             self._log('INFO', f"📊 网站信息: {self.site_info_data}")
 
             # 获取chapter_list配置（复用配置结构）
@@ -220,7 +247,7 @@ class GenericArticleCrawler:
                 return False
 
             # 解析文章列表
-            self.articles = self._parse_article_items(html, chapter_list_config)
+            self.articles = self._parse_article_items(doc, chapter_list_config)
             
             if not self.articles:
                 self._log('WARNING', "⚠️  未找到文章")
@@ -240,8 +267,11 @@ class GenericArticleCrawler:
             logger.exception(e)
             return False
 
-    def _parse_article_items(self, html: str, config: Dict) -> List[Dict]:
-        """解析文章列表项"""
+    def _parse_article_items(self, html, config: Dict) -> List[Dict]:
+        """
+        解析文章列表项
+        :param html: HTML内容或已解析文档
+        """
         articles = []
         
         try:
@@ -262,13 +292,16 @@ class GenericArticleCrawler:
             # 遍历每个文章容器
             for idx, item_html in enumerate(items_html, 1):
                 try:
+                    # 每个文章容器只解析一次，标题和URL共用
+                    item_doc = HtmlDocument(item_html)
+
                     # 解析标题
                     title_config = config.get('title', {})
-                    title = self.parser.parse_with_config(item_html, title_config) if title_config else f"文章{idx}"
+                    title = self.parser.parse_with_config(item_doc, title_config) if title_config else f"文章{idx}"
 
                     # 解析URL
                     url_config = config.get('url', {})
-                    url = self.parser.parse_with_config(item_html, url_config) if url_config else ''
+                    url = self.parser.parse_with_config(item_doc, url_config) if url_config else ''
 
                     if url:
                         # 转换为完整URL
@@ -299,10 +332,18 @@ class GenericArticleCrawler:
     def parse_article_content(self, article_url: str) -> Optional[str]:
         """解析单篇文章内容"""
         try:
-            html = self.fetcher.get_page(article_url)
+            html = self.fetcher.get_page(article_url, max_retries=self.config_manager.get_max_retries())
             if not html:
                 return None
+            return self.parse_article_html(html, article_url)
+
+        except Exception as e:
+            logger.error(f"❌ 解析文章内容失败 [{article_url}]: {e}")
+            return None
 
+    def parse_article_html(self, html: str, article_url: str) -> Optional[str]:
+        """从已获取的HTML中提取文章内容（纯CPU操作，异步引擎会放到线程池执行）"""
+        try:
             # 获取content配置
             content_config = self.config_manager.get_parsers().get('chapter_content', {})
             if not content_config:
@@ -315,7 +356,7 @@ class GenericArticleCrawler:
                 self._log('ERROR', "❌ 未配置content字段")
                 return None
 
-            content = self.parser.parse_with_config(html, content_parser)
+            content = self.plan.chapter_content.content.execute(HtmlDocument(html))
             
             if not content:
                 self._log('WARNING', f"⚠️  未提取到内容: {article_url}")
@@ -329,35 +370,58 @@ class GenericArticleCrawler:
 
     def download_article(self, article: Dict) -> bool:
         """下载单篇文章"""
-        article_num = article['num']
-        title = article['title']
-        url = article['url']
-
         # 检查是否已停止
         if self._check_stop():
-            self._log('WARNING', f"⏸️  用户停止，跳过: [{article_num}] {title}")
+            self._log('WARNING', f"⏸️  用户停止，跳过: [{article['num']}] {article['title']}")
             return False
 
         # 检查是否已下载
-        if self.is_article_downloaded(url):
-            with self.progress_lock:
-                self.skipped_count += 1
-            self._log('INFO', f"⏭️  已下载，跳过: [{article_num}] {title}")
+        if self._skip_if_downloaded(article):
             return True
 
         try:
-            # 更新进度
-            with self.progress_lock:
-                self._update_progress(current=f"[{article_num}] {title}")
+            self._report_article_start(article)
 
             # 解析内容
-            content = self.parse_article_content(url)
-            if not content:
-                with self.progress_lock:
-                    self.mark_article_failed(url)
-                self._log('ERROR', f"❌ 下载失败: [{article_num}] {title}")
-                return False
+            content = self.parse_article_content(article['url'])
+            return self._save_article(article, content)
+
+        except Exception as e:
+            return self._fail_article(article, e)
+
+    def _skip_if_downloaded(self, article: Dict) -> bool:
+        """文章已下载时计入跳过，返回是否跳过"""
+        if not self.is_article_downloaded(article['url']):
+            return False
+
+        with self.progress_lock:
+            self.skipped_count += 1
+        self._log('INFO', f"⏭️  已下载，跳过: [{article['num']}] {article['title']}")
+        return True
+
+    def _report_article_start(self, article: Dict):
+        """更新当前文章进度"""
+        with self.progress_lock:
+            self._update_progress(current=f"[{article['num']}] {article['title']}")
+
+    def _save_article(self, article: Dict, content: Optional[str]) -> bool:
+        """
+        保存已解析的文章内容并更新Redis记录（两种下载引擎共用）
+        :param article: 文章信息
+        :param content: 文章内容（为空表示下载失败）
+        :return: 是否保存成功
+        """
+        article_num = article['num']
+        title = article['title']
+        url = article['url']
+
+        if not content:
+            with self.progress_lock:
+                self.mark_article_failed(url)
+            self._log('ERROR', f"❌ 下载失败: [{article_num}] {title}")
+            return False
 
+        try:
             # 保存到数据库（复用chapter表结构）
             success = self.db.save_chapter(
                 novel_id=self.novel_id,
@@ -366,26 +430,40 @@ class GenericArticleCrawler:
                 content=content,
                 chapter_url=url
             )
-
-            if success:
-                with self.progress_lock:
-                    self.completed_count += 1
-                    self.mark_article_success(url)
-                self._log('SUCCESS', f"✅ [{article_num}] {title}")
-                return True
-            else:
-                with self.progress_lock:
-                    self.mark_article_failed(url)
-                self._log('ERROR', f"❌ 保存失败: [{article_num}] {title}")
-                return False
-
         except Exception as e:
+            return self._fail_article(article, e)
+
+        if success:
+            with self.progress_lock:
+                self.completed_count += 1
+                self.mark_article_success(url)
+            self._log('SUCCESS', f"✅ [{article_num}] {title}")
+            return True
+        else:
             with self.progress_lock:
                 self.mark_article_failed(url)
-            self._log('ERROR', f"❌ 下载异常: [{article_num}] {title} - {e}")
-            logger.exception(e)
+            self._log('ERROR', f"❌ 保存失败: [{article_num}] {title}")
             return False
 
+    def _fail_article(self, article: Dict, error: Exception) -> bool:
+        """记录文章下载异常"""
+        with self.progress_lock:
+            self.mark_article_failed(article['url'])
+        self._log('ERROR', f"❌ 下载异常: [{article['num']}] {article['title']} - {error}")
+        logger.exception(error)
+        return False
+
+    def _report_download_progress(self):
+        """更新整体下载进度（每篇文章完成后调用）"""
+        with self.progress_lock:
+            self._update_progress(
+                stage='downloading',
+                detail=f'已完成 {self.completed_count}/{len(self.articles)}',
+                total=len(self.articles),
+                completed=self.completed_count,
+                failed=self.failed_count
+            )
+
     def download_all_articles(self) -> bool:
         """并发下载所有文章"""
         if not self.articles:
@@ -398,7 +476,33 @@ class GenericArticleCrawler:
         start_time = time.time()
         self._update_progress(stage='downloading', detail='正在下载文章...', total=len(self.articles))
 
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+        # asyncio引擎不可用时回退到线程池
+        use_async = self.config_manager.get_engine() == 'asyncio'
+        if not use_async or not self._download_articles_async():
+            self._download_articles_threaded()
+
+        elapsed = time.time() - start_time
+        self._log('SUCCESS', f"⏱️  下载耗时: {elapsed:.2f}秒")
+        self._log('SUCCESS', f"✅ 成功: {self.completed_count} | ⏭️  跳过: {self.skipped_count} | ❌ 失败: {self.failed_count}")
+
+        return self.completed_count > 0
+
+    def _download_articles_async(self) -> bool:
+        """使用asyncio引擎下载所有文章，引擎不可用时返回False"""
+        try:
+            from backend.async_engine import AsyncCrawlEngine
+        except ImportError as e:
+            self._log('WARNING', f"⚠️  asyncio引擎不可用（{e}），改用线程池")
+            return False
+
+        concurrency = self.config_manager.get_async_concurrency(self.max_workers)
+        self._log('INFO', f"⚡ 使用asyncio引擎 (并发数: {concurrency})")
+        AsyncCrawlEngine(self, concurrency).run_articles(self.articles)
+        return True
+
+    def _download_articles_threaded(self):
+        """使用线程池下载所有文章"""
+        with ThreadPoolExecutor(max_workers=self.download_workers) as executor:
             futures = {
                 executor.submit(self.download_article, article): article
                 for article in self.articles
@@ -417,20 +521,7 @@ class GenericArticleCrawler:
                     self._log('ERROR', f"❌ 文章 [{article['num']}] 下载异常: {e}")
 
                 # 更新进度
-                with self.progress_lock:
-                    self._update_progress(
-                        stage='downloading',
-                        detail=f'已完成 {self.completed_count}/{len(self.articles)}',
-                        total=len(self.articles),
-                        completed=self.completed_count,
-                        failed=self.failed_count
-                    )
-
-        elapsed = time.time() - start_time
-        self._log('SUCCESS', f"⏱️  下载耗时: {elapsed:.2f}秒")
-        self._log('SUCCESS', f"✅ 成功: {self.completed_count} | ⏭️  跳过: {self.skipped_count} | ❌ 失败: {self.failed_count}")
-
-        return self.completed_count > 0
+                self._report_download_progress()
 
     def save_site_info(self) -> bool:
         """保存网站/内容集信息到数据库（复用novel表）"""
@@ -512,6 +603,10 @@ class GenericArticleCrawler:
             self._log('ERROR', f"❌ 爬取失败: {e}")
             logger.exception(e)
 
+        finally:
+            # 释放HTTP连接池
+            self.fetcher.close()
+
 
 def main():
     """命令行入口"""
@@ -8,6 +8,8 @@
 - ContentFetcher: HTTP请求
 - GenericNovelCrawler: 核心爬虫逻辑和任务协调
 """
+import hashlib
+import json
 import re
 import sys
 import time
@@ -19,7 +21,7 @@ from urllib.parse import urljoin, urlparse
 
 from loguru import logger
 from redis import Redis
-from scrapy import Selector
+from redis.exceptions import ResponseError
 
 # 添加项目根目录到路径
 project_root = Path(__file__).parent.parent
@@ -29,8 +31,16 @@ from shared.utils.config import DB_CONFIG, REDIS_CONFIG
 from backend.models.database import NovelDatabase
 from shared.utils.proxy_utils import ProxyUtils
 from backend.config_manager import ConfigManager
-from backend.parser import HtmlParser
+from backend.parser import HtmlParser, HtmlDocument
+from backend.extraction_plan import FieldPlan
 from backend.content_fetcher import ContentFetcher
+from backend.rate_limiter import create_rate_limiter
+from backend.adaptive_concurrency import create_adaptive_concurrency
+from backend.retry_policy import RetryPolicy, RetryBudget
+from backend.circuit_breaker import create_circuit_breakers
+from backend.chapter_sink import ChapterSink
+from backend.task_checkpoint import TaskCheckpoint
+from backend.chapter_record import ChapterRecord, build_records, DONE, FAILED
 
 # 从配置读取Redis连接信息（支持Docker环境变量）
 REDIS_URL = f"redis://{REDIS_CONFIG['host']}:{REDIS_CONFIG['port']}/{REDIS_CONFIG['db']}"
@@ -41,7 +51,8 @@ class GenericNovelCrawler:
     """通用小说爬虫 - 模块化版本"""
 
     def __init__(self, config_file: str, book_id: str, max_workers: int = 5, use_proxy: bool = False,
-                 progress_callback=None, log_callback=None, stop_flag=None):
+                 progress_callback=None, log_callback=None, stop_flag=None, incremental: bool = False,
+                 task_id: Optional[str] = None):
         """
         初始化爬虫
         :param config_file: 配置文件路径
@@ -51,10 +62,13 @@ class GenericNovelCrawler:
         :param progress_callback: 进度回调函数 (total, completed, failed, current_chapter)
         :param log_callback: 日志回调函数 (level, message)
         :param stop_flag: 停止标志 (threading.Event)
+        :param incremental: 增量更新模式（只从目录末尾获取上次之后的新章节）
+        :param task_id: 任务ID（指定时保存检查点，服务重启后从检查点恢复）
         """
         self.book_id = book_id
         self.max_workers = max_workers
         self.use_proxy = use_proxy
+        self.incremental = incremental
 
         # 回调函数
         self.progress_callback = progress_callback
@@ -76,8 +90,9 @@ class GenericNovelCrawler:
         
         self.url_templates = self.config_manager.get_url_templates()
 
-        # 初始化HTML解析器
+        # 初始化HTML解析器和预编译的解析计划
         self.parser = HtmlParser(self.base_url)
+        self.plan = self.config_manager.get_extraction_plan()
 
         # 初始化代理工具
         proxy_utils = None
@@ -85,27 +100,57 @@ class GenericNovelCrawler:
             proxy_utils = ProxyUtils()
             self._log('INFO', "✅ 已启用代理")
 
-        # 初始化内容获取器
+        # 自适应并发（AIMD）：从 max_workers 起步，请求过载时按主机降低并发，最多恢复到 max_workers
+        self.adaptive_concurrency = create_adaptive_concurrency(
+            self.config_manager.get_adaptive_concurrency(max_workers), initial=max_workers
+        )
+        # 下载线程数、asyncio并发请求数都不超过 max_workers（任务队列分配的线程预算）
+        self.download_workers = max_workers
+
+        # 初始化内容获取器（重试预算按任务计算）
+        retry_config = self.config_manager.get_retry_config()
         self.fetcher = ContentFetcher(
             headers=self.config_manager.get_headers(),
             timeout=self.config_manager.get_timeout(),
             encoding=self.config_manager.get_encoding(),
-            proxy_utils=proxy_utils
+            proxy_utils=proxy_utils,
+            pool_size=self.config_manager.get_pool_size(self.download_workers),
+            rate_limiter=create_rate_limiter(*self.config_manager.get_rate_limit()),
+            adaptive_concurrency=self.adaptive_concurrency,
+            retry_policy=RetryPolicy(retry_config['base_delay'], retry_config['max_delay'],
+                                     retry_config['max_retry_after']),
+            retry_budget=RetryBudget(retry_config['budget_ratio'], retry_config['budget_min']),
+            stop_flag=stop_flag,
+            circuit_breakers=create_circuit_breakers(self.config_manager.get_circuit_breaker(), redis_cli),
+            # 章节下载线程和章节分页线程同时进行的请求数合计不超过 max_workers
+            max_concurrency=self.download_workers
         )
 
-        # 数据存储
-        self.chapters = []
+        # 章节分页并发获取使用的线程池（首次需要时创建）
+        self._page_executor: Optional[ThreadPoolExecutor] = None
+        self._page_executor_lock = Lock()
+
+        # 数据存储（章节工作项不保存正文，正文落库后即释放）
+        self.chapters: List[ChapterRecord] = []
         self.novel_info = {}
         self.novel_id = None
+        self.chapter_sink: Optional[ChapterSink] = None
+        # 增量模式下 self.chapters 只包含新章节，章节号 = chapter_offset + 索引 + 1
+        self.chapter_offset = 0
+        # 完整获取目录后计算的目录指纹（页数+最后一页章节URL），用于下次增量更新
+        self.catalog_fingerprint: Optional[str] = None
         # 使用单例模式获取数据库连接
         from backend.models.database import get_database
         self.db = get_database(**DB_CONFIG, silent=True)
+        # 任务检查点（由任务管理器启动时使用）
+        self.checkpoint: Optional[TaskCheckpoint] = TaskCheckpoint(self.db, task_id) if task_id else None
 
         # 并发配置
         self.progress_lock = Lock()
         self.completed_count = 0
         self.skipped_count = 0
         self.failed_count = 0  # 内存中维护失败计数，避免频繁查Redis
+        self.total_words = 0  # 本次运行保存的总字数（章节落库时累加）
 
         # Redis配置
         self.redis_cli = redis_cli
@@ -151,6 +196,12 @@ class GenericNovelCrawler:
                     'failed': kwargs.get('failed', self.failed_count),
                     'current': kwargs.get('current', ''),
                 }
+                # 连接池统计（新建/复用的连接数）
+                connection_stats = self.fetcher.get_connection_stats()
+                progress_data['connections_opened'] = connection_stats['opened']
+                progress_data['connections_reused'] = connection_stats['reused']
+                # 当前有效并发数（自适应并发启用时为主机的AIMD上限）
+                progress_data['concurrency'] = self.fetcher.get_concurrency_level(self.base_url) or self.max_workers
                 # 合并其他自定义参数
                 progress_data.update(kwargs)
                 self.progress_callback(**progress_data)
@@ -171,15 +222,46 @@ class GenericNovelCrawler:
             logger.warning(f"⚠️  Redis检查失败: {e}")
             return False
 
+    def filter_downloaded(self, chapter_urls: List[str]) -> List[bool]:
+        """
+        批量检查章节是否已下载（一次 SMISMEMBER，服务端不支持时改用管道批量 SISMEMBER）
+        :return: 与 chapter_urls 一一对应的是否已下载
+        """
+        if not chapter_urls:
+            return []
+        try:
+            try:
+                return [bool(hit) for hit in self.redis_cli.smismember(self.redis_success_key, chapter_urls)]
+            except ResponseError:
+                # Redis < 6.2 不支持 SMISMEMBER
+                pipe = self.redis_cli.pipeline(transaction=False)
+                for url in chapter_urls:
+                    pipe.sismember(self.redis_success_key, url)
+                return [bool(hit) for hit in pipe.execute()]
+        except Exception as e:
+            logger.warning(f"⚠️  Redis批量检查失败: {e}")
+            return [False] * len(chapter_urls)
+
     def mark_chapter_success(self, chapter_url: str):
         """
         标记章节下载成功
         注意：调用此方法时应该已经在progress_lock内
         """
+        self.mark_chapters_success([chapter_url])
+
+    def mark_chapters_success(self, chapter_urls: List[str]):
+        """
+        批量标记章节下载成功（一次管道往返）
+        注意：调用此方法时应该已经在progress_lock内
+        """
+        if not chapter_urls:
+            return
         try:
-            self.redis_cli.sadd(self.redis_success_key, chapter_url)
-            self.redis_cli.srem(self.redis_failed_key, chapter_url)
-            self.redis_cli.expire(self.redis_success_key, 30 * 24 * 3600)
+            pipe = self.redis_cli.pipeline(transaction=False)
+            pipe.sadd(self.redis_success_key, *chapter_urls)
+            pipe.srem(self.redis_failed_key, *chapter_urls)
+            pipe.expire(self.redis_success_key, 30 * 24 * 3600)
+            pipe.execute()
         except Exception as e:
             logger.warning(f"⚠️  Redis记录成功失败: {e}")
 
@@ -188,11 +270,22 @@ class GenericNovelCrawler:
         标记章节下载失败
         注意：调用此方法时应该已经在progress_lock内
         """
+        self.mark_chapters_failed([chapter_url])
+
+    def mark_chapters_failed(self, chapter_urls: List[str]):
+        """
+        批量标记章节下载失败（一次管道往返）
+        注意：调用此方法时应该已经在progress_lock内
+        """
+        if not chapter_urls:
+            return
         try:
-            self.redis_cli.sadd(self.redis_failed_key, chapter_url)
-            self.redis_cli.expire(self.redis_failed_key, 7 * 24 * 3600)
+            pipe = self.redis_cli.pipeline(transaction=False)
+            pipe.sadd(self.redis_failed_key, *chapter_urls)
+            pipe.expire(self.redis_failed_key, 7 * 24 * 3600)
+            pipe.execute()
             # 更新内存中的失败计数
-            self.failed_count += 1
+            self.failed_count += len(chapter_urls)
         except Exception as e:
             logger.warning(f"⚠️  Redis记录失败失败: {e}")
 
@@ -219,9 +312,13 @@ class GenericNovelCrawler:
         except Exception as e:
             logger.warning(f"⚠️  清除失败记录失败: {e}")
 
-    def parse_novel_info(self, html: str) -> Dict:
-        """解析小说信息"""
+    def parse_novel_info(self, html) -> Dict:
+        """
+        解析小说信息
+        :param html: HTML内容或已解析文档（所有字段共享同一棵解析树）
+        """
         novel_info = {}
+        doc = self.parser.document(html)
         parsers = self.config_manager.get_parsers().get('novel_info', {})
 
         # 验证配置类型
@@ -229,14 +326,9 @@ class GenericNovelCrawler:
             logger.error(f"❌ novel_info 配置应为字典类型，实际为 {type(parsers).__name__}")
             return novel_info
 
-        for field, parser_config in parsers.items():
-            # 跳过注释字段
-            if field.startswith('_'):
-                continue
-
+        for field, field_plan in self.plan.novel_info:
             try:
-                value = self.parser.parse_with_config(html, parser_config)
-                novel_info[field] = value
+                novel_info[field] = field_plan.execute(doc)
             except Exception as e:
                 logger.warning(f"⚠️  解析字段 {field} 失败: {e}")
                 novel_info[field] = None
@@ -255,8 +347,11 @@ class GenericNovelCrawler:
             self._log('ERROR', "❌ 获取首页失败")
             return False
 
+        # 首页只解析一次，小说信息、最大页数、章节列表共用
+        doc = HtmlDocument(html)
+
         # 解析小说信息（可选步骤）
-        self.novel_info = self.parse_novel_info(html)
+        self.novel_info = self.parse_novel_info(doc)
 
         if self.novel_info and self.novel_info.get('title'):
             # 有配置novel_info且成功解析
@@ -272,41 +367,58 @@ class GenericNovelCrawler:
 
         # 检查是否有分页
         pagination_config = chapter_list_config.get('pagination')
-        if pagination_config and pagination_config.get('enabled', False):
+        paginated = bool(pagination_config and pagination_config.get('enabled', False))
+        max_page = self._get_max_page(doc, pagination_config) if paginated else 1
+
+        # 增量更新：只获取目录末尾的新章节，无法确定时获取完整目录
+        if self.incremental and self._parse_new_chapters(doc, chapter_list_config, max_page):
+            return True
+
+        if paginated:
             # 有分页 - 使用 url_templates.chapter_list_page 构建翻页URL
-            max_page = self._get_max_page(html, pagination_config)
             logger.info(f"📄 共 {max_page} 页章节列表")
 
-            for page in range(1, max_page + 1):
-                # 更新解析进度
-                self._update_progress(
-                    stage='parsing_list',
-                    detail=f'正在解析第 {page}/{max_page} 页章节列表',
-                    current=f'章节列表第 {page}/{max_page} 页',
-                    total=0,  # 此时还不知道总章节数
-                    completed=len(self.chapters)
-                )
-
-                if page == 1:
-                    page_html = html
-                else:
-                    # 使用 url_templates.chapter_list_page 构建URL
-                    page_url = self._build_pagination_url(page)
-                    if not page_url:
-                        logger.info(f"ℹ️ URL模板 'chapter_list_page' 未配置，跳过翻页")
-                        break
-                    
-                    logger.info(f"📄 获取第 {page} 页: {page_url}")
-                    page_html = self.fetcher.get_page(page_url,
-                                                      max_retries=self.config_manager.get_max_retries())
-
-                    if not page_html:
-                        logger.warning(f"⚠️  第 {page} 页获取失败")
-                        break
-
-                chapters = self._parse_chapters_from_page(page_html, chapter_list_config)
-                self.chapters.extend(chapters)
-                logger.info(f"   ✓ 本页获取 {len(chapters)} 章，累计 {len(self.chapters)} 章")
+            self._update_progress(
+                stage='parsing_list',
+                detail=f'正在解析第 1/{max_page} 页章节列表',
+                current=f'章节列表第 1/{max_page} 页',
+                total=0,  # 此时还不知道总章节数
+                completed=0
+            )
+            first_page_chapters = self._parse_chapters_from_page(doc, chapter_list_config)
+
+        if paginated and self._load_cached_catalog(first_page_chapters, chapter_list_config, max_page):
+            pass  # 目录首页和最后一页都没有变化，已使用缓存的章节列表
+        elif paginated:
+            chapters = first_page_chapters
+            self.chapters.extend(build_records(chapters, len(self.chapters)))
+            logger.info(f"   ✓ 第 1 页获取 {len(chapters)} 章")
+
+            # 第2页起的URL可以一次性构建，并发获取后按页码顺序合并
+            page_urls = []
+            for page in range(2, max_page + 1):
+                # 使用 url_templates.chapter_list_page 构建URL
+                page_url = self._build_pagination_url(page)
+                if not page_url:
+                    logger.info(f"ℹ️ URL模板 'chapter_list_page' 未配置，跳过翻页")
+                    break
+                page_urls.append((page, page_url))
+
+            page_chapters = self._fetch_list_pages(page_urls, max_page, chapter_list_config)
+            last_page_chapters = chapters
+            for page, page_url in page_urls:
+                chapters = page_chapters.get(page)
+                if chapters is None:
+                    # 与逐页获取一致：某页失败时丢弃其后的页，避免章节顺序出现缺口
+                    logger.warning(f"⚠️  第 {page} 页获取失败")
+                    last_page_chapters = None
+                    break
+                self.chapters.extend(build_records(chapters, len(self.chapters)))
+                last_page_chapters = chapters
+                logger.info(f"   ✓ 第 {page} 页获取 {len(chapters)} 章，累计 {len(self.chapters)} 章")
+            if last_page_chapters is not None and len(page_urls) == max_page - 1:
+                self.catalog_fingerprint = self._catalog_fingerprint(max_page, last_page_chapters)
+                self._save_catalog_cache(max_page, first_page_chapters)
         else:
             # 无分页
             self._update_progress(
@@ -316,8 +428,9 @@ class GenericNovelCrawler:
                 total=0,
                 completed=0
             )
-            chapters = self._parse_chapters_from_page(html, chapter_list_config)
-            self.chapters.extend(chapters)
+            chapters = self._parse_chapters_from_page(doc, chapter_list_config)
+            self.chapters.extend(build_records(chapters, len(self.chapters)))
+            self.catalog_fingerprint = self._catalog_fingerprint(1, chapters)
 
         # 解析完成，更新最终进度
         logger.info(f"\n✅ 章节列表获取完成，共 {len(self.chapters)} 章\n")
@@ -330,18 +443,272 @@ class GenericNovelCrawler:
         )
         return True
 
-    def _get_max_page(self, html: str, pagination_config: Dict) -> int:
+    def _fetch_list_pages(self, page_urls: List, max_page: int, chapter_list_config: Dict) -> Dict[int, Optional[List[Dict]]]:
+        """
+        并发获取并解析章节列表分页（请求速率由ContentFetcher的限速器约束）
+        :param page_urls: [(页码, URL), ...]
+        :param max_page: 总页数（用于进度显示）
+        :param chapter_list_config: 章节列表配置
+        :return: {页码: 章节列表}，获取失败的页为None
+        """
+        results = {}
+        if not page_urls:
+            return results
+
+        fetched = 1  # 第1页已解析
+
+        with ThreadPoolExecutor(max_workers=min(self.download_workers, len(page_urls))) as executor:
+            futures = {executor.submit(self._fetch_list_page, page, page_url, chapter_list_config): page
+                       for page, page_url in page_urls}
+
+            for future in as_completed(futures):
+                page = futures[future]
+                try:
+                    results[page] = future.result()
+                except Exception as e:
+                    logger.error(f"❌ 第 {page} 页解析失败: {e}")
+                    results[page] = None
+
+                # 更新解析进度
+                fetched += 1
+                self._update_progress(
+                    stage='parsing_list',
+                    detail=f'已获取 {fetched}/{max_page} 页章节列表',
+                    current=f'章节列表第 {page}/{max_page} 页',
+                    total=0,
+                    completed=len(self.chapters)
+                )
+
+        return results
+
+    def _fetch_list_page(self, page: int, page_url: str, chapter_list_config: Dict) -> Optional[List[Dict]]:
+        """获取并解析一页章节列表，失败或收到停止信号时返回None"""
+        if self._check_stop():
+            return None
+        logger.info(f"📄 获取第 {page} 页: {page_url}")
+        page_html = self.fetcher.get_page(page_url, max_retries=self.config_manager.get_max_retries())
+        if not page_html:
+            return None
+        return self._parse_chapters_from_page(HtmlDocument(page_html), chapter_list_config)
+
+    @staticmethod
+    def _catalog_fingerprint(max_page: int, last_page_chapters: List[Dict]) -> str:
+        """目录指纹：页数 + 最后一页的章节URL（目录末尾有新章节时必然变化）"""
+        digest = hashlib.sha1(str(max_page).encode('utf-8'))
+        for chapter in last_page_chapters:
+            digest.update(b'\n' + chapter['url'].encode('utf-8'))
+        return digest.hexdigest()
+
+    def _catalog_cache_key(self) -> str:
+        return f"novel:catalog:{self.site_name}:{self.book_id}"
+
+    def _load_cached_catalog(self, first_page_chapters: List[Dict], chapter_list_config: Dict, max_page: int) -> bool:
+        """
+        使用缓存的目录：只获取目录最后一页，首页和最后一页的哈希都与缓存一致时直接使用缓存的章节列表
+        :param first_page_chapters: 目录首页的章节
+        :param chapter_list_config: 章节列表配置
+        :param max_page: 目录总页数
+        :return: 是否使用了缓存（False 时需要获取完整目录）
+        """
+        if max_page <= 2 or not self.config_manager.get_catalog_cache():
+            return False
+        try:
+            raw = self.redis_cli.get(self._catalog_cache_key())
+        except Exception as e:
+            logger.warning(f"⚠️  读取目录缓存失败: {e}")
+            return False
+        if not raw:
+            return False
+
+        try:
+            cached = json.loads(raw)
+            cached_max_page, first_page_hash = cached['max_page'], cached['first_page_hash']
+            cached_fingerprint = cached['fingerprint']
+            chapters = [ChapterRecord(index, url, title) for index, (url, title) in enumerate(cached['chapters'])]
+        except (ValueError, KeyError, TypeError) as e:
+            # 缓存损坏或是旧版本格式
+            self._log('WARNING', f"⚠️  目录缓存无效，已删除: {e}")
+            try:
+                self.redis_cli.delete(self._catalog_cache_key())
+            except Exception as e:
+                logger.warning(f"⚠️  删除目录缓存失败: {e}")
+            return False
+
+        if (cached_max_page != max_page
+                or first_page_hash != self._catalog_fingerprint(max_page, first_page_chapters)):
+            self._log('INFO', "ℹ️  目录首页已变化，获取完整目录")
+            return False
+
+        page_url = self._build_pagination_url(max_page)
+        last_page_chapters = self._fetch_list_page(max_page, page_url, chapter_list_config) if page_url else None
+        if last_page_chapters is None:
+            return False
+        fingerprint = self._catalog_fingerprint(max_page, last_page_chapters)
+        if fingerprint != cached_fingerprint:
+            self._log('INFO', "ℹ️  目录最后一页已变化，获取完整目录")
+            return False
+
+        self.chapters = chapters
+        self.catalog_fingerprint = fingerprint
+        self._log('INFO', f"📦 目录未变化，使用缓存的章节列表（共 {len(self.chapters)} 章，跳过 {max_page - 2} 页目录）")
+        return True
+
+    def _save_catalog_cache(self, max_page: int, first_page_chapters: List[Dict]):
+        """缓存完整解析的目录（章节列表 + 首页/最后一页哈希）"""
+        cache_config = self.config_manager.get_catalog_cache()
+        if max_page <= 2 or not cache_config:
+            return
+        cached = {
+            'max_page': max_page,
+            'first_page_hash': self._catalog_fingerprint(max_page, first_page_chapters),
+            'fingerprint': self.catalog_fingerprint,
+            'chapters': [[chapter.url, chapter.title] for chapter in self.chapters]
+        }
+        try:
+            self.redis_cli.set(self._catalog_cache_key(), json.dumps(cached, ensure_ascii=False), ex=cache_config['ttl'])
+        except Exception as e:
+            logger.warning(f"⚠️  保存目录缓存失败: {e}")
+
+    def _load_crawl_state(self) -> Optional[Dict]:
+        """读取上次抓取保存的状态（小说不存在或从未完整抓取时返回None）"""
+        try:
+            novel = self.db.get_novel_by_url(self.start_url)
+            if not novel:
+                return None
+            state = self.db.get_crawl_state(novel['id'])
+        except Exception as e:
+            logger.warning(f"⚠️  读取抓取状态失败: {e}")
+            return None
+        if not state or not state['last_chapter_url']:
+            return None
+        return state
+
+    def _save_crawl_state(self):
+        """
+        处理目录后保存最后一章和目录指纹，供下次增量更新使用
+        只推进到从头开始连续保存成功的最后一章，失败的章节下次增量更新时重新下载；
+        有章节失败时不保存目录指纹（否则目录未变化时会直接跳过失败的章节）
+        """
+        if not self.catalog_fingerprint or not self.chapters:
+            return
+        saved = 0
+        for chapter in self.chapters:
+            if chapter.status != DONE:
+                break
+            saved += 1
+        if not saved:
+            return
+        fingerprint = self.catalog_fingerprint if saved == len(self.chapters) else None
+        try:
+            self.db.save_crawl_state(self.novel_id, self.chapters[saved - 1].url,
+                                     self.chapter_offset + saved, fingerprint)
+        except Exception as e:
+            logger.warning(f"⚠️  保存抓取状态失败: {e}")
+
+    def _restore_checkpoint(self) -> bool:
+        """从任务检查点恢复章节列表和小说信息（没有检查点时返回False）"""
+        if not self.checkpoint:
+            return False
+        data = self.checkpoint.load()
+        if not data:
+            return False
+
+        self.chapters = build_records(data['chapters'])
+        self.novel_info = data['novel_info']
+        self.novel_id = data['novel_id']
+        self.incremental = data['incremental']
+        self.chapter_offset = data['chapter_offset']
+        self.catalog_fingerprint = data['catalog_fingerprint']
+
+        done = self.checkpoint.done_indices()
+        for index in done:
+            self.chapters[index].status = DONE
+        self._log('INFO', f"♻️  从检查点恢复: 共 {len(self.chapters)} 章，已保存 {len(done)} 章，跳过目录解析")
+        self._update_progress(
+            stage='parsing_list',
+            detail=f'从检查点恢复，共 {len(self.chapters)} 章',
+            current='章节列表解析完成',
+            total=len(self.chapters),
+            completed=0
+        )
+        return True
+
+    def _parse_new_chapters(self, doc, chapter_list_config: Dict, max_page: int) -> bool:
+        """
+        增量更新：从目录最后一页向前获取，直到遇到上次抓取的最后一章
+        :param doc: 已解析的目录首页
+        :param chapter_list_config: 章节列表配置
+        :param max_page: 目录总页数
+        :return: 是否成功确定新章节（False 时需要获取完整目录）
+        """
+        state = self._load_crawl_state()
+        if not state:
+            self._log('INFO', "ℹ️  没有上次抓取记录，获取完整目录")
+            return False
+
+        last_url = state['last_chapter_url']
+        tail_pages = []
+        found = False
+        for page in range(max_page, 0, -1):
+            if page == 1:
+                chapters = self._parse_chapters_from_page(doc, chapter_list_config)
+            else:
+                page_url = self._build_pagination_url(page)
+                chapters = self._fetch_list_page(page, page_url, chapter_list_config) if page_url else None
+            if chapters is None:
+                self._log('WARNING', f"⚠️  增量更新获取第 {page} 页失败，获取完整目录")
+                return False
+
+            if page == max_page:
+                self.catalog_fingerprint = self._catalog_fingerprint(max_page, chapters)
+                if self.catalog_fingerprint == state['catalog_fingerprint']:
+                    # 目录末尾没有变化
+                    tail_pages = [chapters]
+                    found = True
+                    break
+
+            tail_pages.insert(0, chapters)
+            if any(chapter['url'] == last_url for chapter in chapters):
+                found = True
+                break
+
+        if not found:
+            self._log('WARNING', "⚠️  目录中找不到上次的最后一章（目录可能已调整），获取完整目录")
+            return False
+
+        tail = [chapter for chapters in tail_pages for chapter in chapters]
+        position = next((i for i, chapter in enumerate(tail) if chapter['url'] == last_url), len(tail) - 1)
+        self.chapters = build_records(tail[position + 1:])
+        self.chapter_offset = state['last_chapter_num']
+
+        self._log('INFO', f"🆕 增量更新: 检查了 {max_page - page + 1}/{max_page} 页目录，发现 {len(self.chapters)} 个新章节")
+        self._update_progress(
+            stage='parsing_list',
+            detail=f'增量更新，发现 {len(self.chapters)} 个新章节',
+            current='章节列表解析完成',
+            total=len(self.chapters),
+            completed=0
+        )
+        return True
+
+    def _get_max_page(self, html, pagination_config: Dict) -> int:
         """
         获取章节列表的最大页数
-        :param html: HTML内容
+        :param html: HTML内容或已解析文档
         :param pagination_config: 分页配置
         :return: 最大页数
         """
-        # 获取手动配置的最大页数，兼容旧配置
-        max_page_manual = pagination_config.get('max_page_manual', 100)
+        list_plan = self.plan.chapter_list
+        if list_plan:
+            # 使用预编译的最大页数解析计划
+            max_page_manual = list_plan.max_page_manual
+            max_page_xpath_config = list_plan.max_page
+        else:
+            # 获取手动配置的最大页数，兼容旧配置
+            max_page_manual = pagination_config.get('max_page_manual', 100)
 
-        # 获取xpath配置，兼容旧的max_page字段
-        max_page_xpath_config = pagination_config.get('max_page_xpath') or pagination_config.get('max_page')
+            # 获取xpath配置，兼容旧的max_page字段
+            max_page_xpath_config = pagination_config.get('max_page_xpath') or pagination_config.get('max_page')
 
         # 复用章节内容的提取逻辑
         return self._extract_max_pages_from_html(html, max_page_xpath_config, max_page_manual)
@@ -401,11 +768,24 @@ class GenericNovelCrawler:
             logger.error(f"❌ 构建翻页URL失败: {e}, chapter_url: {chapter_url}")
             return None
 
-    def _parse_chapters_from_page(self, html: str, chapter_list_config: Dict) -> List[Dict]:
-        """从页面解析章节列表"""
+    def _parse_chapters_from_page(self, html, chapter_list_config: Dict) -> List[Dict]:
+        """
+        从页面解析章节列表
+        :param html: HTML内容或已解析文档
+        """
         chapters = []
 
-        # 验证配置类型
+        # 优先使用预编译的解析计划
+        if self.plan.chapter_list:
+            for title, url in self.plan.chapter_list.extract(self.parser.document(html)):
+                chapters.append({
+                    'title': title,
+                    'url': urljoin(self.base_url, url),
+                    'content': ''
+                })
+            return chapters
+
+        # 配置不完整时按原始配置逐项解析（给出具体的错误信息）
         if not isinstance(chapter_list_config, dict):
             raise TypeError(f"chapter_list_config 应为字典类型，实际为 {type(chapter_list_config).__name__}")
 
@@ -431,7 +811,7 @@ class GenericNovelCrawler:
             raise TypeError(f"url 配置应为字典类型，实际为 {type(url_config).__name__}")
 
         # 先获取所有章节项
-        root = Selector(text=html)
+        root = self.parser.document(html)
         items_xpath = items_config.get('expression', '')
         if not items_xpath:
             raise ValueError("items 配置缺少 'expression' 字段")
@@ -482,11 +862,11 @@ class GenericNovelCrawler:
             # 转换失败，不是数字
             return 0
 
-    def _extract_max_pages_from_html(self, html: str, max_page_xpath_config: Dict, max_pages_manual: int) -> int:
+    def _extract_max_pages_from_html(self, html, max_page_xpath_config, max_pages_manual: int) -> int:
         """
         从HTML页面中提取最大页数
-        :param html: HTML内容
-        :param max_page_xpath_config: xpath配置
+        :param html: HTML内容或已解析文档
+        :param max_page_xpath_config: xpath配置或预编译的FieldPlan
         :param max_pages_manual: 手动配置的最大页数（作为默认值）
         :return: 提取到的最大页数（如果失败则返回max_pages_manual）
         """
@@ -494,7 +874,10 @@ class GenericNovelCrawler:
             return max_pages_manual
 
         try:
-            max_page_from_xpath = self.parser.parse_with_config(html, max_page_xpath_config)
+            if isinstance(max_page_xpath_config, FieldPlan):
+                max_page_from_xpath = max_page_xpath_config.execute(self.parser.document(html))
+            else:
+                max_page_from_xpath = self.parser.parse_with_config(html, max_page_xpath_config)
             if max_page_from_xpath:
                 # 安全地转换为整数
                 max_page_str = str(max_page_from_xpath).strip()
@@ -518,93 +901,165 @@ class GenericNovelCrawler:
     def download_chapter_content(self, chapter_url: str, chapter_title: str = '') -> str:
         """
         下载章节内容（支持多页）
+        第1页确定总页数后，第2页起并发获取，再按页码顺序合并（保留连续重复页检测）
         :param chapter_url: 章节URL
         :param chapter_title: 章节标题（用于进度显示）
         :return: 完整内容
         """
+        # 预编译的章节内容解析计划（内容、翻页、最大页数、清理规则）
+        content_plan = self.plan.chapter_content
+        if content_plan is None:
+            logger.error("❌ chapter_content 配置应为字典类型")
+            return ''
+
         all_content = []
-        current_url = chapter_url
-        page_num = 1
+        html = self.fetcher.get_page(chapter_url, max_retries=self.config_manager.get_max_retries())
+        if not html:
+            logger.warning(f"⚠️  第1页获取失败")
+            return self._merge_content(all_content)
 
-        parsers = self.config_manager.get_parsers()
-        chapter_content_config = parsers.get('chapter_content', {})
-
-        content_config = chapter_content_config.get('content', {})
-        next_page_config = chapter_content_config.get('next_page', {}) or chapter_content_config.get('pagination', {})
-        clean_config = chapter_content_config.get('clean', [])
-
-        # 获取最大页数：优先从next_page配置读取，兼容旧配置
-        max_pages_manual = next_page_config.get('max_pages_manual') or chapter_content_config.get('max_pages', 5)
-        max_page_xpath_config = next_page_config.get('max_page_xpath')
-
-        # 初始化最大页数（默认使用手动配置的值）
-        max_pages = max_pages_manual
-        duplicate_page_count = 0  # 记录内容重复数
-        while current_url and page_num <= max_pages:
-            # 更新章节内容翻页进度
-            if max_pages > 1 and page_num > 1:
-                detail_msg = f'正在下载第 {page_num}/{max_pages} 页'
-                logger.info(f"📄 {chapter_title or '章节内容'} - {detail_msg}")
-                self._update_progress(
-                    stage='downloading',
-                    detail=detail_msg,
-                    current=f'{chapter_title or "章节"} (第 {page_num}/{max_pages} 页)'
-                )
+        # 第1页同时确定最大页数（默认使用手动配置的值）
+        content, max_pages = self._parse_content_page(html, 1, content_plan.max_pages_manual)
+        duplicate_page_count = self._collect_page_content(all_content, content, 1, 0)
 
-            html = self.fetcher.get_page(current_url,
-                                         max_retries=self.config_manager.get_max_retries())
-            if not html:
-                logger.warning(f"⚠️  第{page_num}页获取失败")
-                break
+        page_urls = self._content_page_urls(chapter_url, max_pages)
+        if not page_urls:
+            return self._merge_content(all_content)
 
-            # 第一页时尝试从页面提取最大页数
-            if page_num == 1:
-                max_pages = self._extract_max_pages_from_html(html, max_page_xpath_config, max_pages_manual)
-                if max_pages > 1:
-                    logger.info(f"📄 该章节共 {max_pages} 页内容")
-
-            # 解析内容
-            content = self.parser.parse_with_config(html, content_config)
-            if content:
-                if isinstance(content, list):
-                    content = '\n'.join([str(c).strip() for c in content if str(c).strip()])
-
-                # 检测连续重复内容（与上一页比较）
-                if all_content and content == all_content[-1]:
-                    duplicate_page_count += 1
-                    logger.info(f"ℹ️  第{page_num}页内容与上一页重复 (连续{duplicate_page_count}次)")
-                    if duplicate_page_count >= 2:
-                        logger.info(f"⚠️  连续2页内容重复，停止翻页")
-                        break
-                else:
-                    # 内容不重复，重置计数并添加
-                    if duplicate_page_count > 0:
-                        logger.info(f"✅ 第{page_num}页内容正常，重置重复计数")
-                    duplicate_page_count = 0
-                    all_content.append(content)
-
-            # 检查是否有下一页
-            if next_page_config and next_page_config.get('enabled', False):
-                # 使用 url_templates.chapter_content_page 构建下一页URL
-                next_url = self._build_content_next_page_url(
-                    chapter_url, page_num + 1, next_page_config
-                )
+        executor = self._content_page_executor()
+        futures = [executor.submit(self._fetch_content_page, page_url, page_num, max_pages)
+                   for page_num, page_url in page_urls]
+        try:
+            for (page_num, page_url), future in zip(page_urls, futures):
+                self._report_content_page(chapter_title, page_num, max_pages)
+                content = future.result()
+                if content is None:
+                    logger.warning(f"⚠️  第{page_num}页获取失败")
+                    break
 
-                if next_url and next_url != current_url:
-                    current_url = next_url
-                    page_num += 1
-                else:
+                duplicate_page_count = self._collect_page_content(all_content, content, page_num,
+                                                                  duplicate_page_count)
+                if duplicate_page_count >= 2:
+                    logger.info(f"⚠️  连续2页内容重复，停止翻页")
                     break
-            else:
+        finally:
+            # 提前结束时，尚未开始的页不再请求
+            for future in futures:
+                future.cancel()
+
+        return self._merge_content(all_content)
+
+    def _content_page_urls(self, chapter_url: str, max_pages: int) -> List:
+        """
+        构建章节第2页起的URL（与逐页翻页的判断一致：无法构建或与上一页相同时结束）
+        :return: [(页码, URL), ...]
+        """
+        page_urls = []
+        current_url = chapter_url
+        for page_num in range(1, max_pages):
+            next_url = self._next_content_page_url(chapter_url, current_url, page_num)
+            if not next_url:
                 break
+            page_urls.append((page_num + 1, next_url))
+            current_url = next_url
+        return page_urls
+
+    def _fetch_content_page(self, page_url: str, page_num: int, max_pages: int) -> Optional[str]:
+        """
+        获取并解析章节的单个分页
+        :return: 本页内容（未提取到内容时为空字符串），获取失败时返回None
+        """
+        if self._check_stop():
+            return None
+        html = self.fetcher.get_page(page_url, max_retries=self.config_manager.get_max_retries())
+        if not html:
+            return None
+        content, _ = self._parse_content_page(html, page_num, max_pages)
+        return content or ''
+
+    def _content_page_executor(self) -> ThreadPoolExecutor:
+        """章节分页共用的线程池（与章节下载线程分开，避免互相等待）"""
+        with self._page_executor_lock:
+            if self._page_executor is None:
+                self._page_executor = ThreadPoolExecutor(max_workers=self.download_workers,
+                                                         thread_name_prefix='content-page')
+            return self._page_executor
+
+    def _report_content_page(self, chapter_title: str, page_num: int, max_pages: int):
+        """更新章节内容翻页进度（第2页起）"""
+        if max_pages > 1 and page_num > 1:
+            detail_msg = f'正在下载第 {page_num}/{max_pages} 页'
+            logger.info(f"📄 {chapter_title or '章节内容'} - {detail_msg}")
+            self._update_progress(
+                stage='downloading',
+                detail=detail_msg,
+                current=f'{chapter_title or "章节"} (第 {page_num}/{max_pages} 页)'
+            )
+
+    def _parse_content_page(self, html: str, page_num: int, max_pages: int):
+        """
+        解析章节内容的单个页面（纯CPU操作，异步引擎会放到线程池执行）
+        :param html: 页面HTML
+        :param page_num: 页码
+        :param max_pages: 当前已知的最大页数
+        :return: (本页内容, 最大页数)
+        """
+        content_plan = self.plan.chapter_content
+
+        # 每页只解析一次，最大页数和正文共用
+        doc = HtmlDocument(html)
+
+        # 第一页时尝试从页面提取最大页数
+        if page_num == 1:
+            max_pages = self._extract_max_pages_from_html(doc, content_plan.max_page, content_plan.max_pages_manual)
+            if max_pages > 1:
+                logger.info(f"📄 该章节共 {max_pages} 页内容")
+
+        # 解析内容
+        content = content_plan.content.execute(doc)
+        if content and isinstance(content, list):
+            content = '\n'.join([str(c).strip() for c in content if str(c).strip()])
+
+        return content, max_pages
+
+    def _collect_page_content(self, all_content: List[str], content, page_num: int,
+                              duplicate_page_count: int) -> int:
+        """
+        收集单页内容并检测连续重复（与上一页比较）
+        :return: 更新后的连续重复次数（≥2时应停止翻页）
+        """
+        if not content:
+            return duplicate_page_count
 
-        # 合并内容
+        if all_content and content == all_content[-1]:
+            duplicate_page_count += 1
+            logger.info(f"ℹ️  第{page_num}页内容与上一页重复 (连续{duplicate_page_count}次)")
+        else:
+            # 内容不重复，重置计数并添加
+            if duplicate_page_count > 0:
+                logger.info(f"✅ 第{page_num}页内容正常，重置重复计数")
+            duplicate_page_count = 0
+            all_content.append(content)
+        return duplicate_page_count
+
+    def _next_content_page_url(self, chapter_url: str, current_url: str, page_num: int) -> Optional[str]:
+        """获取章节内容下一页URL，没有下一页时返回None"""
+        if not self.plan.chapter_content.next_page_enabled:
+            return None
+        # 使用 url_templates.chapter_content_page 构建下一页URL
+        next_url = self._build_content_next_page_url(chapter_url, page_num + 1)
+        if next_url and next_url != current_url:
+            return next_url
+        return None
+
+    def _merge_content(self, all_content: List[str]) -> str:
+        """合并各页内容并应用清理规则"""
         final_content = '\n\n'.join(all_content) if all_content else ''
 
         # 清理内容
-        if clean_config:
-            for clean_rule in clean_config:
-                final_content = self.parser.apply_post_process(final_content, [clean_rule])
+        content_plan = self.plan.chapter_content
+        if content_plan.clean:
+            final_content = content_plan.clean(final_content)
 
         return final_content
 
@@ -615,36 +1070,66 @@ class GenericNovelCrawler:
             self._log('WARNING', '⚠️  收到停止信号，终止下载')
             return False
 
+        # 下载内容（传递章节标题用于进度显示，已下载的章节在 _download_chapters 中预先过滤）
         chapter = self.chapters[index]
-        chapter_url = chapter['url']
-        chapter_title = chapter['title']
+        content = self.download_chapter_content(chapter.url, chapter.title)
+        return self._save_chapter(index, content)
 
-        # 检查是否已下载
-        if self.is_chapter_downloaded(chapter_url):
-            with self.progress_lock:
-                self.skipped_count += 1
-                self.completed_count += 1
-                progress = (self.completed_count / len(self.chapters)) * 100
-                msg = f"⏭️  [{self.completed_count}/{len(self.chapters)}] {chapter_title} (已下载,跳过) - 进度: {progress:.1f}%"
-                self._log('INFO', msg)
-                # 更新进度
-                self._update_progress(
-                    stage='downloading',
-                    detail='',
-                    total=len(self.chapters),
-                    completed=self.completed_count,
-                    failed=self.failed_count,
-                    current=chapter_title
-                )
-            return True
+    def _skip_downloaded(self, indices) -> List[int]:
+        """
+        批量过滤已下载的章节，计入跳过并更新进度
+        :param indices: 章节索引列表
+        :return: 需要下载的章节索引
+        """
+        indices = list(indices)
+        # 检查点中已保存的章节直接跳过，不再逐章检查Redis
+        saved = self.checkpoint.done_indices() if self.checkpoint else set()
+        unchecked = [index for index in indices if index not in saved]
+        downloaded = self.filter_downloaded([self.chapters[i].url for i in unchecked])
+        pending = [index for index, done in zip(unchecked, downloaded) if not done]
+        skipped = len(indices) - len(pending)
+        if not skipped:
+            return pending
+        pending_set = set(pending)
+        for index in indices:
+            if index not in pending_set:
+                self.chapters[index].status = DONE
+        if self.checkpoint:
+            self.checkpoint.mark([index for index, done in zip(unchecked, downloaded) if done], DONE)
+
+        with self.progress_lock:
+            self.skipped_count += skipped
+            self.completed_count += skipped
+            progress = (self.completed_count / len(self.chapters)) * 100
+            msg = f"⏭️  [{self.completed_count}/{len(self.chapters)}] 已下载 {skipped} 章，跳过 - 进度: {progress:.1f}%"
+            self._log('INFO', msg)
+            # 更新进度
+            self._update_progress(
+                stage='downloading',
+                detail='',
+                total=len(self.chapters),
+                completed=self.completed_count,
+                failed=self.failed_count,
+                current='跳过已下载章节'
+            )
+        return pending
 
-        # 下载内容（传递章节标题用于进度显示）
-        content = self.download_chapter_content(chapter_url, chapter_title)
-        chapter['content'] = content
+    def _save_chapter(self, index: int, content: str) -> bool:
+        """
+        保存已下载的章节内容（两种下载引擎共用）
+        内容放入批量写入缓冲，写入数据库后再更新Redis记录和进度
+        :param index: 章节索引
+        :param content: 章节内容
+        :return: 是否已放入写入缓冲（内容为空时返回False）
+        """
+        chapter = self.chapters[index]
+        chapter_url = chapter.url
+        chapter_title = chapter.title
 
         # 检查内容是否为空
         if not content or len(content.strip()) == 0:
             self._log('ERROR', f"❌ {chapter_title} 内容为空")
+            chapter.status = FAILED
             self.mark_chapter_failed(chapter_url)  # 这里会自动增加failed_count
             with self.progress_lock:
                 self.completed_count += 1
@@ -659,39 +1144,41 @@ class GenericNovelCrawler:
                 )
             return False
 
-        # 保存到数据库（使用单例）
-        download_success = False
-        from backend.models.database import get_database
-        db = get_database(**DB_CONFIG, silent=True)
-        if db.connect(max_retries=3, retry_delay=2):
-            try:
-                db.insert_chapter(
-                    self.novel_id,
-                    index + 1,
-                    chapter_title,
-                    content,
-                    chapter_url
-                )
-                db.close()
-                download_success = True
-            except Exception as e:
-                self._log('ERROR', f"❌ {chapter_title} 数据库保存失败: {e}")
-                db.close()
-                download_success = False
+        # 放入批量写入缓冲，落库后在 _on_chapters_flushed 中更新Redis记录和进度（正文随批次释放）
+        self.chapter_sink.add({
+            'chapter_num': self.chapter_offset + index + 1,
+            'title': chapter_title,
+            'content': content,
+            'source_url': chapter_url
+        })
+        return True
 
-        # 更新Redis记录和进度
+    def _on_chapters_flushed(self, batch: List[Dict], success: bool):
+        """
+        一批章节写入数据库后更新Redis记录和进度（ChapterSink 回调）
+        :param batch: 本批章节
+        :param success: 是否写入成功
+        """
         with self.progress_lock:
-            if download_success:
-                self.mark_chapter_success(chapter_url)
+            chapter_urls = [item['source_url'] for item in batch]
+            if success:
+                self.mark_chapters_success(chapter_urls)
                 status_icon = "✅"
             else:
-                self.mark_chapter_failed(chapter_url)  # 这里会自动增加failed_count
+                self.mark_chapters_failed(chapter_urls)  # 这里会自动增加failed_count
                 status_icon = "❌"
 
-            self.completed_count += 1
-            progress = (self.completed_count / len(self.chapters)) * 100
-            msg = f"{status_icon} [{self.completed_count}/{len(self.chapters)}] {chapter_title} ({len(content)} 字) - 进度: {progress:.1f}%"
-            self._log('INFO' if download_success else 'ERROR', msg)
+            for item in batch:
+                words = len(item['content'])
+                chapter = self.chapters[item['chapter_num'] - self.chapter_offset - 1]
+                chapter.status = DONE if success else FAILED
+                if success:
+                    chapter.word_count = words
+                    self.total_words += words
+                self.completed_count += 1
+                progress = (self.completed_count / len(self.chapters)) * 100
+                msg = f"{status_icon} [{self.completed_count}/{len(self.chapters)}] {item['title']} ({words} 字) - 进度: {progress:.1f}%"
+                self._log('INFO' if success else 'ERROR', msg)
 
             # 调用进度回调
             self._update_progress(
@@ -700,14 +1187,64 @@ class GenericNovelCrawler:
                 total=len(self.chapters),
                 completed=self.completed_count,
                 failed=self.failed_count,
-                current=chapter_title
+                current=batch[-1]['title']
             )
 
-        # 延迟
-        delay = self.config_manager.get_delay()
-        time.sleep(delay)
+        # 章节已落库后才记入检查点
+        if self.checkpoint:
+            self.checkpoint.mark([item['chapter_num'] - self.chapter_offset - 1 for item in batch],
+                                 DONE if success else FAILED)
 
-        return download_success
+    def _download_chapters(self, indices, error_label: str = '下载失败'):
+        """
+        并发下载指定章节（根据 crawler_config.engine 选择线程池或asyncio引擎，启用 distributed 时交给工作进程）
+        :param indices: 章节索引列表
+        :param error_label: 单章异常时的日志描述
+        """
+        # 一次批量检查跳过已下载的章节，只提交需要下载的章节
+        indices = self._skip_downloaded(indices)
+        if not indices:
+            return
+
+        # 分布式模式：章节发布到Redis工作队列，由工作进程下载保存
+        distributed = self.config_manager.get_distributed()
+        if distributed:
+            from backend.distributed import DistributedDownload
+            DistributedDownload(self, distributed).run(indices)
+            return
+
+        write_batch = self.config_manager.get_write_batch()
+        self.chapter_sink = ChapterSink(self.db, self.novel_id, self._on_chapters_flushed,
+                                        write_batch['size'], write_batch['interval'])
+        try:
+            self._run_chapter_downloads(indices, error_label)
+        finally:
+            # 下载结束或任务停止时写入剩余章节
+            self.chapter_sink.close()
+            self.chapter_sink = None
+
+    def _run_chapter_downloads(self, indices, error_label: str):
+        """使用配置的下载引擎并发下载章节"""
+        if self.config_manager.get_engine() == 'asyncio':
+            try:
+                from backend.async_engine import AsyncCrawlEngine
+            except ImportError as e:
+                self._log('WARNING', f"⚠️  asyncio引擎不可用（{e}），改用线程池")
+            else:
+                concurrency = self.config_manager.get_async_concurrency(self.max_workers)
+                self._log('INFO', f"⚡ 使用asyncio引擎 (并发数: {concurrency})")
+                AsyncCrawlEngine(self, concurrency).run_chapters(indices, error_label)
+                return
+
+        with ThreadPoolExecutor(max_workers=self.download_workers) as executor:
+            futures = {executor.submit(self.download_and_save_chapter, i): i for i in indices}
+
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.error(f"❌ 章节 {index + 1} {error_label}: {e}")
 
     def download_all_chapters(self, retry_failed: bool = False) -> bool:
         """
@@ -727,15 +1264,18 @@ class GenericNovelCrawler:
         self.completed_count = 0
         self.skipped_count = 0
         self.failed_count = 0
+        self.total_words = 0
 
         # 连接数据库
         if not self.db.connect():
             logger.error("❌ 数据库连接失败")
             return False
 
-        # 检查小说是否已存在
-        existing_novel = self.db.get_novel_by_url(self.start_url)
-        if existing_novel:
+        # 检查小说是否已存在（从检查点恢复时已知小说ID）
+        existing_novel = None if self.novel_id else self.db.get_novel_by_url(self.start_url)
+        if self.novel_id:
+            logger.info(f"📚 从检查点恢复小说 (ID: {self.novel_id})\n")
+        elif existing_novel:
             self.novel_id = existing_novel['id']
             logger.info(f"📚 小说已存在 (ID: {self.novel_id})，将更新章节\n")
         else:
@@ -764,6 +1304,11 @@ class GenericNovelCrawler:
 
         self.db.close()
 
+        # 章节列表和小说ID确定后保存检查点
+        if self.checkpoint:
+            self.checkpoint.save([chapter.to_dict() for chapter in self.chapters], self.novel_id, self.incremental, self.novel_info,
+                                 self.chapter_offset, self.catalog_fingerprint)
+
         # 多线程下载
         logger.info("=" * 60)
         logger.info(f"🚀 开始并发下载章节内容 (线程数: {self.max_workers})")
@@ -771,19 +1316,16 @@ class GenericNovelCrawler:
 
         start_time = time.time()
 
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            futures = {executor.submit(self.download_and_save_chapter, i): i
-                       for i in range(len(self.chapters))}
-
-            for future in as_completed(futures):
-                index = futures[future]
-                try:
-                    future.result()
-                except Exception as e:
-                    logger.error(f"❌ 章节 {index + 1} 下载失败: {e}")
+        self._download_chapters(range(len(self.chapters)))
+        if self.checkpoint:
+            self.checkpoint.flush()
 
         elapsed_time = time.time() - start_time
 
+        # 目录已完整处理，记录最后一章供下次增量更新
+        if not self._check_stop():
+            self._save_crawl_state()
+
         # 更新统计
         if self.db.connect():
             self.db.update_novel_stats(self.novel_id)
@@ -795,7 +1337,10 @@ class GenericNovelCrawler:
         logger.info("\n" + "=" * 60)
         logger.info(f"✅ 所有章节处理完成！")
         logger.info(f"   总耗时: {elapsed_time:.2f} 秒")
-        logger.info(f"   总章节: {len(self.chapters)}")
+        if self.incremental:
+            logger.info(f"   新章节: {len(self.chapters)} 章")
+        else:
+            logger.info(f"   总章节: {len(self.chapters)}")
         logger.info(f"   新下载: {new_downloads} 章")
         logger.info(f"   跳过(已下载): {self.skipped_count} 章")
         logger.info(f"   本次失败: {self.failed_count} 章")
@@ -806,7 +1351,7 @@ class GenericNovelCrawler:
         # 最终进度更新
         self._update_progress(
             stage='completed',
-            detail='下载完成',
+            detail=f'更新完成，新增 {len(self.chapters)} 章' if self.incremental else '下载完成',
             total=len(self.chapters),
             completed=self.completed_count,
             failed=self.failed_count,
@@ -854,7 +1399,7 @@ class GenericNovelCrawler:
             # 筛选需要重试的章节
             retry_chapters = []
             for idx, chapter in enumerate(self.chapters):
-                if chapter['url'] in failed_urls:
+                if chapter.url in failed_urls:
                     retry_chapters.append((idx, chapter))
 
             logger.info(f"🎯 匹配到 {len(retry_chapters)} 个章节需要重试")
@@ -870,18 +1415,10 @@ class GenericNovelCrawler:
             self.completed_count = 0
             self.skipped_count = 0
             self.failed_count = 0
+            self.total_words = 0
             start_time = time.time()
 
-            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                futures = {executor.submit(self.download_and_save_chapter, idx): idx
-                           for idx, chapter in retry_chapters}
-
-                for future in as_completed(futures):
-                    index = futures[future]
-                    try:
-                        future.result()
-                    except Exception as e:
-                        logger.error(f"❌ 章节 {index + 1} 重试失败: {e}")
+            self._download_chapters([idx for idx, chapter in retry_chapters], error_label='重试失败')
 
             elapsed_time = time.time() - start_time
             
@@ -916,12 +1453,13 @@ class GenericNovelCrawler:
         logger.info(f"小说ID: {self.novel_id}")
         logger.info(f"小说名称: {self.novel_info.get('title')}")
         logger.info(f"作者: {self.novel_info.get('author', '未知')}")
-        logger.info(f"章节总数: {len(self.chapters)}")
+        logger.info(f"章节总数: {self.chapter_offset + len(self.chapters)}")
+        if self.incremental:
+            logger.info(f"新章节: {len(self.chapters)}")
         logger.info(f"成功章节: {success_count}")
         logger.info(f"失败章节: {failed_count}")
 
-        total_words = sum(len(ch['content']) for ch in self.chapters)
-        logger.info(f"总字数: {total_words:,} 字")
+        logger.info(f"总字数: {self.total_words:,} 字")
         logger.info(f"{'=' * 60}")
 
     def run(self):
@@ -937,8 +1475,8 @@ class GenericNovelCrawler:
             self._log('INFO', f"📖 书籍ID: {self.book_id}")
             self._log('INFO', "=" * 60)
 
-            # 1. 解析章节列表
-            if not self.parse_chapter_list():
+            # 1. 解析章节列表（有任务检查点时直接恢复）
+            if not (self._restore_checkpoint() or self.parse_chapter_list()):
                 self._log('ERROR', "❌ 解析章节列表失败")
                 return False
 
@@ -952,6 +1490,9 @@ class GenericNovelCrawler:
                 self._log('ERROR', "❌ 下载章节失败")
                 return False
 
+            if self.incremental:
+                self._log('SUCCESS', f"🆕 增量更新完成，新增 {len(self.chapters)} 章")
+
             # 3. 打印摘要
             self.print_summary()
 
@@ -964,3 +1505,9 @@ class GenericNovelCrawler:
         except Exception as e:
             self._log('ERROR', f"❌ 爬虫运行失败: {e}")
             raise
+
+        finally:
+            # 释放分页线程池和HTTP连接池
+            if self._page_executor is not None:
+                self._page_executor.shutdown(wait=False, cancel_futures=True)
+            self.fetcher.close()
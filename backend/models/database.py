@@ -2,10 +2,13 @@
 SQLAlchemy 数据库管理模块
 """
 import re
+import json
 import time
 from contextlib import contextmanager
-from sqlalchemy import create_engine, or_, func
-from sqlalchemy.orm import sessionmaker, scoped_session
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, or_, and_, func, select, delete, update, bindparam
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.orm import sessionmaker, scoped_session, selectinload, undefer
 from sqlalchemy.pool import QueuePool
 from sqlalchemy.exc import OperationalError
 from loguru import logger
@@ -15,14 +18,16 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
-from shared.models.models import Base, User, Novel, Chapter, ReadingProgress, Bookmark, ReaderSetting, CrawlerTask
+from shared.models.models import (Base, User, Novel, Chapter, ChapterContent, NovelCrawlState, ReadingProgress,
+                                  Bookmark, ReaderSetting, CrawlerTask, CrawlerTaskLog,
+                                  CrawlerTaskCheckpoint, CrawlerSchedule)
 
 
 class NovelDatabase:
     """SQLAlchemy 数据库管理类"""
     
     def __init__(self, host='localhost', user='root', password='', database='novel_db', 
-                 port=3306, pool_size=20, silent=False):
+                 port=3306, pool_size=20, silent=False, separate_content=False):
         """
         初始化数据库连接
         :param host: 数据库主机
@@ -32,8 +37,12 @@ class NovelDatabase:
         :param port: 数据库端口
         :param pool_size: 连接池大小
         :param silent: 是否静默模式
+        :param separate_content: 新写入的章节内容是否存入独立的 chapter_contents 表
         """
         self.silent = silent
+        self.separate_content = separate_content
+        # 独立内容表中没有章节内容的小说（不分离存储时批量写入章节无需清理旧内容）
+        self.novels_without_separate_content = set()
         
         # 构建数据库URL (使用pymysql驱动，增加连接超时参数)
         db_url = f"mysql+pymysql://{user}:{password}@{host}:{port}/{database}?charset=utf8mb4&connect_timeout=60"
@@ -218,33 +227,83 @@ class NovelDatabase:
                                 intro, status, category, tags)
     
     def update_novel_stats(self, novel_id):
-        """更新小说统计信息（总章节数、总字数）"""
+        """更新小说统计信息（总章节数、总字数，数据库内聚合，不加载章节内容）"""
         with self.get_session() as session:
-            novel = session.query(Novel).filter(Novel.id == novel_id).first()
-            if not novel:
-                return False
-            
-            # 统计章节数和总字数
-            chapters = session.query(Chapter).filter(Chapter.novel_id == novel_id).all()
-            novel.total_chapters = len(chapters)
-            novel.total_words = sum(ch.word_count for ch in chapters)
-            
-            return True
+            total_chapters, total_words = session.query(
+                func.count(Chapter.id),
+                func.coalesce(func.sum(Chapter.word_count), 0)
+            ).filter(Chapter.novel_id == novel_id).one()
+
+            updated = session.query(Novel).filter(Novel.id == novel_id).update({
+                Novel.total_chapters: total_chapters,
+                Novel.total_words: int(total_words)
+            }, synchronize_session=False)
+            return updated > 0
+
+    def update_all_novel_stats(self):
+        """
+        批量更新所有小说的统计信息（一次分组聚合查询）
+        :return: 统计有变化的小说列表 [{'id', 'title', 'old_chapters', 'old_words', 'new_chapters', 'new_words'}]
+        """
+        with self.get_session() as session:
+            stats = {
+                novel_id: (count, int(words))
+                for novel_id, count, words in session.query(
+                    Chapter.novel_id,
+                    func.count(Chapter.id),
+                    func.coalesce(func.sum(Chapter.word_count), 0)
+                ).group_by(Chapter.novel_id)
+            }
+
+            changes = []
+            novels = session.query(Novel.id, Novel.title, Novel.total_chapters, Novel.total_words).all()
+            for novel_id, title, old_chapters, old_words in novels:
+                new_chapters, new_words = stats.get(novel_id, (0, 0))
+                if old_chapters == new_chapters and old_words == new_words:
+                    continue
+                changes.append({
+                    'id': novel_id,
+                    'title': title,
+                    'old_chapters': old_chapters,
+                    'old_words': old_words,
+                    'new_chapters': new_chapters,
+                    'new_words': new_words
+                })
+
+            if changes:
+                session.bulk_update_mappings(Novel, [
+                    {'id': c['id'], 'total_chapters': c['new_chapters'], 'total_words': c['new_words']}
+                    for c in changes
+                ])
+            return changes
     
     # ==================== 章节管理 ====================
     
     def get_novel_chapters(self, novel_id):
-        """获取小说的所有章节"""
+        """获取小说的章节目录（只查询元数据列，不读取章节内容）"""
         with self.get_session() as session:
-            chapters = session.query(Chapter).filter(
+            rows = session.query(
+                Chapter.id, Chapter.chapter_num, Chapter.title, Chapter.word_count
+            ).filter(
                 Chapter.novel_id == novel_id
             ).order_by(Chapter.chapter_num).all()
-            return [ch.to_dict() for ch in chapters]
+            return [
+                {
+                    'id': row.id,
+                    'novel_id': novel_id,
+                    'chapter_num': row.chapter_num,
+                    'title': row.title,
+                    'word_count': row.word_count
+                }
+                for row in rows
+            ]
     
     def get_chapter_content(self, novel_id, chapter_num):
         """获取章节内容"""
         with self.get_session() as session:
-            chapter = session.query(Chapter).filter(
+            chapter = session.query(Chapter).options(
+                undefer(Chapter.content), selectinload(Chapter.content_row)
+            ).filter(
                 Chapter.novel_id == novel_id,
                 Chapter.chapter_num == chapter_num
             ).first()
@@ -257,10 +316,9 @@ class NovelDatabase:
                 novel_id=novel_id,
                 chapter_num=chapter_num,
                 title=title,
-                content=content,
-                word_count=len(content),
                 source_url=source_url
             )
+            chapter.set_content(content, self.separate_content)
             session.add(chapter)
             session.flush()
             return chapter.id
@@ -269,7 +327,9 @@ class NovelDatabase:
         """插入或更新章节（兼容旧接口，处理重复情况）"""
         with self.get_session() as session:
             # 先查询是否存在
-            existing_chapter = session.query(Chapter).filter(
+            existing_chapter = session.query(Chapter).options(
+                selectinload(Chapter.content_row)
+            ).filter(
                 Chapter.novel_id == novel_id,
                 Chapter.chapter_num == chapter_num
             ).first()
@@ -277,8 +337,7 @@ class NovelDatabase:
             if existing_chapter:
                 # 存在则更新
                 existing_chapter.title = title
-                existing_chapter.content = content
-                existing_chapter.word_count = len(content)
+                existing_chapter.set_content(content, self.separate_content)
                 existing_chapter.source_url = source_url
                 session.flush()
                 return existing_chapter.id
@@ -286,6 +345,101 @@ class NovelDatabase:
                 # 不存在则创建
                 return self.create_chapter(novel_id, chapter_num, title, content, source_url)
     
+    def upsert_chapters(self, novel_id, chapters):
+        """
+        批量插入或更新章节（MySQL INSERT ... ON DUPLICATE KEY UPDATE，基于 idx_novel_chapter 唯一索引）
+        :param novel_id: 小说ID
+        :param chapters: [{'chapter_num', 'title', 'content', 'source_url'}]
+        :return: 写入的章节数
+        """
+        if not chapters:
+            return 0
+
+        now = datetime.now()
+        separate = self.separate_content
+        rows = [
+            {
+                'novel_id': novel_id,
+                'chapter_num': ch['chapter_num'],
+                'title': ch['title'],
+                'content': None if separate else ch['content'],
+                'word_count': len(ch['content']),
+                'source_url': ch.get('source_url'),
+                'created_at': now
+            }
+            for ch in chapters
+        ]
+        stmt = mysql_insert(Chapter.__table__)
+        stmt = stmt.on_duplicate_key_update(
+            title=stmt.inserted.title,
+            content=stmt.inserted.content,
+            word_count=stmt.inserted.word_count,
+            source_url=stmt.inserted.source_url
+        )
+
+        with self.get_connection() as conn:
+            # executemany 由驱动合并为一条多行INSERT
+            conn.execute(stmt, rows)
+
+            if separate:
+                contents = {ch['chapter_num']: ch['content'] for ch in chapters}
+                id_rows = conn.execute(
+                    select(Chapter.id, Chapter.chapter_num).where(
+                        Chapter.novel_id == novel_id,
+                        Chapter.chapter_num.in_(list(contents))
+                    )
+                ).all()
+                content_stmt = mysql_insert(ChapterContent.__table__)
+                content_stmt = content_stmt.on_duplicate_key_update(content=content_stmt.inserted.content)
+                conn.execute(content_stmt, [
+                    {'chapter_id': row.id, 'content': contents[row.chapter_num]} for row in id_rows
+                ])
+            elif self._has_separate_content(conn, novel_id):
+                # 清除之前写入独立内容表的旧内容（与 Chapter.set_content 保持一致）
+                conn.execute(delete(ChapterContent).where(ChapterContent.chapter_id.in_(
+                    select(Chapter.id).where(
+                        Chapter.novel_id == novel_id,
+                        Chapter.chapter_num.in_([ch['chapter_num'] for ch in chapters])
+                    )
+                )))
+
+        return len(rows)
+    
+    def _has_separate_content(self, conn, novel_id):
+        """
+        小说在独立内容表中是否有章节内容（没有时记住结果，之后写入该小说的章节不再查询）
+        本实例不分离存储，独立内容表中不会新增该小说的内容
+        """
+        if novel_id in self.novels_without_separate_content:
+            return False
+        exists = conn.execute(
+            select(ChapterContent.chapter_id).join(Chapter, Chapter.id == ChapterContent.chapter_id)
+            .where(Chapter.novel_id == novel_id).limit(1)
+        ).first() is not None
+        if not exists:
+            self.novels_without_separate_content.add(novel_id)
+        return exists
+    
+    # ==================== 抓取状态（增量更新） ====================
+    
+    def get_crawl_state(self, novel_id):
+        """获取小说的抓取状态（最后一章、目录指纹）"""
+        with self.get_session() as session:
+            state = session.query(NovelCrawlState).filter(NovelCrawlState.novel_id == novel_id).first()
+            return state.to_dict() if state else None
+    
+    def save_crawl_state(self, novel_id, last_chapter_url, last_chapter_num, catalog_fingerprint):
+        """保存小说的抓取状态"""
+        with self.get_session() as session:
+            state = session.query(NovelCrawlState).filter(NovelCrawlState.novel_id == novel_id).first()
+            if not state:
+                state = NovelCrawlState(novel_id=novel_id)
+                session.add(state)
+            state.last_chapter_url = last_chapter_url
+            state.last_chapter_num = last_chapter_num
+            state.catalog_fingerprint = catalog_fingerprint
+            return True
+    
     # ==================== 阅读进度管理 ====================
     
     def get_reading_progress(self, novel_id):
@@ -397,18 +551,21 @@ class NovelDatabase:
             # 使用LIKE进行模糊搜索
             search_pattern = f'%{keyword}%'
             
-            chapters = session.query(Chapter).filter(
+            chapters = session.query(Chapter).outerjoin(ChapterContent).options(
+                undefer(Chapter.content), selectinload(Chapter.content_row)
+            ).filter(
                 Chapter.novel_id == novel_id,
                 or_(
                     Chapter.title.like(search_pattern),
-                    Chapter.content.like(search_pattern)
+                    Chapter.content.like(search_pattern),
+                    ChapterContent.content.like(search_pattern)
                 )
             ).order_by(Chapter.chapter_num).limit(limit).all()
             
             results = []
             for chapter in chapters:
                 # 生成预览文本
-                content = chapter.content
+                content = chapter.get_content() or ''
                 keyword_pos = content.lower().find(keyword.lower())
                 if keyword_pos >= 0:
                     start = max(0, keyword_pos - 50)
@@ -441,7 +598,9 @@ class NovelDatabase:
         """
         with self.get_session() as session:
             # 获取需要处理的章节
-            query = session.query(Chapter).filter(Chapter.novel_id == novel_id)
+            query = session.query(Chapter).options(
+                undefer(Chapter.content), selectinload(Chapter.content_row)
+            ).filter(Chapter.novel_id == novel_id)
             
             if not replace_all_chapters:
                 query = query.filter(Chapter.chapter_num == chapter_num)
@@ -455,7 +614,7 @@ class NovelDatabase:
             total_matches = 0
             
             for chapter in chapters:
-                content = chapter.content
+                content = chapter.get_content() or ''
                 
                 try:
                     # 查找所有匹配项
@@ -516,7 +675,9 @@ class NovelDatabase:
         """
         with self.get_session() as session:
             # 获取需要处理的章节
-            query = session.query(Chapter).filter(Chapter.novel_id == novel_id)
+            query = session.query(Chapter).options(
+                undefer(Chapter.content), selectinload(Chapter.content_row)
+            ).filter(Chapter.novel_id == novel_id)
             
             if not replace_all_chapters:
                 query = query.filter(Chapter.chapter_num == chapter_num)
@@ -530,7 +691,7 @@ class NovelDatabase:
             total_replacements = 0
             
             for chapter in chapters:
-                original_content = chapter.content
+                original_content = chapter.get_content() or ''
                 
                 try:
                     # 执行替换（不区分大小写）
@@ -548,8 +709,7 @@ class NovelDatabase:
                     
                     # 如果内容有变化，更新数据库
                     if new_content != original_content:
-                        chapter.content = new_content
-                        chapter.word_count = len(new_content)
+                        chapter.set_content(new_content, chapter.content_row is not None)
                         affected_chapters += 1
                         total_replacements += replacement_count
                 
@@ -568,7 +728,7 @@ class NovelDatabase:
     
     # ==================== 任务管理 ====================
     
-    def create_task(self, task_id, config_filename, book_id, max_workers=5, use_proxy=False):
+    def create_task(self, task_id, config_filename, book_id, max_workers=5, use_proxy=False, incremental=False):
         """创建爬虫任务"""
         with self.get_session() as session:
             task = CrawlerTask(
@@ -577,6 +737,7 @@ class NovelDatabase:
                 book_id=book_id,
                 max_workers=max_workers,
                 use_proxy=1 if use_proxy else 0,
+                incremental=1 if incremental else 0,
                 status='pending'
             )
             session.add(task)
@@ -617,6 +778,25 @@ class NovelDatabase:
             
             return True
     
+    def update_tasks(self, updates):
+        """
+        批量更新多个任务的部分字段（一个事务，字段相同的任务合并为一次 executemany）
+        :param updates: {task_id: {字段: 值}}
+        """
+        groups = {}
+        for task_id, fields in updates.items():
+            groups.setdefault(tuple(sorted(fields)), []).append({'b_task_id': task_id, **{
+                f'b_{field}': value for field, value in fields.items()
+            }})
+        
+        table = CrawlerTask.__table__
+        with self.get_connection() as conn:
+            for fields, rows in groups.items():
+                stmt = update(table).where(table.c.task_id == bindparam('b_task_id')).values(
+                    {field: bindparam(f'b_{field}') for field in fields}
+                )
+                conn.execute(stmt, rows)
+    
     def delete_task(self, task_id, clean_failed_chapters=True):
         """
         删除任务
@@ -646,28 +826,268 @@ class NovelDatabase:
                 except Exception as e:
                     logger.error(f"❌ 清理章节记录失败: {e}")
             
-            # 删除任务
+            # 删除任务及其日志、检查点
+            session.query(CrawlerTaskLog).filter(CrawlerTaskLog.task_id == task_id).delete(synchronize_session=False)
+            session.query(CrawlerTaskCheckpoint).filter(
+                CrawlerTaskCheckpoint.task_id == task_id
+            ).delete(synchronize_session=False)
             session.delete(task)
             return True, cleaned_chapters
     
     def clear_completed_tasks(self):
-        """清理已完成/失败/停止的任务"""
+        """清理已完成/失败/停止的任务（同时删除日志和检查点）"""
         with self.get_session() as session:
+            finished = session.query(CrawlerTask.task_id).filter(
+                CrawlerTask.status.in_(['completed', 'failed', 'stopped'])
+            )
+            session.query(CrawlerTaskLog).filter(
+                CrawlerTaskLog.task_id.in_(finished.scalar_subquery())
+            ).delete(synchronize_session=False)
+            session.query(CrawlerTaskCheckpoint).filter(
+                CrawlerTaskCheckpoint.task_id.in_(finished.scalar_subquery())
+            ).delete(synchronize_session=False)
             deleted = session.query(CrawlerTask).filter(
                 CrawlerTask.status.in_(['completed', 'failed', 'stopped'])
             ).delete()
             return deleted
+    
+    def get_interrupted_tasks(self):
+        """
+        获取服务重启前未结束的任务：运行中/暂停的任务，以及已加入任务队列（stage=queued）
+        或认领后尚未重新入队（stage=resuming）的排队任务。创建后未启动的任务不会被恢复
+        """
+        with self.get_session() as session:
+            tasks = session.query(CrawlerTask).filter(or_(
+                CrawlerTask.status.in_(['running', 'paused']),
+                and_(CrawlerTask.status == 'pending', CrawlerTask.stage.in_(['queued', 'resuming']))
+            )).order_by(CrawlerTask.create_time).all()
+            return [task.to_dict() for task in tasks]
+    
+    def touch_tasks(self, task_ids, owner):
+        """
+        刷新任务心跳（运行、暂停和排队中的任务由本实例持有）
+        :param task_ids: 任务ID列表
+        :param owner: 服务实例ID
+        """
+        if not task_ids:
+            return
+        with self.get_session() as session:
+            session.query(CrawlerTask).filter(CrawlerTask.task_id.in_(task_ids)).update(
+                {'owner': owner, 'heartbeat_at': datetime.now()}, synchronize_session=False)
+    
+    def claim_interrupted_task(self, task_id, status, owner, heartbeat_timeout=60):
+        """
+        认领中断的任务（条件更新，避免多个实例重复恢复同一任务）
+        只认领其他实例持有、且心跳已超过 heartbeat_timeout 秒的任务，仍在运行的实例持有的任务不会被认领
+        :param status: 读取到的任务状态
+        :param owner: 认领的服务实例ID
+        :param heartbeat_timeout: 心跳超时（秒）
+        :return: 是否认领成功
+        """
+        now = datetime.now()
+        with self.get_session() as session:
+            updated = session.query(CrawlerTask).filter(
+                CrawlerTask.task_id == task_id,
+                CrawlerTask.status == status,
+                or_(CrawlerTask.owner.is_(None), CrawlerTask.owner != owner),
+                or_(
+                    CrawlerTask.heartbeat_at.is_(None),
+                    CrawlerTask.heartbeat_at < now - timedelta(seconds=heartbeat_timeout)
+                )
+            ).update({'status': 'pending', 'stage': 'resuming', 'detail': '服务重启，恢复任务',
+                      'owner': owner, 'heartbeat_at': now}, synchronize_session=False)
+            return updated == 1
+    
+    # ==================== 任务检查点 ====================
+    
+    def save_task_checkpoint(self, task_id, chapters, novel_id=None, incremental=False, novel_info=None,
+                             chapter_offset=0, chapter_states='', catalog_fingerprint=None):
+        """
+        保存任务检查点（章节列表确定后保存一次，之后只更新章节状态）
+        :param chapters: 章节列表 [{'url', 'title'}]
+        :param chapter_states: 每章状态字符串
+        """
+        with self.get_session() as session:
+            checkpoint = session.query(CrawlerTaskCheckpoint).filter(
+                CrawlerTaskCheckpoint.task_id == task_id
+            ).first()
+            if not checkpoint:
+                checkpoint = CrawlerTaskCheckpoint(task_id=task_id)
+                session.add(checkpoint)
+            checkpoint.novel_id = novel_id
+            checkpoint.incremental = incremental
+            checkpoint.novel_info = json.dumps(novel_info or {}, ensure_ascii=False)
+            checkpoint.chapters = json.dumps([[ch['url'], ch['title']] for ch in chapters], ensure_ascii=False)
+            checkpoint.chapter_offset = chapter_offset
+            checkpoint.chapter_states = chapter_states
+            checkpoint.catalog_fingerprint = catalog_fingerprint
+            return True
+    
+    def update_task_checkpoint_states(self, task_id, chapter_states):
+        """更新检查点中的每章状态"""
+        with self.get_session() as session:
+            updated = session.query(CrawlerTaskCheckpoint).filter(
+                CrawlerTaskCheckpoint.task_id == task_id
+            ).update({'chapter_states': chapter_states, 'updated_at': datetime.now()},
+                     synchronize_session=False)
+            return updated > 0
+    
+    def get_task_checkpoint(self, task_id):
+        """获取任务检查点"""
+        with self.get_session() as session:
+            checkpoint = session.query(CrawlerTaskCheckpoint).filter(
+                CrawlerTaskCheckpoint.task_id == task_id
+            ).first()
+            return checkpoint.to_dict() if checkpoint else None
+    
+    def delete_task_checkpoint(self, task_id):
+        """删除任务检查点"""
+        with self.get_session() as session:
+            deleted = session.query(CrawlerTaskCheckpoint).filter(
+                CrawlerTaskCheckpoint.task_id == task_id
+            ).delete(synchronize_session=False)
+            return deleted > 0
+    
+    # ==================== 任务日志 ====================
+    
+    def append_task_logs(self, logs):
+        """
+        批量追加任务日志（一条多行INSERT）
+        :param logs: [{'task_id', 'seq', 'timestamp', 'level', 'message'}]
+        """
+        if not logs:
+            return 0
+        rows = [
+            {
+                'task_id': log['task_id'],
+                'seq': log['seq'],
+                'timestamp': datetime.fromisoformat(log['timestamp']),
+                'level': log['level'],
+                'message': log['message']
+            }
+            for log in logs
+        ]
+        with self.get_connection() as conn:
+            conn.execute(CrawlerTaskLog.__table__.insert(), rows)
+        return len(rows)
+    
+    def get_task_logs(self, task_id, after=None, before=None, limit=100):
+        """
+        按序号游标分页获取任务日志（按序号升序返回）
+        :param after: 只返回序号大于after的日志（从前往后翻页）
+        :param before: 只返回序号小于before的日志中最新的limit条（从后往前翻页）
+        :param limit: 最多返回条数；都不指定时返回最新的limit条
+        """
+        with self.get_session() as session:
+            query = session.query(CrawlerTaskLog).filter(CrawlerTaskLog.task_id == task_id)
+            if after is not None:
+                logs = query.filter(CrawlerTaskLog.seq > after).order_by(CrawlerTaskLog.seq).limit(limit).all()
+                return [log.to_dict() for log in logs]
+            if before is not None:
+                query = query.filter(CrawlerTaskLog.seq < before)
+            logs = query.order_by(CrawlerTaskLog.seq.desc()).limit(limit).all()
+            return [log.to_dict() for log in reversed(logs)]
+    
+    def get_task_log_seq(self, task_id):
+        """获取任务已保存日志的最大序号（没有日志时为0）"""
+        with self.get_session() as session:
+            return session.query(func.coalesce(func.max(CrawlerTaskLog.seq), 0)).filter(
+                CrawlerTaskLog.task_id == task_id
+            ).scalar()
 
+    
+    # ==================== 定时计划管理 ====================
+    
+    def create_schedule(self, config_filename, book_id, next_run_time, max_workers=5, use_proxy=False,
+                        incremental=True, interval_minutes=None, daily_at=None, jitter_seconds=300):
+        """创建定时抓取计划"""
+        with self.get_session() as session:
+            schedule = CrawlerSchedule(
+                config_filename=config_filename,
+                book_id=book_id,
+                max_workers=max_workers,
+                use_proxy=1 if use_proxy else 0,
+                incremental=1 if incremental else 0,
+                interval_minutes=interval_minutes,
+                daily_at=daily_at,
+                jitter_seconds=jitter_seconds,
+                enabled=1,
+                next_run_time=next_run_time
+            )
+            session.add(schedule)
+            session.flush()
+            return schedule.to_dict()
+    
+    def get_schedule_by_id(self, schedule_id):
+        """根据ID获取定时计划"""
+        with self.get_session() as session:
+            schedule = session.query(CrawlerSchedule).filter(CrawlerSchedule.id == schedule_id).first()
+            return schedule.to_dict() if schedule else None
+    
+    def get_all_schedules(self):
+        """获取所有定时计划"""
+        with self.get_session() as session:
+            schedules = session.query(CrawlerSchedule).order_by(CrawlerSchedule.id).all()
+            return [schedule.to_dict() for schedule in schedules]
+    
+    def get_due_schedules(self, now):
+        """获取已到运行时间的定时计划"""
+        with self.get_session() as session:
+            schedules = session.query(CrawlerSchedule).filter(
+                CrawlerSchedule.enabled == 1,
+                CrawlerSchedule.next_run_time <= now
+            ).order_by(CrawlerSchedule.next_run_time).all()
+            return [schedule.to_dict() for schedule in schedules]
+    
+    def claim_schedule(self, schedule_id, expected_next_run, next_run_time):
+        """
+        领取一次到期的定时计划（条件更新下次运行时间，多个进程同时调度时只有一个成功）
+        :return: 是否领取成功
+        """
+        with self.get_session() as session:
+            updated = session.query(CrawlerSchedule).filter(
+                CrawlerSchedule.id == schedule_id,
+                CrawlerSchedule.next_run_time == expected_next_run
+            ).update({CrawlerSchedule.next_run_time: next_run_time}, synchronize_session=False)
+            return updated > 0
+    
+    def update_schedule(self, schedule_id, **kwargs):
+        """更新定时计划"""
+        with self.get_session() as session:
+            schedule = session.query(CrawlerSchedule).filter(CrawlerSchedule.id == schedule_id).first()
+            if not schedule:
+                return False
+            
+            # 允许更新的字段
+            allowed_fields = [
+                'max_workers', 'use_proxy', 'incremental', 'interval_minutes', 'daily_at',
+                'jitter_seconds', 'enabled', 'next_run_time', 'last_run_time', 'last_task_id'
+            ]
+            
+            for field, value in kwargs.items():
+                if field in allowed_fields and hasattr(schedule, field):
+                    if isinstance(value, bool):
+                        value = 1 if value else 0
+                    setattr(schedule, field, value)
+            
+            return True
+    
+    def delete_schedule(self, schedule_id):
+        """删除定时计划"""
+        with self.get_session() as session:
+            deleted = session.query(CrawlerSchedule).filter(CrawlerSchedule.id == schedule_id).delete()
+            return deleted > 0
 
 # 全局数据库实例（单例模式）
 _db_instance = None
 
 
 def get_database(host='localhost', user='root', password='', database='novel_db', 
-                port=3306, pool_size=20, silent=False):
+                port=3306, pool_size=20, silent=False, separate_content=False):
     """获取数据库实例（单例）"""
     global _db_instance
     if _db_instance is None:
-        _db_instance = NovelDatabase(host, user, password, database, port, pool_size, silent)
+        _db_instance = NovelDatabase(host, user, password, database, port, pool_size, silent,
+                                     separate_content)
     return _db_instance
 
@@ -4,11 +4,53 @@
 HTML解析器 - 根据配置解析HTML内容
 """
 import re
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Pattern, Union
 from scrapy import Selector
 from loguru import logger
 
 
+class HtmlDocument:
+    """
+    已解析的HTML文档 - 每个抓取到的页面只构建一次
+    XPath解析树延迟到第一次使用时才构建，正则解析直接使用原始文本，
+    同一页面的多个字段（小说信息、章节列表、翻页、正文等）共享同一棵解析树
+    """
+
+    __slots__ = ('_html', '_selector')
+
+    def __init__(self, html: str = None, selector: Selector = None):
+        """
+        初始化文档
+        :param html: HTML内容
+        :param selector: 已有的Selector节点（如章节列表中的单个条目）
+        """
+        self._html = html
+        self._selector = selector
+
+    @property
+    def html(self) -> str:
+        """原始HTML文本（正则解析使用）"""
+        if self._html is None:
+            self._html = self._selector.get() if self._selector is not None else ''
+        return self._html
+
+    @property
+    def selector(self) -> Selector:
+        """解析树（首次访问时构建）"""
+        if self._selector is None:
+            self._selector = Selector(text=self._html or '')
+        return self._selector
+
+    @property
+    def root(self):
+        """解析树的lxml根节点（供预编译的etree.XPath使用）"""
+        return self.selector.root
+
+    def xpath(self, expression: str):
+        """在解析树上执行XPath"""
+        return self.selector.xpath(expression)
+
+
 class HtmlParser:
     """HTML解析器 - 配置驱动"""
     
@@ -19,10 +61,21 @@ class HtmlParser:
         """
         self.base_url = base_url
     
-    def parse_with_config(self, html: str, parser_config: Dict) -> Any:
+    @staticmethod
+    def document(html: Union[str, HtmlDocument]) -> HtmlDocument:
+        """
+        获取已解析文档（已是HtmlDocument则直接复用）
+        :param html: HTML内容或已解析文档
+        :return: HtmlDocument
+        """
+        if isinstance(html, HtmlDocument):
+            return html
+        return HtmlDocument(html)
+
+    def parse_with_config(self, html: Union[str, HtmlDocument], parser_config: Dict) -> Any:
         """
         根据配置解析HTML
-        :param html: HTML内容
+        :param html: HTML内容或已解析文档（同一页面多字段解析时应传入HtmlDocument）
         :param parser_config: 解析器配置
         :return: 解析结果
         """
@@ -41,10 +94,11 @@ class HtmlParser:
         result = None
         
         try:
+            doc = self.document(html)
             if parse_type == 'xpath':
-                result = self._parse_xpath(html, expression, index)
+                result = self._parse_xpath(doc, expression, index)
             elif parse_type == 'regex':
-                result = self._parse_regex(html, expression, index)
+                result = self._parse_regex(doc.html, expression, index)
             else:
                 logger.warning(f"⚠️  不支持的解析类型: {parse_type}")
                 return default
@@ -63,10 +117,9 @@ class HtmlParser:
         
         return result
     
-    def _parse_xpath(self, html: str, expression: str, index: int) -> Any:
+    def _parse_xpath(self, doc: HtmlDocument, expression: str, index: int) -> Any:
         """使用XPath解析"""
-        root = Selector(text=html)
-        all_results = root.xpath(expression).getall()
+        all_results = doc.xpath(expression).getall()
         
         # 处理索引：支持Python标准的正负数索引
         # 特殊值：999 = 获取所有元素
@@ -139,72 +192,31 @@ class HtmlParser:
     
     def _process_strip(self, data: Any, params: Dict) -> Any:
         """去除首尾空白"""
-        chars = params.get('chars', None)
-        if isinstance(data, str):
-            return data.strip(chars)
-        elif isinstance(data, list):
-            return [item.strip(chars) if isinstance(item, str) else item for item in data]
-        return data
+        return process_strip(data, params.get('chars', None))
     
     def _process_replace(self, data: Any, params: Dict) -> Any:
         """字符串替换"""
-        old = params.get('old', '')
-        new = params.get('new', '')
-        
-        # 智能处理：自动处理普通空格和\xa0（不间断空格）的兼容性
-        if isinstance(data, str):
-            # 先尝试直接替换
-            if old in data:
-                return data.replace(old, new)
-            else:
-                # 尝试将data和old都标准化为普通空格后匹配
-                normalized_data = data.replace('\xa0', ' ')
-                normalized_old = old.replace('\xa0', ' ')
-                if normalized_old in normalized_data:
-                    return normalized_data.replace(normalized_old, new)
-            return data
-        elif isinstance(data, list):
-            return [item.replace(old, new) if isinstance(item, str) else item for item in data]
-        return data
+        return process_replace(data, params.get('old', ''), params.get('new', ''))
     
     def _process_regex_replace(self, data: Any, params: Dict) -> Any:
         """正则替换"""
-        pattern = params.get('pattern', '')
-        repl = params.get('repl', '')
-        
-        if isinstance(data, str):
-            return re.sub(pattern, repl, data)
-        elif isinstance(data, list):
-            return [re.sub(pattern, repl, item) if isinstance(item, str) else item for item in data]
-        return data
+        return process_regex_replace(data, params.get('pattern', ''), params.get('repl', ''))
     
     def _process_join(self, data: Any, params: Dict) -> Any:
         """连接列表"""
-        if isinstance(data, list):
-            separator = params.get('separator', '')
-            return separator.join([str(item) for item in data])
-        return data
+        return process_join(data, params.get('separator', ''))
     
     def _process_split(self, data: Any, params: Dict) -> Any:
         """分割字符串"""
-        if isinstance(data, str):
-            separator = params.get('separator', ' ')
-            return data.split(separator)
-        return data
+        return process_split(data, params.get('separator', ' '))
     
     def _process_extract_first(self, data: Any) -> Any:
         """提取第一个元素"""
-        if isinstance(data, list) and len(data) > 0:
-            return data[0]
-        return data
+        return process_extract_first(data)
     
     def _process_extract_index(self, data: Any, params: Dict) -> Any:
         """提取指定索引"""
-        if isinstance(data, list):
-            idx = params.get('index', 0)
-            if len(data) > idx:
-                return data[idx]
-        return data
+        return process_extract_index(data, params.get('index', 0))
     
     @staticmethod
     def _safe_int(value, default=0):
@@ -221,3 +233,74 @@ class HtmlParser:
             return int(value)
         return default
 
+
+# ==================== 后处理函数 ====================
+# HtmlParser（按配置逐次解释）和编译后的解析计划（extraction_plan）共用
+
+
+def process_strip(data: Any, chars: Optional[str] = None) -> Any:
+    """去除首尾空白"""
+    if isinstance(data, str):
+        return data.strip(chars)
+    elif isinstance(data, list):
+        return [item.strip(chars) if isinstance(item, str) else item for item in data]
+    return data
+
+
+def process_replace(data: Any, old: str, new: str) -> Any:
+    """字符串替换"""
+    # 智能处理：自动处理普通空格和\xa0（不间断空格）的兼容性
+    if isinstance(data, str):
+        # 先尝试直接替换
+        if old in data:
+            return data.replace(old, new)
+        else:
+            # 尝试将data和old都标准化为普通空格后匹配
+            normalized_data = data.replace('\xa0', ' ')
+            normalized_old = old.replace('\xa0', ' ')
+            if normalized_old in normalized_data:
+                return normalized_data.replace(normalized_old, new)
+        return data
+    elif isinstance(data, list):
+        return [item.replace(old, new) if isinstance(item, str) else item for item in data]
+    return data
+
+
+def process_regex_replace(data: Any, pattern: Union[str, Pattern], repl: str) -> Any:
+    """正则替换（pattern可以是字符串或预编译的正则）"""
+    if isinstance(pattern, str) and isinstance(data, (str, list)):
+        pattern = re.compile(pattern)
+    if isinstance(data, str):
+        return pattern.sub(repl, data)
+    elif isinstance(data, list):
+        return [pattern.sub(repl, item) if isinstance(item, str) else item for item in data]
+    return data
+
+
+def process_join(data: Any, separator: str = '') -> Any:
+    """连接列表"""
+    if isinstance(data, list):
+        return separator.join([str(item) for item in data])
+    return data
+
+
+def process_split(data: Any, separator: str = ' ') -> Any:
+    """分割字符串"""
+    if isinstance(data, str):
+        return data.split(separator)
+    return data
+
+
+def process_extract_first(data: Any) -> Any:
+    """提取第一个元素"""
+    if isinstance(data, list) and len(data) > 0:
+        return data[0]
+    return data
+
+
+def process_extract_index(data: Any, idx: int = 0) -> Any:
+    """提取指定索引"""
+    if isinstance(data, list):
+        if len(data) > idx:
+            return data[idx]
+    return data
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+任务进度广播 - 合并进度、批量推送日志
+- 爬虫的进度/日志回调只在内存中登记（在爬虫的 progress_lock 内调用，必须足够快），
+  由独立的广播线程统一推送到 Socket.IO
+- 进度按任务合并：每个任务每秒最多推送 progress_rate 次，只推送最新状态
+- 日志每 log_interval 秒按任务批量推送一次（task_logs 事件），每批最多 MAX_LOGS_PER_BATCH 条，
+  超过时只推送最新的（完整日志仍可通过 /task/<id>/logs 获取）
+- 只推送给订阅了该任务的客户端（subscribe_task 加入的房间）
+"""
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List
+
+from loguru import logger
+
+# 每批日志最多条数（超过时保留最新的）
+MAX_LOGS_PER_BATCH = 500
+
+
+def task_room(task_id: str) -> str:
+    """任务对应的 Socket.IO 房间名"""
+    return f'task:{task_id}'
+
+
+class ProgressBroadcaster:
+    """任务进度/日志广播线程"""
+
+    def __init__(self, socketio, progress_rate: float = 2.0, log_interval: float = 0.5):
+        """
+        :param socketio: SocketIO 实例
+        :param progress_rate: 每个任务每秒最多推送的进度次数
+        :param log_interval: 日志批量推送间隔（秒）
+        """
+        self.socketio = socketio
+        self.progress_interval = 1.0 / max(0.1, progress_rate)
+        self.log_interval = max(0.05, log_interval)
+        self.lock = threading.Lock()
+        self.dirty: Dict[str, object] = {}  # task_id -> 任务对象（推送时再生成最新状态）
+        self.last_sent: Dict[str, float] = {}  # task_id -> 上次推送进度的时间
+        self.logs: Dict[str, List[Dict]] = {}  # task_id -> 待推送日志
+        self.thread = threading.Thread(target=self._loop, name='progress-broadcaster', daemon=True)
+        self.thread.start()
+
+    def progress(self, task_obj):
+        """登记任务进度已变化（同一任务多次变化只推送最新状态）"""
+        with self.lock:
+            self.dirty[task_obj.task_id] = task_obj
+
+    def log(self, task_id: str, level: str, message: str):
+        """登记一条任务日志"""
+        entry = {'level': level, 'message': message, 'timestamp': datetime.now().isoformat()}
+        with self.lock:
+            self.logs.setdefault(task_id, []).append(entry)
+
+    def _loop(self):
+        next_logs = time.monotonic() + self.log_interval
+        tick = min(self.progress_interval, self.log_interval)
+        while True:
+            time.sleep(tick)
+            try:
+                self._emit_progress()
+                if time.monotonic() >= next_logs:
+                    next_logs = time.monotonic() + self.log_interval
+                    self._emit_logs()
+            except Exception as e:
+                logger.error(f"进度推送失败: {e}")
+
+    def _emit_progress(self):
+        now = time.monotonic()
+        with self.lock:
+            due = [task_id for task_id in self.dirty
+                   if now - self.last_sent.get(task_id, 0.0) >= self.progress_interval]
+            tasks = [self.dirty.pop(task_id) for task_id in due]
+            for task_id in due:
+                self.last_sent[task_id] = now
+            # 不再有待推送进度的任务不需要保留上次推送时间
+            for task_id in [t for t, sent in self.last_sent.items()
+                            if t not in self.dirty and now - sent > 60]:
+                del self.last_sent[task_id]
+
+        for task_obj in tasks:
+            self.socketio.emit('task_progress', {
+                'task_id': task_obj.task_id,
+                'progress': task_obj.to_dict()
+            }, to=task_room(task_obj.task_id))
+
+    def _emit_logs(self):
+        with self.lock:
+            logs, self.logs = self.logs, {}
+
+        for task_id, entries in logs.items():
+            self.socketio.emit('task_logs', {
+                'task_id': task_id,
+                'logs': entries[-MAX_LOGS_PER_BATCH:]
+            }, to=task_room(task_id))
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+请求限速器 - 按主机的令牌桶（支持突发）
+同一主机的令牌桶在进程内共享，所有爬虫任务（包括同一站点的多个任务）
+访问同一主机时共同受同一个速率约束
+"""
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+
+class TokenBucket:
+    """令牌桶（线程安全，令牌不足时预约未来的令牌，保证先到先得）"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        :param rate: 每秒补充的令牌数（即稳定请求速率）
+        :param burst: 桶容量（允许的突发请求数）
+        """
+        self.lock = threading.Lock()
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+
+    def configure(self, rate: float, burst: int):
+        """更新速率和容量（配置变更时）"""
+        with self.lock:
+            self._refill()
+            self.rate = rate
+            self.burst = max(1, burst)
+            self.tokens = min(self.tokens, self.burst)
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        """
+        取一个令牌
+        :return: 调用方需要等待的秒数（0表示立即可用）
+        """
+        with self.lock:
+            self._refill()
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def acquire(self) -> float:
+        """取一个令牌，必要时阻塞等待，返回实际等待的秒数"""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def get_host_bucket(host: str, rate: float, burst: int = 1) -> TokenBucket:
+    """
+    获取主机的共享令牌桶（不存在时创建，参数变化时按最新配置更新）
+    :param host: 主机名（含端口）
+    :param rate: 每秒请求数
+    :param burst: 突发请求数
+    """
+    with _buckets_lock:
+        bucket = _buckets.get(host)
+        if bucket is None:
+            bucket = _buckets[host] = TokenBucket(rate, burst)
+            return bucket
+    if bucket.rate != rate or bucket.burst != max(1, burst):
+        bucket.configure(rate, burst)
+    return bucket
+
+
+class RateLimiter:
+    """按请求URL的主机限速（ContentFetcher 每次请求前调用）"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        :param rate: 每个主机每秒请求数
+        :param burst: 每个主机允许的突发请求数
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+
+    def bucket(self, url: str) -> TokenBucket:
+        return get_host_bucket(urlparse(url).netloc, self.rate, self.burst)
+
+    def reserve(self, url: str) -> float:
+        """预约一次请求，返回需要等待的秒数（异步引擎用 asyncio.sleep 等待）"""
+        return self.bucket(url).reserve()
+
+    def acquire(self, url: str) -> float:
+        """阻塞直到允许请求，返回实际等待的秒数"""
+        return self.bucket(url).acquire()
+
+
+def create_rate_limiter(rate: Optional[float], burst: int = 1) -> Optional[RateLimiter]:
+    """根据配置创建限速器，速率未配置或不大于0时不限速"""
+    if not rate or rate <= 0:
+        return None
+    return RateLimiter(rate, burst)
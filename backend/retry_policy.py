@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+重试策略 - 指数退避 + 随机抖动，区分可重试与不可重试的结果
+- 可重试：超时、连接错误、HTTP 408/425/429/5xx（429/503 优先遵循 Retry-After）
+- 不可重试：其他状态码（404、403等），直接返回失败
+重试预算按任务维护：每个新请求存入一定比例的重试额度，每次重试消耗1个，
+站点持续失败时额度很快耗尽，之后的请求只尝试一次，不再成倍放大请求量
+"""
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+RETRYABLE_STATUS_CODES = (408, 425, 429)
+
+
+def is_retryable_status(status_code: int) -> bool:
+    """HTTP状态码是否值得重试"""
+    return status_code in RETRYABLE_STATUS_CODES or status_code >= 500
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    解析 Retry-After 响应头
+    :param value: 秒数或HTTP日期
+    :return: 需要等待的秒数，无法解析时返回None
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+class RetryPolicy:
+    """重试等待时间计算（Full Jitter 指数退避）"""
+
+    def __init__(self, base_delay: float = 0.5, max_delay: float = 30.0, max_retry_after: float = 120.0):
+        """
+        :param base_delay: 第一次重试的退避上限（秒），之后每次翻倍
+        :param max_delay: 退避上限（秒）
+        :param max_retry_after: Retry-After 最多等待的秒数
+        """
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+
+    def backoff(self, attempt: int) -> float:
+        """
+        第 attempt 次失败后的等待时间（attempt从0开始）
+        在 [0, min(max_delay, base_delay * 2^attempt)] 内均匀随机，避免多个线程同时重试
+        """
+        ceiling = min(self.max_delay, self.base_delay * (2 ** min(attempt, 30)))
+        return random.uniform(0, ceiling)
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """计算重试等待时间，服务端给出 Retry-After 时优先遵循"""
+        seconds = parse_retry_after(retry_after)
+        if seconds is not None:
+            return min(seconds, self.max_retry_after)
+        return self.backoff(attempt)
+
+
+class RetryBudget:
+    """任务级重试预算（线程安全）"""
+
+    def __init__(self, ratio: float = 0.2, min_retries: int = 20):
+        """
+        :param ratio: 每个新请求存入的重试额度（0.2 表示重试最多约占请求数的20%）
+        :param min_retries: 额度上限，也是任务开始时的初始额度
+        """
+        self.lock = threading.Lock()
+        self.ratio = ratio
+        self.capacity = max(1, min_retries)
+        self.balance = float(self.capacity)
+        self.retries = 0
+        self.denied = 0
+
+    def record_request(self):
+        """记录一个新请求（首次尝试），补充重试额度"""
+        with self.lock:
+            self.balance = min(self.capacity, self.balance + self.ratio)
+
+    def try_spend(self) -> bool:
+        """申请一次重试，额度不足时返回False"""
+        with self.lock:
+            if self.balance >= 1:
+                self.balance -= 1
+                self.retries += 1
+                return True
+            self.denied += 1
+            return False
@@ -7,6 +7,7 @@ import json
 import os
 import requests
 import base64
+import threading
 from pathlib import Path
 from flask import Blueprint, request, jsonify
 from loguru import logger
@@ -830,6 +831,7 @@ def run_crawler():
         start_url = data.get('start_url', '').strip()
         max_workers = data.get('max_workers', 5)
         use_proxy = data.get('use_proxy', False)
+        incremental = bool(data.get('incremental', False))
         
         if not config_filename:
             return jsonify({'success': False, 'error': '配置文件名不能为空'}), 400
@@ -873,87 +875,13 @@ def run_crawler():
             config_filename=config_filename,
             book_id=identifier,  # 对于新闻类型，这里存储URL
             max_workers=max_workers,
-            use_proxy=use_proxy
+            use_proxy=use_proxy,
+            incremental=incremental
         )
         
-        # 获取socketio实例
-        socketio = get_socketio()
-        
         # 爬虫工厂函数
-        def crawler_factory(task_obj):
-            def progress_callback(**kwargs):
-                """进度回调"""
-                task_obj.update_progress(**kwargs)
-                # 通过WebSocket推送进度
-                if socketio:
-                    socketio.emit('task_progress', {
-                        'task_id': task_obj.task_id,
-                        'progress': task_obj.to_dict()
-                    })
-            
-            def log_callback(level, message):
-                """日志回调"""
-                task_obj.add_log(level, message)
-                # 通过WebSocket推送日志
-                if socketio:
-                    socketio.emit('task_log', {
-                        'task_id': task_obj.task_id,
-                        'log': {
-                            'level': level,
-                            'message': message
-                        }
-                    })
-            
-            # 根据content_type选择爬虫类型
-            if content_type in ['news', 'article', 'blog']:
-                # 使用文章爬虫
-                from backend.generic_article_crawler import GenericArticleCrawler
-                crawler = GenericArticleCrawler(
-                    config_file=str(config_path),
-                    start_url=task_obj.book_id,  # 这里存的是URL
-                    max_workers=task_obj.max_workers,
-                    use_proxy=task_obj.use_proxy,
-                    progress_callback=progress_callback,
-                    log_callback=log_callback,
-                    stop_flag=task_obj.stop_flag
-                )
-                
-                # 在解析完列表后更新任务信息
-                original_parse = crawler.parse_article_list
-                def wrapped_parse():
-                    result = original_parse()
-                    if result and crawler.site_info_data:
-                        task_obj.novel_title = crawler.site_info_data.get('title', crawler.site_name)
-                        task_obj.novel_author = crawler.site_info_data.get('author', '未知')
-                    return result
-                
-                crawler.parse_article_list = wrapped_parse
-            else:
-                # 使用小说爬虫
-                from backend.generic_crawler import GenericNovelCrawler
-                crawler = GenericNovelCrawler(
-                    config_file=str(config_path),
-                    book_id=task_obj.book_id,
-                    max_workers=task_obj.max_workers,
-                    use_proxy=task_obj.use_proxy,
-                    progress_callback=progress_callback,
-                    log_callback=log_callback,
-                    stop_flag=task_obj.stop_flag
-                )
-                
-                # 在解析完小说信息后更新任务信息
-                original_parse_chapter_list = crawler.parse_chapter_list
-                def wrapped_parse_chapter_list():
-                    result = original_parse_chapter_list()
-                    if result and crawler.novel_info:
-                        task_obj.novel_title = crawler.novel_info.get('title', '')
-                        task_obj.novel_author = crawler.novel_info.get('author', '')
-                    return result
-                
-                crawler.parse_chapter_list = wrapped_parse_chapter_list
-            
-            return crawler
-        
+        crawler_factory = build_crawler_factory(config_path, content_type)
+
         # 启动任务
         success = task_manager.start_task(task_id, crawler_factory)
         
@@ -962,7 +890,8 @@ def run_crawler():
                 'success': True,
                 'task_id': task_id,
                 'message': f'爬虫任务已启动 ({content_type}类型)',
-                'content_type': content_type
+                'content_type': content_type,
+                'queue_position': task_manager.queue.position(task_id)
             })
         else:
             return jsonify({'success': False, 'error': '任务启动失败'}), 500
@@ -1075,7 +1004,10 @@ if __name__ == '__main__':
 # ==================== 任务管理 API ====================
 
 from backend.task_manager import task_manager, TaskStatus
-from backend.generic_crawler import GenericNovelCrawler
+from backend.task_scheduler import parse_daily_at
+from backend.task_process import ProcessCrawler, create_crawler
+from backend.progress_broadcaster import ProgressBroadcaster
+from shared.utils.config import WEB_CONFIG
 
 def get_socketio():
     """延迟导入socketio以避免循环依赖"""
@@ -1086,6 +1018,82 @@ def get_socketio():
         return None
 
 
+_broadcaster = None
+_broadcaster_lock = threading.Lock()
+
+
+def get_broadcaster():
+    """获取任务进度广播线程（首次调用时创建，socketio不可用时返回None）"""
+    global _broadcaster
+    if _broadcaster is None:
+        socketio = get_socketio()
+        if socketio is None:
+            return None
+        with _broadcaster_lock:
+            if _broadcaster is None:
+                _broadcaster = ProgressBroadcaster(
+                    socketio,
+                    progress_rate=WEB_CONFIG.get('progress_rate', 2),
+                    log_interval=WEB_CONFIG.get('log_interval', 0.5)
+                )
+    return _broadcaster
+
+
+def build_crawler_factory(config_path: Path, content_type: str = 'novel'):
+    """
+    创建爬虫工厂函数（进度和日志由广播线程合并后通过WebSocket推送）
+    :param config_path: 配置文件路径
+    :param content_type: 内容类型（novel | news | article | blog）
+    :return: crawler_factory(task_obj)
+    """
+    broadcaster = get_broadcaster()
+
+    def crawler_factory(task_obj):
+        def progress_callback(**kwargs):
+            """进度回调（在爬虫的锁内调用，只登记，不直接推送）"""
+            task_obj.update_progress(**kwargs)
+            if broadcaster:
+                broadcaster.progress(task_obj)
+
+        def log_callback(level, message):
+            """日志回调"""
+            task_obj.add_log(level, message)
+            if broadcaster:
+                broadcaster.log(task_obj.task_id, level, message)
+
+        def on_info(title, author):
+            """解析出书籍信息后更新任务"""
+            task_obj.novel_title = title
+            task_obj.novel_author = author
+
+        spec = {
+            'config_file': str(config_path),
+            'content_type': content_type,
+            'book_id': task_obj.book_id,
+            'max_workers': task_obj.granted_workers,
+            'use_proxy': task_obj.use_proxy,
+            'incremental': task_obj.incremental,
+            'task_id': task_obj.task_id  # 保存检查点，服务重启后可恢复
+        }
+        # 进程隔离模式下爬虫在子进程中运行，进度和日志通过事件流转发到上面的回调
+        crawler_class = ProcessCrawler if task_manager.isolation == 'process' else create_crawler
+        crawler = crawler_class(spec, progress_callback, log_callback, task_obj.stop_flag, on_info)
+
+        return crawler
+
+    return crawler_factory
+
+
+def build_scheduled_crawler_factory(config_filename: str):
+    """为定时计划和服务重启后恢复的任务创建爬虫工厂函数（配置文件不存在时返回None）"""
+    config_path = CONFIG_DIR / config_filename
+    if not config_path.exists():
+        return None
+    with open(config_path, 'r', encoding='utf-8') as f:
+        content_type = json.load(f).get('content_type', 'novel')
+    return build_crawler_factory(config_path, content_type)
+
+
 @crawler_bp.route('/tasks', methods=['GET'])
 def list_tasks():
     """获取所有任务列表"""
@@ -1093,7 +1101,8 @@ def list_tasks():
         tasks = task_manager.get_all_tasks()
         return jsonify({
             'success': True,
-            'tasks': [task.to_dict() for task in tasks]
+            'tasks': [task.to_dict() for task in tasks],
+            'queue': task_manager.get_queue_stats()
         })
     except Exception as e:
         logger.error(f"❌ 获取任务列表失败: {e}")
@@ -1128,6 +1137,7 @@ def create_task():
         start_url = data.get('start_url', '').strip()
         max_workers = data.get('max_workers', 5)
         use_proxy = data.get('use_proxy', False)
+        incremental = bool(data.get('incremental', False))
         
         if not config_filename:
             return jsonify({'success': False, 'error': '配置文件名不能为空'}), 400
@@ -1153,7 +1163,8 @@ def create_task():
             config_filename=config_filename,
             book_id=book_id,
             max_workers=max_workers,
-            use_proxy=use_proxy
+            use_proxy=use_proxy,
+            incremental=incremental
         )
         
         return jsonify({
@@ -1182,55 +1193,10 @@ def start_task(task_id):
         
         # 获取socketio实例
         socketio = get_socketio()
-        
+
         # 爬虫工厂函数
-        def crawler_factory(task_obj):
-            def progress_callback(**kwargs):
-                """进度回调"""
-                task_obj.update_progress(**kwargs)
-                # 通过WebSocket推送进度
-                if socketio:
-                    socketio.emit('task_progress', {
-                        'task_id': task_obj.task_id,
-                        'progress': task_obj.to_dict()
-                    })
-            
-            def log_callback(level, message):
-                """日志回调"""
-                task_obj.add_log(level, message)
-                # 通过WebSocket推送日志
-                if socketio:
-                    socketio.emit('task_log', {
-                        'task_id': task_obj.task_id,
-                        'log': {
-                            'level': level,
-                            'message': message
-                        }
-                    })
-            
-            # 创建爬虫实例
-            crawler = GenericNovelCrawler(
-                config_file=str(config_path),
-                book_id=task_obj.book_id,
-                max_workers=task_obj.max_workers,
-                use_proxy=task_obj.use_proxy,
-                progress_callback=progress_callback,
-                log_callback=log_callback,
-                stop_flag=task_obj.stop_flag
-            )
-            
-            # 在解析完小说信息后更新任务信息
-            original_parse_chapter_list = crawler.parse_chapter_list
-            def wrapped_parse_chapter_list():
-                result = original_parse_chapter_list()
-                if result and crawler.novel_info:
-                    task_obj.novel_title = crawler.novel_info.get('title', '')
-                    task_obj.novel_author = crawler.novel_info.get('author', '')
-                return result
-            crawler.parse_chapter_list = wrapped_parse_chapter_list
-            
-            return crawler
-        
+        crawler_factory = build_crawler_factory(config_path)
+
         # 启动任务
         success = task_manager.start_task(task_id, crawler_factory)
         
@@ -1241,7 +1207,8 @@ def start_task(task_id):
             
             return jsonify({
                 'success': True,
-                'message': f'任务已启动: {task_id}'
+                'message': f'任务已启动: {task_id}',
+                'queue_position': task_manager.queue.position(task_id)
             })
         else:
             return jsonify({
@@ -1305,14 +1272,23 @@ def delete_task(task_id):
 
 @crawler_bp.route('/task/<task_id>/logs', methods=['GET'])
 def get_task_logs(task_id):
-    """获取任务日志"""
+    """
+    获取任务日志（按序号游标分页）
+    - 不带游标：最新的 limit 条
+    - before=<序号>：更早的日志（向前翻页，游标取上一页的 prev_cursor）
+    - after=<序号>：更新的日志（增量拉取，游标取上一页的 next_cursor）
+    """
     try:
-        limit = request.args.get('limit', 100, type=int)
-        logs = task_manager.get_task_logs(task_id, limit)
+        limit = max(1, min(request.args.get('limit', 100, type=int), 1000))
+        after = request.args.get('after', type=int)
+        before = request.args.get('before', type=int)
+        logs = task_manager.get_task_logs(task_id, limit, after=after, before=before)
         
         return jsonify({
             'success': True,
-            'logs': logs
+            'logs': logs,
+            'prev_cursor': logs[0]['seq'] if logs and logs[0].get('seq', 0) > 1 else None,
+            'next_cursor': logs[-1]['seq'] if logs else after
         })
         
     except Exception as e:
@@ -1333,3 +1309,100 @@ def clear_completed_tasks():
         logger.error(f"❌ 清理任务失败: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+
+# ==================== 定时计划 API ====================
+
+def _parse_schedule_rule(data: dict) -> dict:
+    """从请求中读取调度规则（interval_minutes 与 daily_at 二选一）"""
+    rule = {}
+    if 'interval_minutes' in data:
+        interval = data.get('interval_minutes')
+        rule['interval_minutes'] = int(interval) if interval else None
+    if 'daily_at' in data:
+        daily_at = (data.get('daily_at') or '').strip() or None
+        if daily_at:
+            parse_daily_at(daily_at)
+        rule['daily_at'] = daily_at
+    if 'jitter_seconds' in data:
+        rule['jitter_seconds'] = max(0, int(data.get('jitter_seconds') or 0))
+    return rule
+
+
+@crawler_bp.route('/schedules', methods=['GET'])
+def list_schedules():
+    """获取所有定时计划"""
+    try:
+        return jsonify({'success': True, 'schedules': task_manager.get_all_schedules()})
+    except Exception as e:
+        logger.error(f"❌ 获取定时计划失败: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@crawler_bp.route('/schedule/create', methods=['POST'])
+def create_schedule():
+    """创建定时计划（默认增量更新）"""
+    try:
+        data = request.json
+        config_filename = data.get('config_filename', '').strip()
+        book_id = str(data.get('book_id', '')).strip()
+
+        if not config_filename or not book_id:
+            return jsonify({'success': False, 'error': '配置文件名和书籍ID不能为空'}), 400
+        if not (CONFIG_DIR / config_filename).exists():
+            return jsonify({'success': False, 'error': '配置文件不存在'}), 404
+
+        try:
+            rule = _parse_schedule_rule(data)
+            schedule = task_manager.create_schedule(
+                config_filename,
+                book_id,
+                max_workers=data.get('max_workers', 5),
+                use_proxy=data.get('use_proxy', False),
+                incremental=bool(data.get('incremental', True)),
+                **rule
+            )
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+        return jsonify({'success': True, 'schedule': schedule})
+    except Exception as e:
+        logger.error(f"❌ 创建定时计划失败: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@crawler_bp.route('/schedule/<int:schedule_id>/update', methods=['POST'])
+def update_schedule(schedule_id):
+    """更新定时计划（启用/停用、调度规则、并发等）"""
+    try:
+        data = request.json or {}
+        try:
+            updates = _parse_schedule_rule(data)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        for field in ('max_workers', 'use_proxy', 'incremental', 'enabled'):
+            if field in data:
+                updates[field] = data[field]
+
+        try:
+            schedule = task_manager.update_schedule(schedule_id, **updates)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        if not schedule:
+            return jsonify({'success': False, 'error': '定时计划不存在'}), 404
+
+        return jsonify({'success': True, 'schedule': schedule})
+    except Exception as e:
+        logger.error(f"❌ 更新定时计划失败: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@crawler_bp.route('/schedule/<int:schedule_id>/delete', methods=['DELETE'])
+def delete_schedule(schedule_id):
+    """删除定时计划"""
+    try:
+        if task_manager.delete_schedule(schedule_id):
+            return jsonify({'success': True, 'message': f'定时计划已删除: {schedule_id}'})
+        return jsonify({'success': False, 'error': '定时计划不存在'}), 404
+    except Exception as e:
+        logger.error(f"❌ 删除定时计划失败: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
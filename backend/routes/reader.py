@@ -76,13 +76,8 @@ def get_novel_info(novel_id):
         db = get_db()
         
         # 获取小说信息
-        novels = db.get_all_novels()
-        novel_info = None
-        for novel in novels:
-            if novel['id'] == novel_id:
-                novel_info = novel
-                break
-        
+        novel_info = db.get_novel_by_id(novel_id)
+
         if not novel_info:
             db.close()
             return jsonify({
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+任务检查点 - 服务重启后从断点继续抓取
+- 章节列表确定、小说记录创建后保存一次：章节列表、小说信息、小说ID、章节号偏移、目录指纹
+- 下载过程中记录每章状态（0未完成 1已保存 2失败），章节落库后才标记为已保存，
+  每 save_interval 秒写入一次数据库
+- 恢复时直接使用检查点中的章节列表（不再获取目录页），已保存的章节不再逐章检查Redis
+- 任务结束（完成/失败/停止）后由任务管理器删除检查点，只有服务中断的任务会保留
+"""
+import threading
+import time
+from typing import Dict, Iterable, Optional, Set
+
+from loguru import logger
+
+from backend.chapter_record import PENDING, DONE
+
+
+class TaskCheckpoint:
+    """任务检查点（线程安全）"""
+
+    def __init__(self, db, task_id: str, save_interval: float = 5.0):
+        """
+        :param db: NovelDatabase 实例
+        :param task_id: 任务ID
+        :param save_interval: 章节状态写入数据库的最短间隔（秒）
+        """
+        self.db = db
+        self.task_id = task_id
+        self.save_interval = save_interval
+        self.lock = threading.Lock()
+        self.states = bytearray()
+        self.saved = False  # 检查点是否已保存（章节列表已落库）
+        self.dirty = False
+        self.last_save = 0.0
+
+    def load(self) -> Optional[Dict]:
+        """读取检查点（没有或章节列表为空时返回None）"""
+        try:
+            data = self.db.get_task_checkpoint(self.task_id)
+        except Exception as e:
+            logger.warning(f"⚠️  读取任务检查点失败: {e}")
+            return None
+        if not data or not data['chapters']:
+            return None
+        states = data['chapter_states'].ljust(len(data['chapters']), PENDING)
+        with self.lock:
+            self.states = bytearray(states[:len(data['chapters'])].encode('ascii'))
+            self.saved = True
+        return data
+
+    def save(self, chapters, novel_id: Optional[int], incremental: bool, novel_info: Dict,
+             chapter_offset: int, catalog_fingerprint: Optional[str]):
+        """章节列表确定后保存完整检查点（从检查点恢复时只更新章节状态）"""
+        if self.saved:
+            self.flush()
+            return
+        with self.lock:
+            self.states = bytearray(PENDING.encode('ascii') * len(chapters))
+            states = self.states.decode('ascii')
+        try:
+            self.db.save_task_checkpoint(
+                self.task_id, chapters, novel_id=novel_id, incremental=incremental, novel_info=novel_info,
+                chapter_offset=chapter_offset, chapter_states=states, catalog_fingerprint=catalog_fingerprint
+            )
+            self.saved = True
+            self.last_save = time.monotonic()
+        except Exception as e:
+            logger.warning(f"⚠️  保存任务检查点失败: {e}")
+
+    def done_indices(self) -> Set[int]:
+        """已保存的章节索引"""
+        with self.lock:
+            return {index for index, state in enumerate(self.states) if state == ord(DONE)}
+
+    def mark(self, indices: Iterable[int], state: str):
+        """
+        更新章节状态（距离上次写入超过 save_interval 秒时写入数据库）
+        :param indices: 章节索引
+        :param state: DONE / FAILED / PENDING
+        """
+        value = ord(state)
+        with self.lock:
+            for index in indices:
+                if 0 <= index < len(self.states):
+                    self.states[index] = value
+            self.dirty = True
+        if time.monotonic() - self.last_save >= self.save_interval:
+            self.flush()
+
+    def flush(self):
+        """立即写入章节状态"""
+        with self.lock:
+            if not self.saved or not self.dirty:
+                return
+            states = self.states.decode('ascii')
+            self.dirty = False
+            self.last_save = time.monotonic()
+        try:
+            self.db.update_task_checkpoint_states(self.task_id, states)
+        except Exception as e:
+            logger.warning(f"⚠️  保存章节状态失败: {e}")
+            with self.lock:
+                self.dirty = True
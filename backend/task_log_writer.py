@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+任务日志落库 - 后台线程批量写入 crawler_task_logs 表
+- 任务内存中只保留最近 max_logs 条日志（环形缓冲），完整日志由本模块异步写入数据库，
+  添加日志只是放入队列，不会阻塞爬虫线程
+- 每 flush_interval 秒或积累 batch_size 条时整批写入（一条多行INSERT）
+- 数据库不可用时最多积压 max_pending 条，超出的最早日志被丢弃
+"""
+import threading
+from collections import deque
+from typing import Dict
+
+from loguru import logger
+
+
+class TaskLogWriter:
+    """任务日志批量写入线程（所有任务共用）"""
+
+    def __init__(self, db, batch_size: int = 200, flush_interval: float = 1.0, max_pending: int = 20000):
+        """
+        :param db: NovelDatabase 实例
+        :param batch_size: 每批最多写入的日志条数
+        :param flush_interval: 日志最长停留时间（秒）
+        :param max_pending: 最多积压的日志条数
+        """
+        self.db = db
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.cond = threading.Condition()
+        self.flush_lock = threading.Lock()
+        self.pending = deque(maxlen=max_pending)
+        self.thread = threading.Thread(target=self._flush_loop, name='task-log-writer', daemon=True)
+        self.thread.start()
+
+    def add(self, task_id: str, entry: Dict):
+        """
+        放入一条待写入的日志
+        :param task_id: 任务ID
+        :param entry: {'seq', 'timestamp', 'level', 'message'}
+        """
+        with self.cond:
+            self.pending.append({'task_id': task_id, **entry})
+            if len(self.pending) >= self.batch_size:
+                self.cond.notify()
+
+    def flush(self):
+        """立即写入所有积压的日志"""
+        with self.flush_lock:
+            while True:
+                with self.cond:
+                    batch = [self.pending.popleft() for _ in range(min(self.batch_size, len(self.pending)))]
+                if not batch:
+                    return
+                try:
+                    self.db.append_task_logs(batch)
+                except Exception as e:
+                    logger.error(f"❌ 任务日志写入数据库失败（{len(batch)} 条），稍后重试: {e}")
+                    with self.cond:
+                        self.pending.extendleft(reversed(batch))
+                    return
+
+    def _flush_loop(self):
+        while True:
+            with self.cond:
+                if len(self.pending) < self.batch_size:
+                    self.cond.wait(self.flush_interval)
+            self.flush()
@@ -9,16 +9,32 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+import os
 import time
 import uuid
+import socket
 import threading
+from collections import deque
 from typing import Dict, List, Optional, Callable
 from datetime import datetime
 from enum import Enum
+from urllib.parse import urlparse
 from loguru import logger
 
+from shared.utils import config as app_config
 from shared.utils.config import DB_CONFIG
 from backend.models.database import get_database
+from backend.circuit_breaker import circuit_breakers, OPEN, CLOSED
+from backend.task_scheduler import TaskScheduler, compute_next_run
+from backend.task_queue import TaskQueue, PRIORITY_INTERACTIVE
+from backend.task_log_writer import TaskLogWriter
+from backend.task_state_syncer import TaskStateSyncer
+
+# 任务队列配置（旧的 config.py 中没有 TASK_QUEUE_CONFIG 时使用默认值）
+TASK_QUEUE_CONFIG = getattr(app_config, 'TASK_QUEUE_CONFIG', {})
+
+# 服务实例ID（主机名:进程号:启动ID），记录在持有的任务上，其他实例只认领心跳超时的任务
+INSTANCE_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
 
 
 class TaskStatus(Enum):
@@ -35,7 +51,7 @@ class CrawlerTask:
     """爬虫任务"""
     
     def __init__(self, task_id: str, config_filename: str, book_id: str, 
-                 max_workers: int = 5, use_proxy: bool = False):
+                 max_workers: int = 5, use_proxy: bool = False, incremental: bool = False):
         """
         初始化任务
         :param task_id: 任务ID
@@ -43,12 +59,15 @@ class CrawlerTask:
         :param book_id: 书籍ID
         :param max_workers: 并发线程数
         :param use_proxy: 是否使用代理
+        :param incremental: 是否增量更新（只下载上次之后的新章节）
         """
         self.task_id = task_id
         self.config_filename = config_filename
         self.book_id = book_id
         self.max_workers = max_workers
         self.use_proxy = use_proxy
+        self.incremental = incremental
+        self.granted_workers = max_workers  # 任务队列实际分配的并发线程数
         
         # 任务状态
         self.status = TaskStatus.PENDING
@@ -64,13 +83,23 @@ class CrawlerTask:
         self.stage = "pending"  # 当前阶段: pending, parsing_list, downloading, completed
         self.detail = ""  # 详细信息，如"正在解析第3/10页"
         
+        # 网络统计
+        self.connections_opened = 0  # 新建的HTTP连接数
+        self.connections_reused = 0  # 复用的HTTP连接数（keep-alive）
+        self.concurrency = max_workers  # 当前有效并发数（自适应并发时随站点状况变化）
+        
         # 小说信息
         self.novel_title = ""
         self.novel_author = ""
         
-        # 日志
-        self.logs: List[Dict] = []
-        self.max_logs = 1000  # 最多保留1000条日志
+        # 日志（内存中只保留最近1000条，完整日志由 log_sink 写入数据库）
+        self.max_logs = 1000
+        self.logs = deque(maxlen=self.max_logs)
+        self.log_seq = 0  # 日志序号（分页游标）
+        self.log_sink: Optional[Callable[[str, Dict], None]] = None
+        
+        # 状态变化时的同步回调（合并后写入数据库）
+        self.state_sink: Optional[Callable[['CrawlerTask'], None]] = None
         
         # 错误信息
         self.error_message = ""
@@ -81,6 +110,13 @@ class CrawlerTask:
         
         # 爬虫实例
         self.crawler = None
+        
+        # 排队中时指向任务队列（获得运行槽后清空）
+        self.queue: Optional[TaskQueue] = None
+        self.crawler_factory: Optional[Callable] = None
+        
+        # 因熔断暂停时记录对应的主机（熔断器关闭后自动恢复）
+        self.paused_host: Optional[str] = None
     
     def add_log(self, level: str, message: str):
         """
@@ -88,20 +124,23 @@ class CrawlerTask:
         :param level: 日志级别 (INFO, WARNING, ERROR, SUCCESS)
         :param message: 日志消息
         """
+        self.log_seq += 1
         log_entry = {
+            'seq': self.log_seq,
             'timestamp': datetime.now().isoformat(),
             'level': level,
             'message': message
         }
-        self.logs.append(log_entry)
+        self.logs.append(log_entry)  # 超过 max_logs 时自动丢弃最早的
         
-        # 限制日志数量
-        if len(self.logs) > self.max_logs:
-            self.logs.pop(0)
+        if self.log_sink:
+            self.log_sink(self.task_id, log_entry)
     
     def update_progress(self, total: int = None, completed: int = None, 
                        failed: int = None, current: str = None,
                        stage: str = None, detail: str = None, 
+                       connections_opened: int = None, connections_reused: int = None,
+                       concurrency: int = None,
                        sync_to_db: bool = True, task_manager=None, **kwargs):
         """
         更新进度信息
@@ -111,8 +150,11 @@ class CrawlerTask:
         :param current: 当前章节
         :param stage: 当前阶段 (parsing_list, downloading, completed)
         :param detail: 详细信息（如"正在解析第3/10页"）
-        :param sync_to_db: 是否同步到数据库
-        :param task_manager: 任务管理器实例（用于同步数据库）
+        :param connections_opened: 新建的HTTP连接数
+        :param connections_reused: 复用的HTTP连接数
+        :param concurrency: 当前有效并发数
+        :param sync_to_db: 是否同步到数据库（只标记为待同步，由后台线程合并写入）
+        :param task_manager: 任务管理器实例（不传时使用创建任务时设置的 state_sink）
         :param kwargs: 其他参数（兼容扩展）
         """
         if total is not None:
@@ -127,15 +169,18 @@ class CrawlerTask:
             self.stage = stage
         if detail is not None:
             self.detail = detail
+        if connections_opened is not None:
+            self.connections_opened = connections_opened
+        if connections_reused is not None:
+            self.connections_reused = connections_reused
+        if concurrency is not None:
+            self.concurrency = concurrency
         
-        # 同步到数据库（避免过于频繁，仅每10个章节或阶段变化时同步）
-        if sync_to_db and task_manager and (
-            stage is not None or 
-            (completed is not None and completed % 10 == 0) or
-            total is not None
-        ):
+        # 同步到数据库（只标记为待同步，写入频率与爬取速度无关）
+        sync = task_manager._sync_task_to_db if task_manager else self.state_sink
+        if sync_to_db and sync:
             try:
-                task_manager._sync_task_to_db(self)
+                sync(self)
             except Exception:
                 pass  # 静默失败，不影响爬虫运行
     
@@ -153,7 +198,10 @@ class CrawlerTask:
             'book_id': self.book_id,
             'max_workers': self.max_workers,
             'use_proxy': self.use_proxy,
+            'incremental': self.incremental,
+            'granted_workers': self.granted_workers,
             'status': self.status.value,
+            'queue_position': self.queue.position(self.task_id) if self.queue else None,
             'create_time': self.create_time.isoformat(),
             'start_time': self.start_time.isoformat() if self.start_time else None,
             'end_time': self.end_time.isoformat() if self.end_time else None,
@@ -163,11 +211,14 @@ class CrawlerTask:
             'current_chapter': self.current_chapter,
             'stage': self.stage,  # 新增：当前阶段
             'detail': self.detail,  # 新增：详细信息
+            'connections_opened': self.connections_opened,
+            'connections_reused': self.connections_reused,
+            'concurrency': self.concurrency,
             'progress_percent': self.get_progress_percent(),
             'novel_title': self.novel_title,
             'novel_author': self.novel_author,
             'error_message': self.error_message,
-            'log_count': len(self.logs)
+            'log_count': self.log_seq
         }
 
 
@@ -190,31 +241,70 @@ class TaskManager:
             self.lock = threading.Lock()
             self.db = get_database(**DB_CONFIG, silent=True)  # 数据库实例
             self.db_enabled = False  # 数据库功能是否可用
+            self.log_writer: Optional[TaskLogWriter] = None  # 任务日志落库（数据库可用时）
+            self.state_syncer: Optional[TaskStateSyncer] = None  # 任务状态合并写入（数据库可用时）
             
             # 检查并初始化数据库表
             try:
-                from shared.models.models import CrawlerTask as CrawlerTaskModel
+                from shared.models.models import (CrawlerTask as CrawlerTaskModel, CrawlerSchedule, CrawlerTaskLog,
+                                                  CrawlerTaskCheckpoint)
                 CrawlerTaskModel.__table__.create(self.db.engine, checkfirst=True)
+                CrawlerSchedule.__table__.create(self.db.engine, checkfirst=True)
+                CrawlerTaskLog.__table__.create(self.db.engine, checkfirst=True)
+                CrawlerTaskCheckpoint.__table__.create(self.db.engine, checkfirst=True)
                 self.db_enabled = True
+                self.log_writer = TaskLogWriter(self.db)
+                self.state_syncer = TaskStateSyncer(
+                    self.db, flush_interval=float(TASK_QUEUE_CONFIG.get('state_sync_interval', 2)),
+                    owner=INSTANCE_ID,
+                    heartbeat_interval=int(TASK_QUEUE_CONFIG.get('heartbeat_timeout', 60)) / 3
+                )
                 logger.info("✅ 任务管理器初始化完成（支持数据库持久化）")
             except Exception as e:
                 logger.warning(f"⚠️  任务管理器数据库功能未启用: {e}")
                 logger.info("✅ 任务管理器初始化完成（仅内存模式）")
             
+            # 站点熔断时暂停受影响的任务，恢复后继续
+            circuit_breakers.add_listener(self._on_circuit_change)
+            
+            # 定时任务调度器（由 start_scheduler 启动）
+            self.scheduler: Optional[TaskScheduler] = None
+            
+            # 任务运行方式：thread（API进程内的线程）或 process（每个任务一个子进程）
+            self.isolation = TASK_QUEUE_CONFIG.get('isolation', 'thread')
+            if self.isolation not in ('thread', 'process'):
+                logger.warning(f"⚠️  未知的任务运行方式 {self.isolation}，使用 thread")
+                self.isolation = 'thread'
+            if self.isolation == 'process':
+                # 每个子进程有自己的熔断器，需要Redis共享熔断状态
+                from backend.task_process import connect_breaker_redis
+                if connect_breaker_redis() is None:
+                    logger.warning("⚠️  进程隔离模式下Redis不可用：各任务的熔断器互不相通，"
+                                   "站点熔断时只暂停触发熔断的任务")
+            
+            # 任务队列：限制同时运行的任务数和所有任务的请求线程总数
+            self.queue = TaskQueue(
+                max_running=int(TASK_QUEUE_CONFIG.get('max_running', 3)),
+                worker_budget=int(TASK_QUEUE_CONFIG.get('worker_budget', 20)),
+                on_admit=self._run_admitted
+            )
+            
             self.initialized = True
     
     def create_task(self, config_filename: str, book_id: str, 
-                   max_workers: int = 5, use_proxy: bool = False) -> str:
+                   max_workers: int = 5, use_proxy: bool = False, incremental: bool = False) -> str:
         """
         创建新任务
         :param config_filename: 配置文件名
         :param book_id: 书籍ID
         :param max_workers: 并发线程数
         :param use_proxy: 是否使用代理
+        :param incremental: 是否增量更新
         :return: 任务ID
         """
         task_id = str(uuid.uuid4())
-        task = CrawlerTask(task_id, config_filename, book_id, max_workers, use_proxy)
+        task = CrawlerTask(task_id, config_filename, book_id, max_workers, use_proxy, incremental)
+        self._attach_sinks(task)
         
         with self.lock:
             self.tasks[task_id] = task
@@ -222,13 +312,19 @@ class TaskManager:
         # 持久化到数据库（如果启用）
         if self.db_enabled:
             try:
-                self.db.create_task(task_id, config_filename, book_id, max_workers, use_proxy)
+                self.db.create_task(task_id, config_filename, book_id, max_workers, use_proxy, incremental)
                 logger.info(f"📋 创建任务: {task_id} (Book ID: {book_id}) - 已保存到数据库")
             except Exception as e:
                 logger.error(f"❌ 保存任务到数据库失败: {e}")
         
         return task_id
     
+    def _attach_sinks(self, task: CrawlerTask):
+        """设置任务状态和日志的落库回调"""
+        task.state_sink = self._sync_task_to_db
+        if self.log_writer:
+            task.log_sink = self.log_writer.add
+    
     def get_task(self, task_id: str, include_db: bool = False) -> Optional[CrawlerTask]:
         """
         获取任务
@@ -290,7 +386,8 @@ class TaskManager:
             task_data['config_filename'],
             task_data['book_id'],
             task_data['max_workers'],
-            task_data['use_proxy']
+            task_data['use_proxy'],
+            task_data.get('incremental', False)
         )
         task.status = TaskStatus(task_data['status'])
         task.create_time = datetime.fromisoformat(task_data['create_time']) if task_data['create_time'] else datetime.now()
@@ -307,24 +404,55 @@ class TaskManager:
         task.error_message = task_data['error_message'] or ""
         return task
     
-    def start_task(self, task_id: str, crawler_factory: Callable) -> bool:
+    def start_task(self, task_id: str, crawler_factory: Callable,
+                   priority: int = PRIORITY_INTERACTIVE) -> bool:
         """
-        启动任务
+        启动任务（加入任务队列，有空闲运行槽时立即运行）
         :param task_id: 任务ID
         :param crawler_factory: 爬虫工厂函数
-        :return: 是否成功启动
+        :param priority: 优先级（数值越小越优先）
+        :return: 是否成功加入队列
         """
         task = self.get_task(task_id)
         if not task:
             logger.error(f"❌ 任务不存在: {task_id}")
             return False
         
-        if task.status == TaskStatus.RUNNING:
-            logger.warning(f"⚠️  任务已在运行: {task_id}")
+        if task.status in (TaskStatus.RUNNING, TaskStatus.PAUSED) or task.queue is not None:
+            logger.warning(f"⚠️  任务已在运行或排队: {task_id}")
             return False
         
         # 重置停止标志
         task.stop_flag.clear()
+        task.status = TaskStatus.PENDING
+        task.crawler_factory = crawler_factory
+        task.queue = self.queue
+        # 入队标记立即写入数据库：服务重启时只恢复已加入队列的任务，创建后未启动的任务保持不变
+        task.stage = 'queued'
+        task.detail = '排队等待运行'
+        self._sync_task_to_db(task, immediate=True)
+        self.queue.submit(task_id, task.max_workers, priority)
+        
+        position = self.queue.position(task_id)
+        if position:
+            task.add_log('INFO', f"⏳ 任务已加入队列，排队位置: {position}")
+            logger.info(f"⏳ 任务排队中: {task_id} (位置: {position})")
+        return True
+    
+    def _run_admitted(self, task_id: str, granted_workers: int):
+        """任务获得运行槽（TaskQueue 回调）：在新线程中运行爬虫"""
+        task = self.tasks.get(task_id)
+        if task is None or task.queue is None:
+            # 排队期间已被删除
+            self.queue.release(task_id)
+            return
+        
+        task.queue = None
+        task.granted_workers = granted_workers
+        task.concurrency = granted_workers
+        crawler_factory, task.crawler_factory = task.crawler_factory, None
+        if granted_workers < task.max_workers:
+            task.add_log('INFO', f"⚖️  线程预算不足，本任务并发数: {granted_workers}/{task.max_workers}")
         
         # 创建并启动线程
         def run_task():
@@ -366,18 +494,198 @@ class TaskManager:
             finally:
                 task.end_time = datetime.now()
                 task.crawler = None
+                task.paused_host = None
+                
+                # 任务已结束，不再需要检查点（只有服务中断的任务会保留检查点）
+                self._delete_checkpoint(task_id)
                 
                 # 同步最终状态到数据库
                 try:
                     self._sync_task_to_db(task)
                 except Exception as e:
                     logger.error(f"❌ 同步任务状态到数据库失败: {e}")
+                
+                # 释放运行槽，启动下一个排队任务
+                self.queue.release(task_id)
         
         task.thread = threading.Thread(target=run_task, daemon=True)
         task.thread.start()
         
-        logger.info(f"🚀 任务已启动: {task_id}")
-        return True
+        logger.info(f"🚀 任务已启动: {task_id} (并发数: {granted_workers})")
+    
+    def get_queue_stats(self) -> Dict:
+        """任务队列状态（运行槽、线程预算、排队数）"""
+        return self.queue.get_stats()
+    
+    def find_active_task(self, config_filename: str, book_id: str) -> Optional[CrawlerTask]:
+        """查找同一本书正在运行、排队或因熔断暂停的任务"""
+        with self.lock:
+            for task in self.tasks.values():
+                if (task.config_filename == config_filename and task.book_id == book_id
+                        and (task.status in (TaskStatus.RUNNING, TaskStatus.PAUSED) or task.queue is not None)):
+                    return task
+        return None
+    
+    # ==================== 中断任务恢复 ====================
+    
+    def resume_interrupted_tasks(self, crawler_factory_builder: Callable[[str], Optional[Callable]]) -> int:
+        """
+        服务启动时恢复中断的任务（数据库中仍为运行中/暂停、或已加入任务队列的任务），
+        其他仍在运行的服务实例持有的任务（心跳未超时）不会被认领
+        有检查点的小说任务直接使用检查点中的章节列表和章节状态继续下载
+        :param crawler_factory_builder: 根据配置文件名创建爬虫工厂函数
+        :return: 恢复的任务数
+        """
+        if not self.db_enabled or not TASK_QUEUE_CONFIG.get('resume_on_startup', True):
+            return 0
+        
+        try:
+            interrupted = self.db.get_interrupted_tasks()
+        except Exception as e:
+            logger.error(f"❌ 查询中断的任务失败: {e}")
+            return 0
+        
+        heartbeat_timeout = int(TASK_QUEUE_CONFIG.get('heartbeat_timeout', 60))
+        resumed = 0
+        for task_data in interrupted:
+            task_id = task_data['task_id']
+            try:
+                if task_id in self.tasks or not self.db.claim_interrupted_task(
+                        task_id, task_data['status'], INSTANCE_ID, heartbeat_timeout):
+                    continue
+                
+                task = self._dict_to_task(task_data)
+                checkpoint = self.db.get_task_checkpoint(task_id)
+                task.log_seq = self.db.get_task_log_seq(task_id)
+                task.status = TaskStatus.PENDING
+                task.end_time = None
+                self._attach_sinks(task)
+                with self.lock:
+                    self.tasks[task_id] = task
+                
+                crawler_factory = crawler_factory_builder(task.config_filename)
+                if crawler_factory is None:
+                    task.status = TaskStatus.FAILED
+                    task.end_time = datetime.now()
+                    task.error_message = f'配置文件不存在: {task.config_filename}'
+                    task.add_log('ERROR', f'❌ 服务重启后无法恢复任务: {task.error_message}')
+                    self._delete_checkpoint(task_id)
+                    self._sync_task_to_db(task)
+                    continue
+                
+                if checkpoint:
+                    task.add_log('INFO', f"♻️  服务重启，从检查点恢复任务（{len(checkpoint['chapters'])} 章）")
+                else:
+                    task.add_log('INFO', '♻️  服务重启，重新运行任务')
+                self.start_task(task_id, crawler_factory)
+                resumed += 1
+            except Exception as e:
+                logger.error(f"❌ 恢复任务失败 {task_id}: {e}")
+        
+        if resumed:
+            logger.info(f"♻️  已恢复 {resumed} 个中断的任务")
+        return resumed
+    
+    def _delete_checkpoint(self, task_id: str):
+        if not self.db_enabled:
+            return
+        try:
+            self.db.delete_task_checkpoint(task_id)
+        except Exception as e:
+            logger.error(f"❌ 删除任务检查点失败: {e}")
+    
+    # ==================== 定时计划 ====================
+    
+    def start_scheduler(self, crawler_factory_builder: Callable[[str], Optional[Callable]]):
+        """
+        启动定时任务调度器（重复调用无效）
+        :param crawler_factory_builder: 根据配置文件名创建爬虫工厂函数
+        """
+        if not self.db_enabled:
+            logger.warning("⚠️  数据库功能未启用，定时任务调度器不启动")
+            return
+        with self.lock:
+            if self.scheduler is None:
+                self.scheduler = TaskScheduler(self, crawler_factory_builder)
+                self.scheduler.start()
+    
+    def create_schedule(self, config_filename: str, book_id: str, max_workers: int = 5,
+                        use_proxy: bool = False, incremental: bool = True,
+                        interval_minutes: Optional[int] = None, daily_at: Optional[str] = None,
+                        jitter_seconds: int = 300) -> Dict:
+        """
+        创建定时计划（interval_minutes 与 daily_at 二选一）
+        :return: 计划字典
+        """
+        rule = {'interval_minutes': interval_minutes, 'daily_at': daily_at, 'jitter_seconds': jitter_seconds}
+        next_run_time = compute_next_run(rule, datetime.now())
+        if next_run_time is None:
+            raise ValueError('请设置运行间隔或每天运行时间')
+        schedule = self.db.create_schedule(
+            config_filename, book_id, next_run_time, max_workers=max_workers, use_proxy=use_proxy,
+            incremental=incremental, interval_minutes=interval_minutes, daily_at=daily_at,
+            jitter_seconds=jitter_seconds
+        )
+        logger.info(f"⏰ 创建定时计划 #{schedule['id']}: 书籍 {book_id}，下次运行 {schedule['next_run_time']}")
+        self._wake_scheduler()
+        return schedule
+    
+    def get_all_schedules(self) -> List[Dict]:
+        """获取所有定时计划"""
+        return self.db.get_all_schedules()
+    
+    def update_schedule(self, schedule_id: int, **kwargs) -> Optional[Dict]:
+        """更新定时计划（调度规则变化或重新启用时重新计算下次运行时间）"""
+        schedule = self.db.get_schedule_by_id(schedule_id)
+        if not schedule:
+            return None
+        rule_changed = any(key in kwargs for key in ('interval_minutes', 'daily_at', 'jitter_seconds'))
+        if rule_changed or (kwargs.get('enabled') and not schedule['enabled']):
+            rule = {**schedule, **kwargs}
+            next_run_time = compute_next_run(rule, datetime.now())
+            if next_run_time is None:
+                raise ValueError('请设置运行间隔或每天运行时间')
+            kwargs['next_run_time'] = next_run_time
+        self.db.update_schedule(schedule_id, **kwargs)
+        self._wake_scheduler()
+        return self.db.get_schedule_by_id(schedule_id)
+    
+    def delete_schedule(self, schedule_id: int) -> bool:
+        """删除定时计划"""
+        return self.db.delete_schedule(schedule_id)
+    
+    def _wake_scheduler(self):
+        if self.scheduler is not None:
+            self.scheduler.wake()
+    
+    def _on_circuit_change(self, host: str, state: str):
+        """
+        熔断器状态变化：暂停/恢复访问该主机的运行中任务
+        （爬虫的请求线程在熔断期间会等待，不会把章节记为失败）
+        """
+        with self.lock:
+            tasks = list(self.tasks.values())
+        
+        for task in tasks:
+            crawler = task.crawler
+            if crawler is None or urlparse(getattr(crawler, 'base_url', None) or '').netloc != host:
+                continue
+            
+            if state == OPEN and task.status == TaskStatus.RUNNING:
+                task.status = TaskStatus.PAUSED
+                task.paused_host = host
+                task.add_log('WARNING', f'⏸️  站点 {host} 暂时不可用（已熔断），任务暂停，恢复后自动继续')
+            elif state == CLOSED and task.status == TaskStatus.PAUSED and task.paused_host == host:
+                task.status = TaskStatus.RUNNING
+                task.paused_host = None
+                task.add_log('SUCCESS', f'▶️  站点 {host} 已恢复，任务继续')
+            else:
+                continue
+            
+            try:
+                self._sync_task_to_db(task)
+            except Exception as e:
+                logger.error(f"❌ 同步任务状态失败: {e}")
     
     def stop_task(self, task_id: str) -> bool:
         """
@@ -389,8 +697,20 @@ class TaskManager:
         task = self.get_task(task_id, include_db=False)
         
         if task:
+            # 排队中的任务直接移出队列
+            if task.queue is not None and self.queue.cancel(task_id):
+                task.queue = None
+                task.crawler_factory = None
+                task.status = TaskStatus.STOPPED
+                task.end_time = datetime.now()
+                task.detail = ''
+                task.add_log('WARNING', '⚠️  任务已移出队列')
+                logger.info(f"🛑 取消排队任务: {task_id}")
+                self._sync_task_to_db(task)
+                return True
+            
             # 内存中有任务，正常停止
-            if task.status != TaskStatus.RUNNING:
+            if task.status not in (TaskStatus.RUNNING, TaskStatus.PAUSED):
                 logger.warning(f"⚠️  任务状态为 {task.status.value}，无法停止")
                 return False
             
@@ -403,7 +723,6 @@ class TaskManager:
             # 内存中没有，可能是僵尸任务，直接更新数据库状态
             if self.db_enabled:
                 try:
-                    from datetime import datetime
                     updated = self.db.update_task(
                         task_id,
                         status='stopped',
@@ -429,8 +748,8 @@ class TaskManager:
         # 先从内存获取任务
         task = self.get_task(task_id, include_db=False)
         
-        # 如果任务在内存中且正在运行，尝试停止
-        if task and task.status == TaskStatus.RUNNING:
+        # 如果任务在内存中且正在运行或排队，尝试停止
+        if task and (task.status in (TaskStatus.RUNNING, TaskStatus.PAUSED) or task.queue is not None):
             try:
                 self.stop_task(task_id)
                 # 等待线程结束（最多2秒，不要太久）
@@ -446,6 +765,8 @@ class TaskManager:
                 del self.tasks[task_id]
                 deleted_from_memory = True
                 logger.info(f"🗑️  从内存删除任务: {task_id}")
+            if self.state_syncer:
+                self.state_syncer.forget(task_id)
         
         # 从数据库中强制删除（同时清理失败章节）
         deleted_from_db = False
@@ -468,19 +789,41 @@ class TaskManager:
             logger.warning(f"⚠️  任务不存在: {task_id}")
             return False
     
-    def get_task_logs(self, task_id: str, limit: int = 100) -> List[Dict]:
+    def get_task_logs(self, task_id: str, limit: int = 100,
+                      after: Optional[int] = None, before: Optional[int] = None) -> List[Dict]:
         """
-        获取任务日志
+        获取任务日志（按序号游标分页，按序号升序返回）
+        内存中的环形缓冲只有最近的日志，更早的日志（以及已不在内存中的任务的日志）从数据库读取
         :param task_id: 任务ID
         :param limit: 最多返回的日志数量
+        :param after: 返回序号大于after的日志（向后翻页）
+        :param before: 返回序号小于before的最新日志（向前翻页）；都不指定时返回最新的日志
         :return: 日志列表
         """
-        # 查询时包括数据库
-        task = self.get_task(task_id, include_db=True)
-        if not task:
-            return []
+        task = self.get_task(task_id)
+        buffered = list(task.logs) if task else []
+        first_seq = buffered[0]['seq'] if buffered else None  # 缓冲区中最早的序号
+        
+        if after is not None:
+            older = []
+            if self.db_enabled and (first_seq is None or after + 1 < first_seq):
+                older = [log for log in self._get_db_logs(task_id, after=after, limit=limit)
+                         if first_seq is None or log['seq'] < first_seq]
+            return (older + [log for log in buffered if log['seq'] > after])[:limit]
         
-        return task.logs[-limit:]
+        logs = [log for log in buffered if before is None or log['seq'] < before][-limit:]
+        if len(logs) < limit and self.db_enabled and (first_seq is None or first_seq > 1):
+            bounds = [seq for seq in (first_seq, before) if seq is not None]
+            logs = self._get_db_logs(task_id, before=min(bounds) if bounds else None,
+                                     limit=limit - len(logs)) + logs
+        return logs
+    
+    def _get_db_logs(self, task_id: str, **kwargs) -> List[Dict]:
+        try:
+            return self.db.get_task_logs(task_id, **kwargs)
+        except Exception as e:
+            logger.error(f"❌ 从数据库获取任务日志失败: {e}")
+            return []
     
     def clear_completed_tasks(self):
         """清理已完成的任务"""
@@ -492,6 +835,8 @@ class TaskManager:
             ]
             for task_id in to_delete:
                 del self.tasks[task_id]
+                if self.state_syncer:
+                    self.state_syncer.forget(task_id)
         
         # 从数据库清理（如果启用）
         db_deleted = 0
@@ -506,27 +851,17 @@ class TaskManager:
         
         return max(len(to_delete), db_deleted)
     
-    def _sync_task_to_db(self, task: CrawlerTask):
-        """同步任务状态到数据库"""
+    def _sync_task_to_db(self, task: CrawlerTask, immediate: bool = False):
+        """
+        同步任务状态到数据库
+        只标记为待同步，由 TaskStateSyncer 合并写入变化的字段；结束状态立即写入
+        :param immediate: 是否立即写入
+        """
         if not self.db_enabled:
             return
         
         try:
-            self.db.update_task(
-                task.task_id,
-                status=task.status.value,
-                start_time=task.start_time,
-                end_time=task.end_time,
-                total_chapters=task.total_chapters,
-                completed_chapters=task.completed_chapters,
-                failed_chapters=task.failed_chapters,
-                current_chapter=task.current_chapter,
-                stage=task.stage,
-                detail=task.detail,
-                novel_title=task.novel_title,
-                novel_author=task.novel_author,
-                error_message=task.error_message
-            )
+            self.state_syncer.mark(task, immediate)
         except Exception as e:
             logger.error(f"❌ 同步任务到数据库失败: {e}")
 
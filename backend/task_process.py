@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+任务进程隔离 - 在独立的子进程中运行爬虫
+- 页面解析不再和API请求处理争抢GIL，单个失控的爬虫也不会拖慢阅读器
+- 子进程通过 stdout 逐行发送JSON事件（进度、日志、书籍信息、熔断状态、结束），
+  父进程转发给原有的 progress_callback / log_callback（进而推送到WebSocket）
+- 父进程的停止标志被设置后向子进程 stdin 写入 stop，子进程据此设置自己的停止标志；
+  超过 stop_timeout 仍未退出时强制结束子进程
+- 子进程以 python -m backend.task_process 启动，不会重新执行API服务的启动代码
+- 每个子进程有自己的熔断器，通过Redis共享打开状态（Redis不可用时各任务的熔断器互不相通）
+"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import json
+import os
+import subprocess
+import threading
+from typing import Callable, Dict, Optional
+
+from loguru import logger
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# 请求停止后等待子进程退出的时间（秒）
+STOP_TIMEOUT = 30
+
+
+def create_crawler(spec: Dict, progress_callback: Callable, log_callback: Callable,
+                   stop_flag, on_info: Optional[Callable[[str, str], None]] = None):
+    """
+    按任务描述创建爬虫实例
+    :param spec: {'config_file', 'content_type', 'book_id', 'max_workers', 'use_proxy', 'incremental', 'task_id'}
+    :param progress_callback: 进度回调
+    :param log_callback: 日志回调
+    :param stop_flag: 停止标志
+    :param on_info: 解析出书籍/站点信息后的回调 on_info(title, author)
+    :return: 爬虫实例
+    """
+    if spec.get('content_type') in ['news', 'article', 'blog']:
+        # 使用文章爬虫
+        from backend.generic_article_crawler import GenericArticleCrawler
+        crawler = GenericArticleCrawler(
+            config_file=spec['config_file'],
+            start_url=spec['book_id'],  # 这里存的是URL
+            max_workers=spec['max_workers'],
+            use_proxy=spec['use_proxy'],
+            progress_callback=progress_callback,
+            log_callback=log_callback,
+            stop_flag=stop_flag
+        )
+
+        # 在解析完列表后更新任务信息
+        original_parse = crawler.parse_article_list
+        def wrapped_parse():
+            result = original_parse()
+            if result and crawler.site_info_data and on_info:
+                on_info(crawler.site_info_data.get('title', crawler.site_name),
+                        crawler.site_info_data.get('author', '未知'))
+            return result
+
+        crawler.parse_article_list = wrapped_parse
+    else:
+        # 使用小说爬虫
+        from backend.generic_crawler import GenericNovelCrawler
+        crawler = GenericNovelCrawler(
+            config_file=spec['config_file'],
+            book_id=spec['book_id'],
+            max_workers=spec['max_workers'],
+            use_proxy=spec['use_proxy'],
+            progress_callback=progress_callback,
+            log_callback=log_callback,
+            stop_flag=stop_flag,
+            incremental=spec.get('incremental', False),
+            task_id=spec.get('task_id')
+        )
+
+        # 在解析完小说信息后更新任务信息
+        original_parse_chapter_list = crawler.parse_chapter_list
+        def wrapped_parse_chapter_list():
+            result = original_parse_chapter_list()
+            if result and crawler.novel_info and on_info:
+                on_info(crawler.novel_info.get('title', ''), crawler.novel_info.get('author', ''))
+            return result
+
+        crawler.parse_chapter_list = wrapped_parse_chapter_list
+
+    return crawler
+
+
+def connect_breaker_redis():
+    """
+    连接共享熔断状态使用的Redis
+    :return: Redis客户端，Redis不可用时返回None
+    """
+    from redis import Redis
+    from redis.backoff import NoBackoff
+    from redis.retry import Retry
+    from shared.utils.config import REDIS_CONFIG
+    try:
+        # 不重试：Redis不可用时子进程立即开始下载，熔断器读写Redis失败时按未共享处理
+        redis_cli = Redis(host=REDIS_CONFIG['host'], port=REDIS_CONFIG['port'], db=REDIS_CONFIG['db'],
+                          socket_connect_timeout=3, retry=Retry(NoBackoff(), 0))
+        redis_cli.ping()
+        return redis_cli
+    except Exception as e:
+        logger.debug(f"熔断状态共享的Redis不可用: {e}")
+        return None
+
+
+class ProcessCrawler:
+    """在子进程中运行的爬虫（对 TaskManager 提供和爬虫相同的 run() / base_url）"""
+
+    def __init__(self, spec: Dict, progress_callback: Callable, log_callback: Callable,
+                 stop_flag: threading.Event, on_info: Optional[Callable[[str, str], None]] = None,
+                 stop_timeout: float = STOP_TIMEOUT):
+        """
+        :param spec: 任务描述（见 create_crawler）
+        :param progress_callback: 进度回调（在父进程中调用）
+        :param log_callback: 日志回调（在父进程中调用）
+        :param stop_flag: 父进程中的停止标志
+        :param on_info: 书籍信息回调
+        :param stop_timeout: 请求停止后等待子进程退出的时间（秒）
+        """
+        self.spec = spec
+        self.progress_callback = progress_callback
+        self.log_callback = log_callback
+        self.stop_flag = stop_flag
+        self.on_info = on_info
+        self.stop_timeout = stop_timeout
+        self.base_url: Optional[str] = None
+        self.process: Optional[subprocess.Popen] = None
+
+    def run(self) -> bool:
+        """启动子进程并转发事件，直到子进程退出"""
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'backend.task_process'],
+            cwd=str(PROJECT_ROOT),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            encoding='utf-8',
+            env={**os.environ, 'PYTHONIOENCODING': 'utf-8'}
+        )
+        self._send(json.dumps(self.spec, ensure_ascii=False))
+        logger.info(f"🧩 爬虫子进程已启动 (PID: {self.process.pid})")
+        threading.Thread(target=self._watch_stop, name='task-process-stop', daemon=True).start()
+
+        result = None
+        for line in self.process.stdout:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            if event.get('event') == 'done':
+                result = event
+            else:
+                self._dispatch(event)
+
+        exit_code = self.process.wait()
+        if result is None and self.stop_flag.is_set():
+            return False  # 停止后被强制结束
+        if result is None:
+            raise RuntimeError(f'爬虫子进程异常退出 (exit code: {exit_code})')
+        if result.get('error'):
+            raise RuntimeError(result['error'])
+        return bool(result.get('success'))
+
+    def _dispatch(self, event: Dict):
+        kind = event.get('event')
+        try:
+            if kind == 'progress':
+                self.progress_callback(**event['data'])
+            elif kind == 'log':
+                self.log_callback(event['level'], event['message'])
+            elif kind == 'info':
+                if self.on_info:
+                    self.on_info(event['title'], event['author'])
+            elif kind == 'ready':
+                self.base_url = event.get('base_url')
+            elif kind == 'circuit':
+                # 子进程中的熔断状态变化转发给本进程的监听者（暂停/恢复任务）
+                from backend.circuit_breaker import circuit_breakers
+                circuit_breakers.notify(event['host'], event['state'])
+        except Exception as e:
+            logger.error(f"处理子进程事件失败 ({kind}): {e}")
+
+    def _send(self, line: str):
+        try:
+            self.process.stdin.write(line + '\n')
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError, ValueError):
+            pass  # 子进程已退出
+
+    def _watch_stop(self):
+        """父进程停止标志 -> 子进程停止标志"""
+        while self.process.poll() is None:
+            if not self.stop_flag.wait(0.5):
+                continue
+            self._send('stop')
+            try:
+                self.process.wait(timeout=self.stop_timeout)
+            except subprocess.TimeoutExpired:
+                logger.warning(f"⚠️  爬虫子进程 {self.process.pid} 未在 {self.stop_timeout} 秒内退出，强制结束")
+                self.process.kill()
+            return
+
+
+def main():
+    """子进程入口：从 stdin 读取任务描述，事件写入 stdout"""
+    events = os.fdopen(os.dup(sys.stdout.fileno()), 'w', encoding='utf-8', buffering=1)
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    sys.stdout = sys.stderr  # 爬虫的 print 输出不能混入事件流
+    emit_lock = threading.Lock()
+
+    def emit(event: str, **data):
+        line = json.dumps({'event': event, **data}, ensure_ascii=False, default=str)
+        with emit_lock:
+            events.write(line + '\n')
+            events.flush()
+
+    spec = json.loads(sys.stdin.readline())
+    stop_flag = threading.Event()
+
+    def watch_stdin():
+        for line in sys.stdin:
+            if line.strip() == 'stop':
+                break
+        stop_flag.set()  # 父进程请求停止，或父进程已退出（stdin关闭）
+
+    threading.Thread(target=watch_stdin, daemon=True).start()
+
+    from backend.circuit_breaker import circuit_breakers
+    circuit_breakers.add_listener(lambda host, state: emit('circuit', host=host, state=state))
+    # 其他任务的子进程打开熔断器后，本进程访问同一站点时也打开（不依赖配置中的 shared_redis）
+    redis_cli = connect_breaker_redis()
+    if redis_cli is not None:
+        circuit_breakers.enable_redis(redis_cli)
+
+    try:
+        crawler = create_crawler(
+            spec,
+            progress_callback=lambda **kwargs: emit('progress', data=kwargs),
+            log_callback=lambda level, message: emit('log', level=level, message=message),
+            stop_flag=stop_flag,
+            on_info=lambda title, author: emit('info', title=title, author=author)
+        )
+        emit('ready', base_url=crawler.base_url)
+        emit('done', success=bool(crawler.run()))
+    except Exception as e:
+        logger.error(f"❌ 爬虫子进程执行失败: {e}")
+        emit('done', success=False, error=str(e))
+
+
+if __name__ == '__main__':
+    main()
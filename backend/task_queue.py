@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+任务队列 - 限制同时运行的任务数和所有任务的请求线程总数
+- max_running: 同时运行的任务数（任务槽）
+- worker_budget: 所有运行中任务共享的请求线程预算，任务启动时按 min(任务并发数, 剩余预算) 分配
+- 优先级数值越小越先运行（手动启动的任务优先于定时计划），同优先级按提交顺序
+- 排队中的任务可以取消，并可查询排队位置
+"""
+import bisect
+import itertools
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+# 任务优先级（数值越小越优先）
+PRIORITY_INTERACTIVE = 0   # 手动启动
+PRIORITY_SCHEDULED = 10    # 定时计划启动
+
+
+class TaskQueue:
+    """有界任务队列（线程安全）"""
+
+    def __init__(self, max_running: int, worker_budget: int, on_admit: Callable[[str, int], None]):
+        """
+        :param max_running: 同时运行的任务数
+        :param worker_budget: 所有运行中任务的请求线程总数
+        :param on_admit: 任务获得运行槽时的回调 on_admit(task_id, granted_workers)（在锁外调用）
+        """
+        self.max_running = max(1, max_running)
+        self.worker_budget = max(1, worker_budget)
+        self.on_admit = on_admit
+        self.lock = threading.Lock()
+        self.pending: List[Tuple[int, int, str, int]] = []  # (priority, seq, task_id, workers)，保持有序
+        self.running: Dict[str, int] = {}  # task_id -> 分配的线程数
+        self.seq = itertools.count()
+
+    def submit(self, task_id: str, workers: int, priority: int = PRIORITY_INTERACTIVE):
+        """
+        提交任务（有空闲运行槽和线程预算时立即启动）
+        :param task_id: 任务ID
+        :param workers: 任务请求的并发线程数
+        :param priority: 优先级
+        """
+        with self.lock:
+            bisect.insort(self.pending, (priority, next(self.seq), task_id, max(1, workers)))
+        self._dispatch()
+
+    def cancel(self, task_id: str) -> bool:
+        """取消排队中的任务，任务不在队列中时返回False"""
+        with self.lock:
+            for index, entry in enumerate(self.pending):
+                if entry[2] == task_id:
+                    del self.pending[index]
+                    return True
+        return False
+
+    def release(self, task_id: str):
+        """任务结束，释放运行槽和线程预算"""
+        with self.lock:
+            self.running.pop(task_id, None)
+        self._dispatch()
+
+    def position(self, task_id: str) -> Optional[int]:
+        """排队位置（从1开始），不在队列中返回None"""
+        with self.lock:
+            for index, entry in enumerate(self.pending):
+                if entry[2] == task_id:
+                    return index + 1
+        return None
+
+    def is_queued(self, task_id: str) -> bool:
+        return self.position(task_id) is not None
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            return {
+                'max_running': self.max_running,
+                'worker_budget': self.worker_budget,
+                'running': len(self.running),
+                'pending': len(self.pending),
+                'workers_in_use': sum(self.running.values())
+            }
+
+    def _dispatch(self):
+        """按优先级启动排队任务，直到运行槽或线程预算用完"""
+        admitted = []
+        with self.lock:
+            while self.pending and len(self.running) < self.max_running:
+                available = self.worker_budget - sum(self.running.values())
+                if available <= 0:
+                    break
+                _, _, task_id, workers = self.pending.pop(0)
+                granted = min(workers, available)
+                self.running[task_id] = granted
+                admitted.append((task_id, granted))
+
+        for task_id, granted in admitted:
+            try:
+                self.on_admit(task_id, granted)
+            except Exception as e:
+                logger.error(f"❌ 启动排队任务失败 {task_id}: {e}")
+                self.release(task_id)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+定时任务调度器 - 按计划自动创建并启动更新任务
+- 计划保存在数据库 crawler_schedules 表中（按间隔分钟数或每天固定时间运行，默认增量更新）
+- 每次计算下次运行时间时随机延后 0~jitter_seconds 秒，避免所有计划同时请求站点
+- 同一本书的上一次任务仍在运行或排队时跳过本次运行
+- 计划启动的任务以低优先级进入任务队列，手动启动的任务优先运行
+- 到期计划通过条件更新领取，多个进程同时调度时只有一个进程启动任务
+"""
+import random
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple
+
+from loguru import logger
+
+from backend.task_queue import PRIORITY_SCHEDULED
+
+# 检查到期计划的间隔（秒）
+POLL_INTERVAL = 30
+
+
+def parse_daily_at(value: str) -> Tuple[int, int]:
+    """
+    解析每天运行时间
+    :param value: HH:MM
+    :return: (小时, 分钟)，格式错误时抛出 ValueError
+    """
+    hour, minute = (int(part) for part in value.strip().split(':'))
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        raise ValueError(f'无效的时间: {value}')
+    return hour, minute
+
+
+def compute_next_run(schedule: Dict, now: datetime) -> Optional[datetime]:
+    """
+    计算计划的下次运行时间（含随机延后）
+    :param schedule: 计划字典（interval_minutes / daily_at / jitter_seconds）
+    :param now: 当前时间
+    :return: 下次运行时间，计划没有有效规则时返回None
+    """
+    if schedule.get('daily_at'):
+        hour, minute = parse_daily_at(schedule['daily_at'])
+        run_time = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if run_time <= now:
+            run_time += timedelta(days=1)
+    elif schedule.get('interval_minutes'):
+        run_time = now + timedelta(minutes=max(1, schedule['interval_minutes']))
+    else:
+        return None
+
+    jitter = max(0, schedule.get('jitter_seconds') or 0)
+    run_time += timedelta(seconds=random.uniform(0, jitter))
+    return run_time.replace(microsecond=0)
+
+
+class TaskScheduler:
+    """定时任务调度线程（由 TaskManager.start_scheduler 启动）"""
+
+    def __init__(self, task_manager, crawler_factory_builder: Callable[[str], Optional[Callable]],
+                 poll_interval: float = POLL_INTERVAL):
+        """
+        :param task_manager: 任务管理器
+        :param crawler_factory_builder: 根据配置文件名创建爬虫工厂函数，配置不存在时返回None
+        :param poll_interval: 检查到期计划的间隔（秒）
+        """
+        self.task_manager = task_manager
+        self.crawler_factory_builder = crawler_factory_builder
+        self.poll_interval = poll_interval
+        self.wakeup = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self.thread is not None:
+            return
+        self.thread = threading.Thread(target=self._loop, name='task-scheduler', daemon=True)
+        self.thread.start()
+        logger.info(f"⏰ 定时任务调度器已启动 (检查间隔: {self.poll_interval}秒)")
+
+    def wake(self):
+        """计划变化后立即检查一次"""
+        self.wakeup.set()
+
+    def _loop(self):
+        while True:
+            try:
+                self.run_due()
+            except Exception as e:
+                logger.error(f"❌ 定时任务调度失败: {e}")
+            self.wakeup.wait(self.poll_interval)
+            self.wakeup.clear()
+
+    def run_due(self, now: Optional[datetime] = None):
+        """启动所有已到期的计划"""
+        now = now or datetime.now()
+        db = self.task_manager.db
+        for schedule in db.get_due_schedules(now):
+            expected = datetime.fromisoformat(schedule['next_run_time'])
+            next_run = compute_next_run(schedule, now)
+            if not db.claim_schedule(schedule['id'], expected, next_run):
+                continue  # 已被其他进程领取
+            if next_run is None:
+                db.update_schedule(schedule['id'], enabled=False)
+            self._launch(schedule, now)
+
+    def _launch(self, schedule: Dict, now: datetime):
+        schedule_id = schedule['id']
+        book_id = schedule['book_id']
+
+        active = self.task_manager.find_active_task(schedule['config_filename'], book_id)
+        if active:
+            logger.info(f"⏭️  定时计划 #{schedule_id}: 书籍 {book_id} 的上一次任务仍在运行或排队 ({active.task_id})，跳过本次")
+            return
+
+        crawler_factory = self.crawler_factory_builder(schedule['config_filename'])
+        if crawler_factory is None:
+            logger.error(f"❌ 定时计划 #{schedule_id}: 配置文件不存在 {schedule['config_filename']}")
+            return
+
+        task_id = self.task_manager.create_task(
+            schedule['config_filename'],
+            book_id,
+            max_workers=schedule['max_workers'],
+            use_proxy=schedule['use_proxy'],
+            incremental=schedule['incremental']
+        )
+        task = self.task_manager.get_task(task_id)
+        task.add_log('INFO', f"⏰ 由定时计划 #{schedule_id} 启动")
+        if self.task_manager.start_task(task_id, crawler_factory, priority=PRIORITY_SCHEDULED):
+            logger.info(f"⏰ 定时计划 #{schedule_id}: 已启动任务 {task_id} (书籍 {book_id})")
+        self.task_manager.db.update_schedule(schedule_id, last_run_time=now, last_task_id=task_id)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+任务状态同步 - 合并写入 crawler_tasks 表（write-behind）
+- 进度变化时只把任务标记为待同步，由后台线程每 flush_interval 秒统一写入，
+  数据库负载与爬取速度无关
+- 每次只写入自上次同步以来发生变化的字段，所有待同步任务在一个事务中批量更新
+- 任务进入结束状态（完成/失败/停止）或加入任务队列时立即写入
+- 未结束的任务记录持有的服务实例并定期刷新心跳，其他实例启动时不会认领仍有心跳的任务
+"""
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from loguru import logger
+
+# 同步到数据库的任务字段
+SYNC_FIELDS = (
+    'status', 'start_time', 'end_time', 'total_chapters', 'completed_chapters', 'failed_chapters',
+    'current_chapter', 'stage', 'detail', 'novel_title', 'novel_author', 'error_message'
+)
+
+# 结束状态（立即同步）
+TERMINAL_STATUSES = ('completed', 'failed', 'stopped')
+
+
+def task_state(task) -> Dict:
+    """任务当前需要同步的字段值"""
+    state = {field: getattr(task, field) for field in SYNC_FIELDS}
+    state['status'] = task.status.value
+    return state
+
+
+class TaskStateSyncer:
+    """任务状态合并写入线程（所有任务共用）"""
+
+    def __init__(self, db, flush_interval: float = 2.0, owner: Optional[str] = None,
+                 heartbeat_interval: float = 20.0):
+        """
+        :param db: NovelDatabase 实例
+        :param flush_interval: 同步间隔（秒）
+        :param owner: 服务实例ID（None 时不记录持有实例和心跳）
+        :param heartbeat_interval: 心跳间隔（秒）
+        """
+        self.db = db
+        self.flush_interval = flush_interval
+        self.owner = owner
+        self.heartbeat_interval = heartbeat_interval
+        self.last_heartbeat = time.monotonic()
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.dirty: Dict[str, object] = {}   # task_id -> 任务对象
+        self.synced: Dict[str, Dict] = {}    # task_id -> 上次写入数据库的字段值
+        self.writes = 0
+        self.thread = threading.Thread(target=self._flush_loop, name='task-state-syncer', daemon=True)
+        self.thread.start()
+
+    def mark(self, task, immediate: bool = False):
+        """
+        标记任务状态已变化（结束状态立即写入）
+        :param immediate: 是否立即写入
+        """
+        with self.lock:
+            self.dirty[task.task_id] = task
+        if immediate or task.status.value in TERMINAL_STATUSES:
+            self.flush()
+
+    def forget(self, task_id: str):
+        """任务已删除，不再同步"""
+        with self.lock:
+            self.dirty.pop(task_id, None)
+        with self.flush_lock:
+            self.synced.pop(task_id, None)
+
+    def flush(self):
+        """立即写入所有待同步任务的变化字段"""
+        with self.flush_lock:
+            with self.lock:
+                tasks, self.dirty = self.dirty, {}
+            if not tasks:
+                return
+
+            updates, rows = {}, {}
+            now = datetime.now()
+            for task_id, task in tasks.items():
+                state = task_state(task)
+                synced = self.synced.get(task_id, {})
+                changed = {field: value for field, value in state.items()
+                           if field not in synced or synced[field] != value}
+                if changed:
+                    updates[task_id] = changed
+                    rows[task_id] = changed
+                    if self.owner and state['status'] not in TERMINAL_STATUSES:
+                        # 未结束的任务同时记录持有的服务实例和心跳
+                        rows[task_id] = {**changed, 'owner': self.owner, 'heartbeat_at': now}
+
+            if updates:
+                try:
+                    self.db.update_tasks(rows)
+                    self.writes += 1
+                except Exception as e:
+                    logger.error(f"❌ 同步任务状态到数据库失败（{len(updates)} 个任务），稍后重试: {e}")
+                    with self.lock:
+                        for task_id, task in tasks.items():
+                            self.dirty.setdefault(task_id, task)
+                    return
+                for task_id, changed in updates.items():
+                    self.synced.setdefault(task_id, {}).update(changed)
+
+            # 已结束的任务不再需要保留上次同步的值
+            for task_id, task in tasks.items():
+                if task.status.value in TERMINAL_STATUSES:
+                    self.synced.pop(task_id, None)
+
+    def heartbeat(self):
+        """刷新本实例未结束任务的心跳（暂停、排队中的任务没有字段变化时也需要保持心跳）"""
+        if not self.owner:
+            return
+        with self.flush_lock:
+            task_ids = list(self.synced)
+        if task_ids:
+            self.db.touch_tasks(task_ids, self.owner)
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"❌ 任务状态同步失败: {e}")
+            if time.monotonic() - self.last_heartbeat >= self.heartbeat_interval:
+                self.last_heartbeat = time.monotonic()
+                try:
+                    self.heartbeat()
+                except Exception as e:
+                    logger.error(f"❌ 刷新任务心跳失败: {e}")
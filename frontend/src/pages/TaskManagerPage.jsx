@@ -38,12 +38,25 @@ function TaskManagerPage() {
       start_url: '',
       max_workers: 5,
       use_proxy: false,
+      incremental: false,
       auto_start: true
     }
   });
   
   const socketRef = useRef(null);
   const logsEndRef = useRef(null);
+  const tasksRef = useRef([]);
+  const subscribedRef = useRef(new Set());
+
+  // 订阅任务的进度和日志（服务端只向订阅了任务的客户端推送）
+  const subscribeTasks = (socket, taskList) => {
+    taskList.forEach(task => {
+      if (!subscribedRef.current.has(task.task_id)) {
+        socket.emit('subscribe_task', { task_id: task.task_id });
+        subscribedRef.current.add(task.task_id);
+      }
+    });
+  };
 
   // 初始化WebSocket连接
   useEffect(() => {
@@ -64,6 +77,9 @@ function TaskManagerPage() {
       console.log('✅ WebSocket connected - 实时连接已建立');
       console.log('   Socket ID:', socket.id);
       console.log('   Transport:', socket.io.engine.transport.name);
+      // 新连接（含重连）需要重新加入任务房间
+      subscribedRef.current = new Set();
+      subscribeTasks(socket, tasksRef.current);
     });
 
     socket.on('disconnect', (reason) => {
@@ -81,7 +97,6 @@ function TaskManagerPage() {
 
     // 监听任务进度更新
     socket.on('task_progress', (data) => {
-      console.log('📊 Task progress:', data);
       setTasks(prevTasks => 
         prevTasks.map(task => 
           task.task_id === data.task_id ? { ...task, ...data.progress } : task
@@ -94,14 +109,10 @@ function TaskManagerPage() {
       }
     });
 
-    // 监听任务日志
-    socket.on('task_log', (data) => {
-      console.log('📝 Task log:', data);
+    // 监听任务日志（服务端按批推送）
+    socket.on('task_logs', (data) => {
       if (selectedTask && selectedTask.task_id === data.task_id) {
-        setTaskLogs(prev => [...prev, {
-          ...data.log,
-          timestamp: new Date().toISOString()
-        }]);
+        setTaskLogs(prev => [...prev, ...data.logs]);
         // 自动滚动到底部
         setTimeout(() => {
           if (logsEndRef.current) {
@@ -140,6 +151,14 @@ function TaskManagerPage() {
     };
   }, [selectedTask]);
 
+  // 任务列表变化时订阅新任务
+  useEffect(() => {
+    tasksRef.current = tasks;
+    if (socketRef.current && socketRef.current.connected) {
+      subscribeTasks(socketRef.current, tasks);
+    }
+  }, [tasks]);
+
   // 获取任务列表
   const fetchTasks = async () => {
     setLoading(true);
@@ -380,10 +399,11 @@ function TaskManagerPage() {
   };
 
   // 状态标签渲染
-  const renderStatusTag = (status) => {
+  const renderStatusTag = (status, queuePosition) => {
     const statusConfig = {
       pending: { color: 'gray', icon: <IconClock size={14} />, text: '等待中' },
       running: { color: 'blue', icon: <IconPlayerPlay size={14} />, text: '运行中' },
+      paused: { color: 'yellow', icon: <IconPlayerPause size={14} />, text: '已暂停 (站点熔断)' },
       completed: { color: 'green', icon: <IconCircleCheck size={14} />, text: '已完成' },
       failed: { color: 'red', icon: <IconCircleX size={14} />, text: '失败' },
       stopped: { color: 'orange', icon: <IconPlayerPause size={14} />, text: '已停止' },
@@ -395,7 +415,7 @@ function TaskManagerPage() {
         leftSection={config.icon}
         variant="light"
       >
-        {config.text}
+        {queuePosition ? `排队中 #${queuePosition}` : config.text}
       </Badge>
     );
   };
@@ -604,10 +624,10 @@ function TaskManagerPage() {
                           <Text fw={600} size="lg">{task.novel_title || '获取中...'}</Text>
                           <Text size="sm" c="dimmed">{task.novel_author || ''}</Text>
                         </div>
-                        {renderStatusTag(task.status)}
+                        {renderStatusTag(task.status, task.queue_position)}
                       </Group>
                       <Group gap="xs">
-                        {(task.status === 'pending' || task.status === 'stopped') && (
+                        {((task.status === 'pending' && !task.queue_position) || task.status === 'stopped') && (
                           <Tooltip label="启动">
                             <ActionIcon 
                               variant="light" 
@@ -619,7 +639,7 @@ function TaskManagerPage() {
                             </ActionIcon>
                           </Tooltip>
                         )}
-                        {task.status === 'running' && (
+                        {(task.status === 'running' || task.status === 'paused' || task.queue_position) && (
                           <Tooltip label="停止">
                             <ActionIcon 
                               variant="light" 
@@ -686,6 +706,7 @@ function TaskManagerPage() {
                         value={task.progress_percent || 0}
                         color={
                           task.status === 'running' ? 'blue' : 
+                          task.status === 'paused' ? 'yellow' : 
                           task.status === 'completed' ? 'green' : 
                           task.status === 'failed' ? 'red' : 'gray'
                         }
@@ -778,6 +799,11 @@ function TaskManagerPage() {
               {...createForm.getInputProps('use_proxy', { type: 'checkbox' })}
             />
 
+            <Switch
+              label="增量更新（只下载上次之后的新章节）"
+              {...createForm.getInputProps('incremental', { type: 'checkbox' })}
+            />
+
             <Switch
               label="创建后自动启动"
               {...createForm.getInputProps('auto_start', { type: 'checkbox' })}
@@ -829,7 +855,7 @@ function TaskManagerPage() {
                 </Grid.Col>
                 <Grid.Col span={6}>
                   <Text size="xs" c="dimmed">状态</Text>
-                  <div>{renderStatusTag(selectedTask.status)}</div>
+                  <div>{renderStatusTag(selectedTask.status, selectedTask.queue_position)}</div>
                 </Grid.Col>
                 <Grid.Col span={6}>
                   <Text size="xs" c="dimmed">内容名称</Text>
@@ -867,6 +893,7 @@ function TaskManagerPage() {
                 value={selectedTask.progress_percent || 0}
                 color={
                   selectedTask.status === 'running' ? 'blue' : 
+                  selectedTask.status === 'paused' ? 'yellow' : 
                   selectedTask.status === 'completed' ? 'green' : 
                   selectedTask.status === 'failed' ? 'red' : 'gray'
                 }
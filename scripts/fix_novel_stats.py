@@ -36,32 +36,22 @@ def fix_all_novel_stats():
     print(f"📚 找到 {len(novels)} 本小说")
     print()
     
-    fixed_count = 0
-    unchanged_count = 0
+    # 一次分组聚合查询重新计算所有小说的统计
+    changes = db.update_all_novel_stats()
+    changed_ids = {change['id'] for change in changes}
+    
+    for change in changes:
+        print(f"🔧 修复: 《{change['title']}》")
+        print(f"   章节: {change['old_chapters']} → {change['new_chapters']}")
+        print(f"   字数: {change['old_words']} → {change['new_words']}")
+        print()
     
     for novel in novels:
-        novel_id = novel['id']
-        title = novel['title']
-        old_chapters = novel['total_chapters']
-        old_words = novel['total_words']
-        
-        # 更新统计
-        db.update_novel_stats(novel_id)
-        
-        # 获取更新后的数据
-        updated_novel = db.get_novel_by_id(novel_id)
-        new_chapters = updated_novel['total_chapters']
-        new_words = updated_novel['total_words']
-        
-        if old_chapters != new_chapters or old_words != new_words:
-            print(f"🔧 修复: 《{title}》")
-            print(f"   章节: {old_chapters} → {new_chapters}")
-            print(f"   字数: {old_words} → {new_words}")
-            print()
-            fixed_count += 1
-        else:
-            print(f"✓ 正常: 《{title}》 ({new_chapters}章, {new_words}字)")
-            unchanged_count += 1
+        if novel['id'] not in changed_ids:
+            print(f"✓ 正常: 《{novel['title']}》 ({novel['total_chapters']}章, {novel['total_words']}字)")
+    
+    fixed_count = len(changes)
+    unchanged_count = len(novels) - fixed_count
     
     db.close()
     
@@ -11,6 +11,7 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateColumn
 from backend.models.database import NovelDatabase
 from shared.models.models import Base
 from shared.utils.config import DB_CONFIG
@@ -31,9 +32,30 @@ def create_tables(db):
     # create_all 会自动检查表是否存在，不存在才创建
     Base.metadata.create_all(db.engine)
     
+    # create_all 不会修改已存在的表，新增的字段需要单独补上
+    add_missing_columns(db)
+    
     logger.info("✅ 表结构创建完成")
 
 
+def add_missing_columns(db):
+    """为已存在的表补充模型中新增的字段（幂等）"""
+    inspector = inspect(db.engine)
+    existing_tables = inspector.get_table_names()
+    
+    with db.engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_columns = {col['name'] for col in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                column_ddl = CreateColumn(column).compile(dialect=db.engine.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column_ddl}"))
+                logger.info(f"  ➕ {table.name}.{column.name}")
+
+
 def verify_tables(db):
     """验证所有表是否创建成功"""
     logger.info("🔍 验证表结构...")
@@ -41,10 +63,15 @@ def verify_tables(db):
     expected_tables = [
         'novels',
         'chapters', 
+        'chapter_contents',
+        'novel_crawl_states',
         'reading_progress',
         'bookmarks',
         'reader_settings',
-        'crawler_tasks'
+        'crawler_tasks',
+        'crawler_task_logs',
+        'crawler_task_checkpoints',
+        'crawler_schedules'
     ]
     
     existing_tables = get_existing_tables(db)
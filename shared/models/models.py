@@ -1,9 +1,10 @@
 """
 SQLAlchemy ORM 模型定义
 """
+import json
 from datetime import datetime
 from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, Boolean
-from sqlalchemy.orm import declarative_base, relationship
+from sqlalchemy.orm import declarative_base, relationship, deferred
 
 Base = declarative_base()
 
@@ -88,13 +89,15 @@ class Chapter(Base):
     novel_id = Column(Integer, ForeignKey('novels.id', ondelete='CASCADE'), nullable=False, comment='小说ID')
     chapter_num = Column(Integer, nullable=False, comment='章节号')
     title = Column(String(500), nullable=False, comment='章节标题')
-    content = Column(Text, nullable=True, comment='章节内容')
+    content = deferred(Column(Text, nullable=True, comment='章节内容（启用独立内容表时为空）'))
     source_url = Column(Text, nullable=True, comment='来源URL')
     word_count = Column(Integer, default=0, comment='字数')
     created_at = Column(DateTime, default=datetime.now, comment='创建时间')
     
     # 关系
     novel = relationship("Novel", back_populates="chapters")
+    content_row = relationship("ChapterContent", uselist=False, cascade="all, delete-orphan",
+                               passive_deletes=True)
     
     # 索引
     __table_args__ = (
@@ -117,8 +120,65 @@ class Chapter(Base):
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
         if include_content:
-            data['content'] = self.content
+            data['content'] = self.get_content()
         return data
+    
+    def get_content(self):
+        """获取章节内容（优先读取独立内容表）"""
+        if self.content_row is not None:
+            return self.content_row.content
+        return self.content
+    
+    def set_content(self, content, separate=False):
+        """
+        设置章节内容
+        :param separate: 是否写入独立内容表（chapters 表只保留元数据）
+        """
+        if separate:
+            if self.content_row is None:
+                self.content_row = ChapterContent(content=content)
+            else:
+                self.content_row.content = content
+            self.content = None
+        else:
+            self.content = content
+            self.content_row = None
+        self.word_count = len(content)
+
+
+class ChapterContent(Base):
+    """章节内容模型（可选的独立存储表，chapters 表只保留元数据）"""
+    __tablename__ = 'chapter_contents'
+    
+    chapter_id = Column(Integer, ForeignKey('chapters.id', ondelete='CASCADE'), primary_key=True, comment='章节ID')
+    content = Column(Text, nullable=True, comment='章节内容')
+    
+    def __repr__(self):
+        return f"<ChapterContent(chapter_id={self.chapter_id})>"
+
+
+class NovelCrawlState(Base):
+    """小说抓取状态模型（增量更新时用于判断目录是否有新章节）"""
+    __tablename__ = 'novel_crawl_states'
+    
+    novel_id = Column(Integer, ForeignKey('novels.id', ondelete='CASCADE'), primary_key=True, comment='小说ID')
+    last_chapter_url = Column(Text, nullable=True, comment='目录中最后一章的URL')
+    last_chapter_num = Column(Integer, default=0, comment='目录中最后一章的章节号')
+    catalog_fingerprint = Column(String(64), nullable=True, comment='目录指纹（页数+最后一页章节URL的哈希）')
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now, comment='更新时间')
+    
+    def __repr__(self):
+        return f"<NovelCrawlState(novel_id={self.novel_id}, last_chapter_num={self.last_chapter_num})>"
+    
+    def to_dict(self):
+        """转换为字典"""
+        return {
+            'novel_id': self.novel_id,
+            'last_chapter_url': self.last_chapter_url,
+            'last_chapter_num': self.last_chapter_num,
+            'catalog_fingerprint': self.catalog_fingerprint,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
 
 
 class ReadingProgress(Base):
@@ -219,6 +279,7 @@ class CrawlerTask(Base):
     book_id = Column(String(100), nullable=False, comment='书籍ID')
     max_workers = Column(Integer, default=5, comment='并发线程数')
     use_proxy = Column(Integer, default=0, comment='是否使用代理(0否1是)')
+    incremental = Column(Integer, default=0, comment='是否增量更新(0否1是)')
     
     # 任务状态
     status = Column(String(50), default='pending', comment='任务状态: pending/running/completed/failed/stopped')
@@ -233,6 +294,8 @@ class CrawlerTask(Base):
     current_chapter = Column(String(500), nullable=True, comment='当前章节')
     stage = Column(String(50), default='pending', comment='当前阶段')
     detail = Column(Text, nullable=True, comment='详细信息')
+    owner = Column(String(100), nullable=True, comment='运行任务的服务实例（主机名:进程号:启动ID）')
+    heartbeat_at = Column(DateTime, nullable=True, comment='服务实例最近一次心跳时间')
     
     # 小说信息
     novel_title = Column(String(500), nullable=True, comment='小说标题')
@@ -259,6 +322,7 @@ class CrawlerTask(Base):
             'book_id': self.book_id,
             'max_workers': self.max_workers,
             'use_proxy': bool(self.use_proxy),
+            'incremental': bool(self.incremental),
             'status': self.status,
             'create_time': self.create_time.isoformat() if self.create_time else None,
             'start_time': self.start_time.isoformat() if self.start_time else None,
@@ -276,3 +340,110 @@ class CrawlerTask(Base):
             'log_count': 0  # 日志单独存储
         }
 
+
+
+class CrawlerTaskLog(Base):
+    """爬虫任务日志模型（内存只保留最新日志，完整日志批量追加到此表）"""
+    __tablename__ = 'crawler_task_logs'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    task_id = Column(String(100), nullable=False, comment='任务UUID')
+    seq = Column(Integer, nullable=False, comment='任务内日志序号（从1开始，用于分页游标）')
+    timestamp = Column(DateTime, nullable=False, comment='日志时间')
+    level = Column(String(20), nullable=False, comment='日志级别')
+    message = Column(Text, nullable=False, comment='日志内容')
+    
+    # 索引
+    __table_args__ = (
+        Index('idx_task_log_seq', 'task_id', 'seq'),
+    )
+    
+    def to_dict(self):
+        """转换为字典（与内存中的日志格式一致）"""
+        return {
+            'seq': self.seq,
+            'timestamp': self.timestamp.isoformat() if self.timestamp else None,
+            'level': self.level,
+            'message': self.message
+        }
+
+
+class CrawlerTaskCheckpoint(Base):
+    """爬虫任务检查点模型（服务重启后从这里恢复中断的任务，任务结束后删除）"""
+    __tablename__ = 'crawler_task_checkpoints'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    task_id = Column(String(100), nullable=False, unique=True, index=True, comment='任务UUID')
+    novel_id = Column(Integer, nullable=True, comment='小说ID')
+    incremental = Column(Boolean, default=False, comment='是否增量更新')
+    novel_info = Column(Text, nullable=True, comment='小说信息(JSON)')
+    chapters = Column(Text(length=2**32 - 1), nullable=False, comment='章节列表(JSON: [[url, title], ...])')
+    chapter_offset = Column(Integer, default=0, comment='章节号偏移（增量更新时为之前的章节数）')
+    chapter_states = Column(Text(length=2**32 - 1), nullable=True, comment='每章状态（每个字符一章: 0未完成 1已保存 2失败）')
+    catalog_fingerprint = Column(String(64), nullable=True, comment='目录指纹')
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now, comment='更新时间')
+    
+    def to_dict(self):
+        """转换为字典"""
+        return {
+            'task_id': self.task_id,
+            'novel_id': self.novel_id,
+            'incremental': bool(self.incremental),
+            'novel_info': json.loads(self.novel_info) if self.novel_info else {},
+            'chapters': [{'url': url, 'title': title} for url, title in json.loads(self.chapters)],
+            'chapter_offset': self.chapter_offset or 0,
+            'chapter_states': self.chapter_states or '',
+            'catalog_fingerprint': self.catalog_fingerprint,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+
+class CrawlerSchedule(Base):
+    """定时抓取计划模型（按间隔或每天固定时间自动创建并启动任务）"""
+    __tablename__ = 'crawler_schedules'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    config_filename = Column(String(255), nullable=False, comment='配置文件名')
+    book_id = Column(String(100), nullable=False, comment='书籍ID')
+    max_workers = Column(Integer, default=5, comment='并发线程数')
+    use_proxy = Column(Integer, default=0, comment='是否使用代理(0否1是)')
+    incremental = Column(Integer, default=1, comment='是否增量更新(0否1是)')
+    
+    # 调度规则（interval_minutes 与 daily_at 二选一）
+    interval_minutes = Column(Integer, nullable=True, comment='运行间隔（分钟）')
+    daily_at = Column(String(5), nullable=True, comment='每天运行时间（HH:MM）')
+    jitter_seconds = Column(Integer, default=300, comment='启动时间随机延后的最大秒数')
+    enabled = Column(Integer, default=1, comment='是否启用(0否1是)')
+    
+    # 运行状态
+    next_run_time = Column(DateTime, nullable=True, comment='下次运行时间')
+    last_run_time = Column(DateTime, nullable=True, comment='上次运行时间')
+    last_task_id = Column(String(100), nullable=True, comment='上次创建的任务ID')
+    create_time = Column(DateTime, default=datetime.now, comment='创建时间')
+    
+    # 索引
+    __table_args__ = (
+        Index('idx_schedule_next_run', 'enabled', 'next_run_time'),
+    )
+    
+    def __repr__(self):
+        return f"<CrawlerSchedule(id={self.id}, book_id='{self.book_id}', next_run_time={self.next_run_time})>"
+    
+    def to_dict(self):
+        """转换为字典"""
+        return {
+            'id': self.id,
+            'config_filename': self.config_filename,
+            'book_id': self.book_id,
+            'max_workers': self.max_workers,
+            'use_proxy': bool(self.use_proxy),
+            'incremental': bool(self.incremental),
+            'interval_minutes': self.interval_minutes,
+            'daily_at': self.daily_at,
+            'jitter_seconds': self.jitter_seconds,
+            'enabled': bool(self.enabled),
+            'next_run_time': self.next_run_time.isoformat() if self.next_run_time else None,
+            'last_run_time': self.last_run_time.isoformat() if self.last_run_time else None,
+            'last_task_id': self.last_task_id,
+            'create_time': self.create_time.isoformat() if self.create_time else None
+        }
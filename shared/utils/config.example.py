@@ -11,7 +11,9 @@ DB_CONFIG = {
     'user': os.getenv('DB_USER', 'root'),             # 数据库用户名
     'password': os.getenv('DB_PASSWORD', 'YOUR_PASSWORD_HERE'),  # 数据库密码 - 请修改！
     'database': os.getenv('DB_NAME', 'novel_db'),     # 数据库名称
-    'port': int(os.getenv('DB_PORT', '3306'))         # 数据库端口
+    'port': int(os.getenv('DB_PORT', '3306')),        # 数据库端口
+    # 新章节内容存入独立的 chapter_contents 表（chapters 表只保留目录元数据，已有数据仍可正常读取）
+    'separate_content': os.getenv('DB_SEPARATE_CONTENT', 'false').lower() == 'true'
 }
 
 # Redis配置
@@ -25,7 +27,9 @@ REDIS_CONFIG = {
 WEB_CONFIG = {
     'host': '0.0.0.0',                                # 监听地址
     'port': int(os.getenv('BACKEND_PORT', '5001')),   # 监听端口
-    'debug': os.getenv('FLASK_ENV', 'production') != 'production'  # 调试模式
+    'debug': os.getenv('FLASK_ENV', 'production') != 'production',  # 调试模式
+    'progress_rate': 2,                               # 每个任务每秒最多推送的进度次数（合并为最新状态）
+    'log_interval': 0.5,                              # 任务日志批量推送间隔（秒）
 }
 
 # 爬虫配置
@@ -35,6 +39,16 @@ CRAWLER_CONFIG = {
     'max_pages': 15,             # 目录最大页数
 }
 
+# 任务队列配置
+TASK_QUEUE_CONFIG = {
+    'max_running': int(os.getenv('TASK_MAX_RUNNING', '3')),       # 同时运行的任务数，其余任务排队
+    'worker_budget': int(os.getenv('TASK_WORKER_BUDGET', '20')),  # 所有运行中任务共享的请求线程总数
+    'isolation': os.getenv('TASK_ISOLATION', 'thread'),           # thread: API进程内运行 / process: 每个任务在独立子进程中运行
+    'state_sync_interval': float(os.getenv('TASK_SYNC_INTERVAL', '2')),  # 任务进度合并写入数据库的间隔（秒）
+    'resume_on_startup': os.getenv('TASK_RESUME_ON_STARTUP', 'true').lower() == 'true',  # 启动时恢复中断的任务（多进程部署时只在一个进程中开启）
+    'heartbeat_timeout': int(os.getenv('TASK_HEARTBEAT_TIMEOUT', '60')),  # 运行任务的服务实例超过该秒数没有心跳时，任务才可被其他实例认领恢复
+}
+
 # 认证配置
 AUTH_CONFIG = {
     'jwt_secret': os.getenv('JWT_SECRET', 'CHANGE_THIS_SECRET_KEY'),  # JWT密钥 - 请修改！
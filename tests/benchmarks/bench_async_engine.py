@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+下载引擎基准测试
+本地启动一个带固定响应延迟的模拟站点（aiohttp），对比抓取+解析同一批章节页的吞吐：
+- thread: ContentFetcher + ThreadPoolExecutor（默认10个线程）
+- asyncio: AsyncContentFetcher 协程并发（默认100），解析放到线程池
+两种方式使用同一份预编译解析计划，并校验解析结果一致
+
+运行: python tests/benchmarks/bench_async_engine.py [章节数] [延迟毫秒]
+"""
+import asyncio
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from aiohttp import web
+from loguru import logger
+
+from backend.async_engine import AsyncContentFetcher
+from backend.content_fetcher import ContentFetcher
+from backend.extraction_plan import compile_plan
+from backend.parser import HtmlDocument
+from tests.benchmarks.fixtures import CHAPTER_CONTENT_CONFIG, build_chapter_page
+
+THREAD_WORKERS = 10
+ASYNC_CONCURRENCY = 100
+
+
+def start_mock_site(latency: float) -> str:
+    """在后台线程启动模拟站点，返回base_url"""
+    async def chapter(request):
+        await asyncio.sleep(latency)
+        index = int(request.match_info['index'])
+        return web.Response(text=build_chapter_page(index=index), content_type='text/html', charset='utf-8')
+
+    app = web.Application()
+    app.router.add_get('/book/1/{index}.html', chapter)
+
+    loop = asyncio.new_event_loop()
+    runner = web.AppRunner(app, access_log=None)
+    loop.run_until_complete(runner.setup())
+    site = web.TCPSite(runner, '127.0.0.1', 0, backlog=1024)
+    loop.run_until_complete(site.start())
+    port = site._server.sockets[0].getsockname()[1]
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return f'http://127.0.0.1:{port}'
+
+
+def parse(content_plan, html: str) -> str:
+    return content_plan.clean(content_plan.content.execute(HtmlDocument(html)))
+
+
+def run_thread(urls, content_plan):
+    fetcher = ContentFetcher(encoding='utf-8', pool_size=THREAD_WORKERS)
+    try:
+        with ThreadPoolExecutor(max_workers=THREAD_WORKERS) as executor:
+            return list(executor.map(lambda url: parse(content_plan, fetcher.get_page(url, max_retries=3)), urls))
+    finally:
+        fetcher.close()
+
+
+def run_asyncio(urls, content_plan):
+    executor = ThreadPoolExecutor(max_workers=THREAD_WORKERS)
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        async with AsyncContentFetcher(encoding='utf-8', concurrency=ASYNC_CONCURRENCY,
+                                       executor=executor) as fetcher:
+            semaphore = asyncio.Semaphore(ASYNC_CONCURRENCY)
+
+            async def one(url):
+                async with semaphore:
+                    html = await fetcher.get_page(url, max_retries=3)
+                    return await loop.run_in_executor(executor, parse, content_plan, html)
+
+            return await asyncio.gather(*(one(url) for url in urls))
+
+    try:
+        return asyncio.run(main())
+    finally:
+        executor.shutdown()
+
+
+def main():
+    chapters = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    latency = (int(sys.argv[2]) if len(sys.argv) > 2 else 50) / 1000
+
+    base_url = start_mock_site(latency)
+    urls = [f'{base_url}/book/1/{i}.html' for i in range(1, chapters + 1)]
+    content_plan = compile_plan({'chapter_content': CHAPTER_CONTENT_CONFIG}).chapter_content
+
+    results = {}
+    outputs = {}
+    for name, runner in (('thread', run_thread), ('asyncio', run_asyncio)):
+        start = time.perf_counter()
+        outputs[name] = runner(urls, content_plan)
+        results[name] = time.perf_counter() - start
+
+    assert outputs['thread'] == outputs['asyncio']
+
+    logger.info("=" * 60)
+    logger.info(f"下载引擎基准测试（{chapters} 章，响应延迟 {latency * 1000:.0f}ms，结果一致）")
+    logger.info("=" * 60)
+    for name, elapsed in results.items():
+        logger.info(f"{name:>8}: 耗时 {elapsed:.2f}s, 吞吐 {chapters / elapsed:.1f} 页/秒")
+    logger.info(f"加速比: {results['thread'] / results['asyncio']:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
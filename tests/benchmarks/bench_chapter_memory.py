@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+章节内存占用基准测试
+模拟下载一本万章小说（每章约3000字），用 tracemalloc 统计全部章节保存后仍占用的内存：
+- dict: 旧的章节字典，下载的正文写回 chapter['content']，直到任务结束才释放
+- record: ChapterRecord（__slots__）+ 章节写入缓冲，正文落库后即释放，字数在落库时累加
+两种方式统计的总字数必须一致
+
+运行: python tests/benchmarks/bench_chapter_memory.py [章节数] [每章字数]
+"""
+import gc
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from loguru import logger
+
+from backend.chapter_record import build_records
+from backend.chapter_sink import ChapterSink
+from backend.generic_crawler import GenericNovelCrawler
+from tests.benchmarks.fixtures import NOVEL_INFO_CONFIG, CHAPTER_LIST_CONFIG, CHAPTER_CONTENT_CONFIG
+
+
+class NullDatabase:
+    """只统计写入章节数的数据库"""
+
+    def __init__(self):
+        self.written = 0
+
+    def upsert_chapters(self, novel_id, chapters):
+        self.written += len(chapters)
+        return len(chapters)
+
+
+def build_content(index: int, words: int) -> str:
+    """每章生成新的正文字符串（不共享对象）"""
+    return f'第{index}章正文' + '字' * words
+
+
+def catalog(chapters: int):
+    return [{'title': f'第{i}章 章节标题{i}', 'url': f'https://example.com/book/1/{i}.html', 'content': ''}
+            for i in range(1, chapters + 1)]
+
+
+def run_dict(chapters: int, words: int):
+    """旧方式：正文保存在章节字典中"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    book = catalog(chapters)
+    for index, chapter in enumerate(book):
+        chapter['content'] = build_content(index + 1, words)
+    total_words = sum(len(chapter['content']) for chapter in book)
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, peak, total_words, elapsed
+
+
+def create_crawler() -> GenericNovelCrawler:
+    config = {
+        'site_info': {'name': 'bench', 'base_url': 'https://example.com'},
+        'url_templates': {'book_detail': '/book/{book_id}'},
+        'parsers': {'novel_info': NOVEL_INFO_CONFIG, 'chapter_list': CHAPTER_LIST_CONFIG,
+                    'chapter_content': CHAPTER_CONTENT_CONFIG},
+        'crawler_config': {'delay': 0}
+    }
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False, encoding='utf-8') as f:
+        json.dump(config, f)
+    crawler = GenericNovelCrawler(f.name, '1')
+    Path(f.name).unlink()
+    # 不连接Redis
+    crawler.mark_chapters_success = lambda urls: None
+    crawler.mark_chapters_failed = lambda urls: None
+    return crawler
+
+
+def run_record(chapters: int, words: int):
+    """新方式：ChapterRecord + 写入缓冲，走爬虫的保存路径"""
+    crawler = create_crawler()
+    db = NullDatabase()
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    crawler.chapters = build_records(catalog(chapters))
+    crawler.chapter_sink = ChapterSink(db, 1, crawler._on_chapters_flushed, batch_size=50, flush_interval=2.0)
+    for index in range(chapters):
+        crawler._save_chapter(index, build_content(index + 1, words))
+    crawler.chapter_sink.close()
+    crawler.chapter_sink = None
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert db.written == chapters
+    assert sum(chapter.word_count for chapter in crawler.chapters) == crawler.total_words
+    return current, peak, crawler.total_words, elapsed
+
+
+def main():
+    chapters = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    words = int(sys.argv[2]) if len(sys.argv) > 2 else 3000
+
+    logger.disable('backend')
+    try:
+        results = {'dict': run_dict(chapters, words), 'record': run_record(chapters, words)}
+    finally:
+        logger.enable('backend')
+
+    assert results['dict'][2] == results['record'][2], '总字数不一致'
+
+    logger.info("=" * 60)
+    logger.info(f"章节内存占用基准测试（{chapters} 章，每章约 {words} 字，总字数 {results['record'][2]:,}）")
+    logger.info("=" * 60)
+    for mode, (current, peak, _, elapsed) in results.items():
+        logger.info(f"{mode:>8}: 保存后占用 {current / 1024 / 1024:7.1f} MB, 峰值 {peak / 1024 / 1024:7.1f} MB, "
+                    f"耗时 {elapsed:.2f}s")
+    logger.info(f"保存后内存减少: {results['dict'][0] / max(1, results['record'][0]):.1f}x")
+
+
+if __name__ == '__main__':
+    main()
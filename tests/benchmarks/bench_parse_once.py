@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+解析次数基准测试
+对比「每个字段重新解析HTML」与「每页构建一次HtmlDocument」两种方式：
+- 详情页: 小说信息各字段 + 最大页数 + 章节列表
+- 章节页: 最大页数 + 正文
+统计每页构建解析树（scrapy.Selector）的次数和耗时
+
+运行: python tests/benchmarks/bench_parse_once.py
+"""
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from loguru import logger
+from scrapy import Selector
+
+import backend.parser as parser_module
+from backend.parser import HtmlParser, HtmlDocument
+from tests.benchmarks.fixtures import (
+    NOVEL_INFO_CONFIG, CHAPTER_LIST_CONFIG, CHAPTER_CONTENT_CONFIG,
+    build_detail_page, build_chapter_page
+)
+
+
+class CountingSelector(Selector):
+    """统计从HTML文本构建解析树的次数"""
+    builds = 0
+
+    def __init__(self, *args, **kwargs):
+        if kwargs.get('text') is not None:
+            CountingSelector.builds += 1
+        super().__init__(*args, **kwargs)
+
+
+def extract_detail_page(parser: HtmlParser, page) -> int:
+    """模拟parse_chapter_list对详情页的全部提取，返回章节数"""
+    for field, config in NOVEL_INFO_CONFIG.items():
+        parser.parse_with_config(page, config)
+    parser.parse_with_config(page, CHAPTER_LIST_CONFIG['pagination']['max_page_xpath'])
+
+    # 旧实现中章节列表单独构建一次Selector
+    root = parser.document(page)
+    count = 0
+    for item in root.xpath(CHAPTER_LIST_CONFIG['items']['expression']):
+        if item.xpath(CHAPTER_LIST_CONFIG['title']['expression']).get():
+            count += 1
+    return count
+
+
+def extract_chapter_page(parser: HtmlParser, page) -> str:
+    """模拟download_chapter_content对单页的提取"""
+    parser.parse_with_config(page, CHAPTER_CONTENT_CONFIG['next_page']['max_page_xpath'])
+    return parser.parse_with_config(page, CHAPTER_CONTENT_CONFIG['content'])
+
+
+def run(mode: str, detail_html: str, chapter_html: str, rounds: int):
+    """运行一种模式，返回 (详情页每页解析次数, 章节页每页解析次数, 耗时)"""
+    parser = HtmlParser('https://example.com')
+    wrap = HtmlDocument if mode == 'document' else (lambda html: html)
+
+    CountingSelector.builds = 0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        extract_detail_page(parser, wrap(detail_html))
+    detail_builds = CountingSelector.builds / rounds
+
+    CountingSelector.builds = 0
+    for _ in range(rounds):
+        extract_chapter_page(parser, wrap(chapter_html))
+    chapter_builds = CountingSelector.builds / rounds
+    elapsed = time.perf_counter() - start
+
+    return detail_builds, chapter_builds, elapsed
+
+
+def main():
+    rounds = 200
+    detail_html = build_detail_page(chapters=200)
+    chapter_html = build_chapter_page()
+
+    parser_module.Selector = CountingSelector
+    try:
+        results = {mode: run(mode, detail_html, chapter_html, rounds) for mode in ('per_field', 'document')}
+    finally:
+        parser_module.Selector = Selector
+
+    logger.info("=" * 60)
+    logger.info(f"解析次数基准测试（{rounds} 轮）")
+    logger.info("=" * 60)
+    for mode, (detail_builds, chapter_builds, elapsed) in results.items():
+        logger.info(f"{mode:>10}: 详情页 {detail_builds:.0f} 次/页, 章节页 {chapter_builds:.0f} 次/页, 耗时 {elapsed:.3f}s")
+    speedup = results['per_field'][2] / results['document'][2]
+    logger.info(f"加速比: {speedup:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试公用数据 - 合成的小说详情页、章节页和对应的解析配置
+"""
+
+NOVEL_INFO_CONFIG = {
+    'title': {'type': 'xpath', 'expression': "//div[@class='info']/h1/text()", 'index': 0,
+              'process': [{'method': 'strip'}]},
+    'author': {'type': 'xpath', 'expression': "//div[@class='info']/p[@class='author']/text()", 'index': 0,
+               'process': [{'method': 'strip'}, {'method': 'replace', 'params': {'old': '作者：', 'new': ''}}]},
+    'cover_url': {'type': 'xpath', 'expression': "//img[@class='cover']/@src", 'index': 0},
+    'intro': {'type': 'xpath', 'expression': "//div[@class='intro']/p/text()", 'index': 999,
+              'process': [{'method': 'join', 'params': {'separator': '\n'}}, {'method': 'strip'}]},
+    'status': {'type': 'xpath', 'expression': "//div[@class='info']/p[@class='status']/text()", 'index': 0,
+               'process': [{'method': 'regex_replace', 'params': {'pattern': r'^状态[:：]\s*', 'repl': ''}}]},
+    'category': {'type': 'regex', 'expression': r'分类：(\S+?)<', 'index': 0},
+    'tags': {'type': 'xpath', 'expression': "//div[@class='tags']/a/text()", 'index': 999,
+             'process': [{'method': 'join', 'params': {'separator': ','}}]},
+}
+
+CHAPTER_LIST_CONFIG = {
+    'pagination': {
+        'enabled': True,
+        'max_page_xpath': {'type': 'xpath', 'expression': "//div[@class='pages']/a[last()]/text()", 'index': 0},
+        'max_page_manual': 1,
+    },
+    'items': {'type': 'xpath', 'expression': "//ul[@class='chapters']/li"},
+    'title': {'type': 'xpath', 'expression': './a/text()', 'process': [{'method': 'strip'}]},
+    'url': {'type': 'xpath', 'expression': './a/@href'},
+}
+
+CHAPTER_CONTENT_CONFIG = {
+    'content': {
+        'type': 'xpath', 'expression': "//div[@id='content']/p/text()", 'index': 999,
+        'process': [
+            {'method': 'strip'},
+            {'method': 'regex_replace', 'params': {'pattern': r'\s*本章未完.*$', 'repl': ''}},
+            {'method': 'join', 'params': {'separator': '\n'}},
+        ],
+    },
+    'next_page': {
+        'enabled': True,
+        'max_page_xpath': {'type': 'xpath', 'expression': "//div[@class='page-nav']/span/text()", 'index': 0,
+                           'process': [{'method': 'regex_replace', 'params': {'pattern': r'\D', 'repl': ''}}]},
+        'max_pages_manual': 1,
+    },
+    'clean': [
+        {'method': 'regex_replace', 'params': {'pattern': r'[　 ]+', 'repl': ' '}},
+        {'method': 'replace', 'params': {'old': '广告', 'new': ''}},
+    ],
+}
+
+
+def build_detail_page(chapters: int = 100, max_page: int = 1) -> str:
+    """构建小说详情页（含章节列表）"""
+    items = ''.join(
+        f'<li><a href="/book/1/{i}.html"> 第{i}章 章节标题{i} </a></li>' for i in range(1, chapters + 1)
+    )
+    return (
+        '<html><head><title>测试小说</title></head><body>'
+        '<div class="info"><h1> 测试小说 </h1><p class="author">作者：某某</p>'
+        '<p class="status">状态：连载中</p><span>分类：玄幻</span></div>'
+        '<img class="cover" src="/cover/1.jpg"/>'
+        '<div class="intro"><p>第一段简介</p><p>第二段简介</p></div>'
+        '<div class="tags"><a>热血</a><a>修仙</a><a>系统</a></div>'
+        f'<ul class="chapters">{items}</ul>'
+        f'<div class="pages"><a>1</a><a>{max_page}</a></div>'
+        '</body></html>'
+    )
+
+
+def build_chapter_page(index: int = 1, page: int = 1, max_pages: int = 1, paragraphs: int = 60) -> str:
+    """构建章节内容页"""
+    body = ''.join(
+        f'<p>　　第{index}章第{page}页第{n}段正文内容，广告，这里是一些填充文字。</p>' for n in range(paragraphs)
+    )
+    return (
+        f'<html><body><h1>第{index}章</h1><div id="content">{body}<p>本章未完，请点击下一页</p></div>'
+        f'<div class="page-nav"><span>第{page}/{max_pages}页</span></div></body></html>'
+    )
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试共用的 fixture
+"""
+import time
+
+import pytest
+
+
+@pytest.fixture
+def wait_until():
+    """
+    等待条件成立：wait_until(predicate, timeout=5.0)
+    超时返回最后一次判断的结果
+    """
+    def wait(predicate, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if predicate():
+                return True
+            time.sleep(0.01)
+        return predicate()
+    return wait
@@ -55,8 +55,8 @@ def test_chapter_list_parsing():
             logger.info(f"   章节总数: {len(crawler.chapters)}")
             
             if len(crawler.chapters) > 0:
-                logger.info(f"   第一章: {crawler.chapters[0]['title']}")
-                logger.info(f"   最后一章: {crawler.chapters[-1]['title']}")
+                logger.info(f"   第一章: {crawler.chapters[0].title}")
+                logger.info(f"   最后一章: {crawler.chapters[-1].title}")
             
             return True
         else:
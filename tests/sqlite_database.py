@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试用数据库：使用SQLite的 NovelDatabase 和使用该数据库的任务管理器
+（不需要MySQL，表结构由模型创建；MySQL专有语句如 upsert_chapters 不可用）
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+from backend.models.database import NovelDatabase
+from shared.models.models import Base
+
+
+def create_sqlite_database(path=None) -> NovelDatabase:
+    """
+    创建使用SQLite的数据库实例
+    :param path: 数据库文件路径，None 表示使用临时目录中的文件（随数据库实例一起删除）
+    """
+    db = NovelDatabase.__new__(NovelDatabase)
+    db.silent = True
+    db.separate_content = False
+    db.novels_without_separate_content = set()
+    if path is None:
+        db.temp_dir = tempfile.TemporaryDirectory()
+        path = Path(db.temp_dir.name) / 'novel.db'
+    db.engine = create_engine(f'sqlite:///{path}', connect_args={'check_same_thread': False, 'timeout': 30})
+    db.SessionLocal = scoped_session(sessionmaker(autocommit=False, autoflush=False, bind=db.engine))
+    Base.metadata.create_all(db.engine)
+    return db
+
+
+def create_task_manager(db):
+    """创建使用指定数据库的新任务管理器（不复用进程内的单例）"""
+    import backend.task_manager as task_manager_module
+
+    get_database = task_manager_module.get_database
+    instance = task_manager_module.TaskManager._instance
+    task_manager_module.get_database = lambda *args, **kwargs: db
+    task_manager_module.TaskManager._instance = None
+    try:
+        return task_manager_module.TaskManager()
+    finally:
+        task_manager_module.get_database = get_database
+        task_manager_module.TaskManager._instance = instance
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+章节写入缓冲测试
+- 缓冲章节数达到 batch_size 或超过 flush_interval 秒时整批写入
+- 写入失败时回调 success=False
+- close() 写入剩余章节并停止后台线程
+运行: python -m pytest -q tests/test_chapter_sink.py
+"""
+import sys
+import threading
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import pytest
+
+from backend.chapter_sink import ChapterSink
+
+
+class RecordingDatabase:
+    """记录每批写入的章节号，fail=True 时写入失败"""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.lock = threading.Lock()
+        self.batches = []
+
+    def upsert_chapters(self, novel_id, chapters):
+        if self.fail:
+            raise RuntimeError('数据库不可用')
+        with self.lock:
+            self.batches.append([chapter['chapter_num'] for chapter in chapters])
+        return len(chapters)
+
+
+class Callbacks:
+    """记录 on_flushed 回调"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = []
+
+    def __call__(self, batch, success):
+        with self.lock:
+            self.calls.append(([chapter['chapter_num'] for chapter in batch], success))
+
+
+def chapter(num):
+    return {'chapter_num': num, 'title': f'第{num}章', 'content': '正文' * 10, 'source_url': f'https://example.com/{num}'}
+
+
+def test_flush_on_batch_size():
+    """达到 batch_size 时由放入章节的线程立即写入"""
+    db, callbacks = RecordingDatabase(), Callbacks()
+    sink = ChapterSink(db, 1, callbacks, batch_size=3, flush_interval=60)
+    for num in range(1, 8):
+        sink.add(chapter(num))
+
+    assert db.batches == [[1, 2, 3], [4, 5, 6]]
+    assert callbacks.calls == [([1, 2, 3], True), ([4, 5, 6], True)]
+    sink.close()
+    assert db.batches[-1] == [7]
+
+
+def test_flush_on_interval(wait_until):
+    """不满一批的章节在 flush_interval 秒后由后台线程写入"""
+    db, callbacks = RecordingDatabase(), Callbacks()
+    sink = ChapterSink(db, 1, callbacks, batch_size=100, flush_interval=0.05)
+    sink.add(chapter(1))
+    sink.add(chapter(2))
+
+    assert wait_until(lambda: db.batches == [[1, 2]])
+    assert callbacks.calls == [([1, 2], True)]
+
+    sink.add(chapter(3))
+    assert wait_until(lambda: db.batches == [[1, 2], [3]])
+    sink.close()
+    assert sink.written == 3 and sink.batches == 2
+
+
+def test_failure_callback():
+    """写入失败时回调 success=False，之后的章节继续写入"""
+    db, callbacks = RecordingDatabase(fail=True), Callbacks()
+    sink = ChapterSink(db, 1, callbacks, batch_size=2, flush_interval=60)
+    sink.add(chapter(1))
+    sink.add(chapter(2))
+    assert callbacks.calls == [([1, 2], False)]
+    assert sink.written == 0
+
+    db.fail = False
+    sink.add(chapter(3))
+    sink.add(chapter(4))
+    sink.close()
+    assert callbacks.calls == [([1, 2], False), ([3, 4], True)]
+    assert sink.written == 2
+
+
+def test_callback_error_does_not_propagate():
+    """回调出错不影响保存章节的线程"""
+    def on_flushed(batch, success):
+        raise RuntimeError('回调出错')
+
+    db = RecordingDatabase()
+    sink = ChapterSink(db, 1, on_flushed, batch_size=1, flush_interval=60)
+    sink.add(chapter(1))
+    sink.close()
+    assert db.batches == [[1]]
+
+
+def test_close_drains_buffer():
+    """close() 写入剩余章节、停止后台线程，之后不能再放入章节"""
+    db, callbacks = RecordingDatabase(), Callbacks()
+    sink = ChapterSink(db, 1, callbacks, batch_size=100, flush_interval=60)
+    for num in range(1, 6):
+        sink.add(chapter(num))
+    assert db.batches == []
+
+    sink.close()
+    assert db.batches == [[1, 2, 3, 4, 5]]
+    assert callbacks.calls == [([1, 2, 3, 4, 5], True)]
+    assert not sink.thread.is_alive()
+    with pytest.raises(RuntimeError):
+        sink.add(chapter(6))
+
+
+def test_concurrent_add():
+    """多个下载线程同时放入章节，每章只写入一次"""
+    db, callbacks = RecordingDatabase(), Callbacks()
+    sink = ChapterSink(db, 1, callbacks, batch_size=50, flush_interval=0.01)
+
+    def worker(start):
+        for num in range(start, 2000, 8):
+            sink.add(chapter(num))
+
+    threads = [threading.Thread(target=worker, args=(start,)) for start in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    sink.close()
+
+    written = [num for batch in db.batches for num in batch]
+    assert sorted(written) == list(range(2000))
+    assert sum(len(nums) for nums, success in callbacks.calls if success) == 2000
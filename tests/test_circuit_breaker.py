@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+熔断器测试
+- 使用假时钟验证 closed -> open -> half_open -> closed 状态变化和探测请求独占
+- 熔断器打开之前放行的请求结果不影响状态，被取消的探测请求不计失败
+- 站点熔断时任务管理器暂停访问该站点的任务，恢复后继续
+运行: python -m pytest -q tests/test_circuit_breaker.py
+"""
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import fakeredis
+import pytest
+
+from backend import circuit_breaker
+from backend.async_engine import AsyncContentFetcher
+from backend.circuit_breaker import (CircuitBreakerRegistry, HostCircuitBreakers, circuit_breakers,
+                                     OPEN, HALF_OPEN, CLOSED)
+from tests.sqlite_database import create_sqlite_database, create_task_manager
+
+
+class FakeClock:
+    """替换 circuit_breaker 模块中的 time（monotonic/time 返回可控的时间）"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(circuit_breaker, 'time', fake)
+    return fake
+
+
+def create_breaker(failure_threshold=3, reset_timeout=30.0):
+    """创建带状态变化记录的断路器"""
+    registry = CircuitBreakerRegistry()
+    changes = []
+    registry.add_listener(lambda host, state: changes.append(state))
+    return registry.get('site.test', failure_threshold, reset_timeout), changes
+
+
+def fail(breaker, times=1):
+    for _ in range(times):
+        breaker.record_failure(breaker.try_acquire())
+
+
+# ==================== 状态变化 ====================
+
+def test_full_cycle(clock):
+    """连续失败打开，恢复时间后半开，探测成功后关闭"""
+    breaker, changes = create_breaker()
+
+    fail(breaker, 2)
+    assert breaker.state == CLOSED
+    fail(breaker)
+    assert breaker.state == OPEN
+    assert breaker.try_acquire() is None
+
+    clock.advance(29)
+    assert breaker.try_acquire() is None
+
+    clock.advance(1)
+    probe = breaker.try_acquire()
+    assert probe and probe.probe
+    assert breaker.state == HALF_OPEN
+
+    breaker.record_success(probe)
+    assert breaker.state == CLOSED
+    assert breaker.try_acquire()
+    assert changes == [OPEN, CLOSED]
+
+
+def test_success_resets_failures(clock):
+    """关闭状态下的成功清零连续失败次数"""
+    breaker, _ = create_breaker()
+    fail(breaker, 2)
+    breaker.record_success(breaker.try_acquire())
+    fail(breaker, 2)
+    assert breaker.state == CLOSED
+
+
+def test_probe_is_exclusive(clock):
+    """半开状态只放行一个探测请求"""
+    breaker, _ = create_breaker()
+    fail(breaker, 3)
+    clock.advance(30)
+
+    permits = [breaker.try_acquire() for _ in range(5)]
+    assert sum(1 for permit in permits if permit) == 1
+    assert permits[0].probe
+
+
+def test_probe_failure_reopens(clock):
+    """探测失败重新打开，需要再等一个恢复时间"""
+    breaker, changes = create_breaker()
+    fail(breaker, 3)
+    clock.advance(30)
+
+    breaker.record_failure(breaker.try_acquire())
+    assert breaker.state == OPEN
+    clock.advance(29)
+    assert breaker.try_acquire() is None
+    clock.advance(1)
+    assert breaker.try_acquire().probe
+    assert changes == [OPEN, OPEN]
+
+
+def test_stale_results_ignored(clock):
+    """熔断器打开之前放行的请求：成功不会关闭熔断器，失败不会让半开的熔断器重新打开"""
+    breaker, changes = create_breaker()
+    early_success = breaker.try_acquire()
+    early_failure = breaker.try_acquire()
+    fail(breaker, 3)
+
+    breaker.record_success(early_success)
+    assert breaker.state == OPEN
+
+    clock.advance(30)
+    probe = breaker.try_acquire()
+    breaker.record_failure(early_failure)
+    assert breaker.state == HALF_OPEN
+
+    breaker.record_success(probe)
+    assert breaker.state == CLOSED
+    assert changes == [OPEN, CLOSED]
+
+
+def test_released_probe_allows_new_probe(clock):
+    """归还探测许可后熔断器保持半开，下一个请求成为新的探测请求"""
+    breaker, changes = create_breaker()
+    fail(breaker, 3)
+    clock.advance(30)
+
+    probe = breaker.try_acquire()
+    assert breaker.try_acquire() is None
+    breaker.release(probe)
+    assert breaker.state == HALF_OPEN
+    assert breaker.try_acquire().probe
+    assert changes == [OPEN]
+
+
+class HangingSession:
+    """请求一直不返回（模拟进行中的请求）"""
+
+    def __init__(self):
+        self.started = asyncio.Event()
+
+    def get(self, url, proxy=None):
+        return self
+
+    async def __aenter__(self):
+        self.started.set()
+        await asyncio.Event().wait()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+def test_cancelled_probe_keeps_half_open(clock):
+    """进行中的探测请求被取消（任务停止、章节提前结束翻页）时不计失败，熔断器保持半开"""
+    breakers = HostCircuitBreakers(failure_threshold=3, reset_timeout=30, registry=CircuitBreakerRegistry())
+    breaker = breakers.for_url('https://site.test/')
+    fail(breaker, 3)
+    clock.advance(30)
+
+    async def cancel_probe():
+        fetcher = AsyncContentFetcher(circuit_breakers=breakers)
+        fetcher.session = HangingSession()
+        request = asyncio.ensure_future(fetcher.get_page('https://site.test/1.html'))
+        await fetcher.session.started.wait()
+        assert breaker.probing
+        request.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await request
+
+    asyncio.run(cancel_probe())
+    assert breaker.state == HALF_OPEN
+    assert breaker.try_acquire().probe
+
+
+def test_acquire_returns_none_on_stop(clock):
+    """熔断期间等待的请求收到停止信号后放弃"""
+    breaker, _ = create_breaker()
+    fail(breaker, 3)
+    stop_flag = threading.Event()
+    stop_flag.set()
+    assert breaker.acquire(stop_flag, poll_interval=0.01) is None
+
+
+def test_shared_open_state(clock):
+    """通过Redis共享打开状态：其他进程的断路器也会打开"""
+    redis_cli = fakeredis.FakeRedis()
+    registries = [CircuitBreakerRegistry(), CircuitBreakerRegistry()]
+    for registry in registries:
+        registry.enable_redis(redis_cli)
+    first, second = (registry.get('site.test', 1, 30) for registry in registries)
+
+    fail(first)
+    assert first.state == OPEN
+    assert second.try_acquire() is None
+    assert second.state == OPEN
+
+    clock.advance(30)
+    first.record_success(first.try_acquire())
+    assert not redis_cli.exists(circuit_breaker.REDIS_KEY_PREFIX + 'site.test')
+
+
+# ==================== 任务暂停/恢复 ====================
+
+class SiteCrawler:
+    """访问指定站点，运行到放行或收到停止信号为止"""
+
+    def __init__(self, task, base_url, gate):
+        self.task = task
+        self.base_url = base_url
+        self.gate = gate
+
+    def run(self):
+        while not self.gate.is_set() and not self.task.stop_flag.is_set():
+            time.sleep(0.01)
+        return True
+
+
+def test_task_pause_and_resume(wait_until):
+    """站点熔断时暂停访问该站点的任务，熔断器关闭后恢复，其他站点的任务不受影响"""
+    db = create_sqlite_database()
+    manager = create_task_manager(db)
+    gate = threading.Event()
+    affected = manager.create_task('a.json', '1')
+    other = manager.create_task('b.json', '2')
+    manager.start_task(affected, lambda task: SiteCrawler(task, 'https://paused.test', gate))
+    manager.start_task(other, lambda task: SiteCrawler(task, 'https://other.test', gate))
+    assert wait_until(lambda: all(manager.get_task(task_id).crawler for task_id in (affected, other)))
+
+    breaker = circuit_breakers.get('paused.test', failure_threshold=1, reset_timeout=0)
+    try:
+        fail(breaker)
+        task = manager.get_task(affected)
+        assert task.status.value == 'paused'
+        assert task.paused_host == 'paused.test'
+        assert manager.get_task(other).status.value == 'running'
+        manager.state_syncer.flush()
+        assert db.get_task_by_id(affected)['status'] == 'paused'
+
+        breaker.record_success(breaker.try_acquire())
+        assert task.status.value == 'running'
+        assert task.paused_host is None
+        manager.state_syncer.flush()
+        assert db.get_task_by_id(affected)['status'] == 'running'
+    finally:
+        gate.set()
+    assert wait_until(lambda: manager.get_task(affected).status.value == 'completed')
+
+
+def test_stop_paused_task(wait_until):
+    """暂停中的任务可以停止"""
+    manager = create_task_manager(create_sqlite_database())
+    gate = threading.Event()
+    task_id = manager.create_task('a.json', '1')
+    manager.start_task(task_id, lambda task: SiteCrawler(task, 'https://stopped.test', gate))
+    assert wait_until(lambda: manager.get_task(task_id).crawler is not None)
+
+    fail(circuit_breakers.get('stopped.test', failure_threshold=1, reset_timeout=60))
+    assert manager.get_task(task_id).status.value == 'paused'
+    assert manager.stop_task(task_id)
+    assert wait_until(lambda: manager.get_task(task_id).status.value == 'stopped')
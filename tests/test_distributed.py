@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分布式下载测试
+- 发起方收到工作进程的完成事件后更新章节状态，并记入任务检查点
+运行: python -m pytest -q tests/test_distributed.py
+"""
+import sys
+import threading
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import fakeredis
+
+from backend.chapter_record import DONE, FAILED, PENDING, build_records
+from backend.distributed import DistributedDownload
+from backend.task_checkpoint import TaskCheckpoint
+from tests.sqlite_database import create_sqlite_database
+
+CHAPTERS = [{'url': f'https://example.com/book/1/{i}.html', 'title': f'第{i}章'} for i in range(1, 6)]
+
+
+class CoordinatorCrawler:
+    """发起方使用的爬虫属性（章节列表、计数、检查点）"""
+
+    def __init__(self, checkpoint, chapter_offset=0):
+        self.chapters = build_records(CHAPTERS)
+        self.chapter_offset = chapter_offset
+        self.checkpoint = checkpoint
+        self.redis_cli = fakeredis.FakeRedis()
+        self.progress_lock = threading.Lock()
+        self.completed_count = 0
+        self.failed_count = 0
+        self.total_words = 0
+
+    def _log(self, level, message):
+        pass
+
+    def _update_progress(self, **kwargs):
+        pass
+
+
+def event(success, *nums):
+    return {'success': success, 'worker': 'worker-1',
+            'chapters': [{'n': n, 'title': f'第{n}章', 'words': 100} for n in nums]}
+
+
+def test_events_marked_in_checkpoint():
+    """工作进程报告的章节记入检查点：成功记为已保存，失败记为失败，其余保持未下载"""
+    db = create_sqlite_database()
+    checkpoint = TaskCheckpoint(db, 'task-1', save_interval=60)
+    checkpoint.save(CHAPTERS, novel_id=1, incremental=True, novel_info={}, chapter_offset=20,
+                    catalog_fingerprint=None)
+    crawler = CoordinatorCrawler(checkpoint, chapter_offset=20)
+    download = DistributedDownload(crawler, {'visibility_timeout': 300, 'max_attempts': 3})
+
+    download._on_event(event(True, 21, 23), 0, 0)
+    download._on_event(event(False, 22), 0, 0)
+    download._on_event(event(True, 99), 0, 0)  # 不在本次章节列表中
+
+    assert [chapter.status for chapter in crawler.chapters] == [DONE, FAILED, DONE, PENDING, PENDING]
+    checkpoint.flush()
+    assert db.get_task_checkpoint('task-1')['chapter_states'] == DONE + FAILED + DONE + PENDING + PENDING
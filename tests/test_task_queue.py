@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+任务队列和定时计划测试
+- TaskQueue 按优先级和提交顺序启动任务，受运行槽和线程预算限制
+- 任务失败或停止后释放运行槽，排队的任务继续运行
+- 任务同时进行的请求数不超过分配的线程预算（线程池和asyncio引擎）
+- 多个调度器同时领取到期计划时只有一个成功
+运行: python -m pytest -q tests/test_task_queue.py
+"""
+import asyncio
+import json
+import re
+import sys
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import pytest
+from aiohttp import web
+
+from backend.chapter_record import build_records
+from backend.generic_crawler import GenericNovelCrawler
+from backend.task_queue import TaskQueue, PRIORITY_INTERACTIVE, PRIORITY_SCHEDULED
+from backend.task_scheduler import TaskScheduler
+from tests.benchmarks.fixtures import NOVEL_INFO_CONFIG, CHAPTER_LIST_CONFIG, CHAPTER_CONTENT_CONFIG, build_chapter_page
+from tests.sqlite_database import create_sqlite_database, create_task_manager
+
+
+# ==================== TaskQueue ====================
+
+def test_admission_order():
+    """运行槽空出时按优先级启动，同优先级按提交顺序"""
+    admitted = []
+    queue = TaskQueue(max_running=1, worker_budget=10, on_admit=lambda task_id, workers: admitted.append(task_id))
+
+    queue.submit('a', 2)
+    queue.submit('scheduled', 2, PRIORITY_SCHEDULED)
+    queue.submit('b', 2, PRIORITY_INTERACTIVE)
+    queue.submit('c', 2, PRIORITY_INTERACTIVE)
+    assert admitted == ['a']
+    assert [queue.position(task_id) for task_id in ('b', 'c', 'scheduled')] == [1, 2, 3]
+
+    for task_id in ('a', 'b', 'c'):
+        queue.release(task_id)
+    assert admitted == ['a', 'b', 'c', 'scheduled']
+    assert queue.get_stats()['pending'] == 0
+
+
+def test_worker_budget():
+    """线程预算不足时按剩余预算分配，预算用完后排队"""
+    granted = {}
+    queue = TaskQueue(max_running=3, worker_budget=5, on_admit=granted.__setitem__)
+
+    queue.submit('a', 4)
+    queue.submit('b', 4)
+    queue.submit('c', 1)
+    assert granted == {'a': 4, 'b': 1}
+    assert queue.is_queued('c')
+    assert queue.get_stats()['workers_in_use'] == 5
+
+    queue.release('b')
+    assert granted['c'] == 1
+
+
+def test_cancel_queued_task():
+    """取消排队中的任务后不会再启动"""
+    admitted = []
+    queue = TaskQueue(max_running=1, worker_budget=10, on_admit=lambda task_id, workers: admitted.append(task_id))
+    queue.submit('a', 1)
+    queue.submit('b', 1)
+    assert queue.cancel('b')
+    assert not queue.cancel('b')
+    queue.release('a')
+    assert admitted == ['a']
+
+
+def test_admit_error_releases_slot():
+    """启动回调出错时释放运行槽，下一个任务继续启动"""
+    admitted = []
+
+    def on_admit(task_id, workers):
+        if task_id == 'broken':
+            raise RuntimeError('启动失败')
+        admitted.append(task_id)
+
+    queue = TaskQueue(max_running=1, worker_budget=10, on_admit=on_admit)
+    queue.submit('broken', 1)
+    queue.submit('next', 1)
+    assert admitted == ['next']
+    assert queue.get_stats()['running'] == 1
+
+
+# ==================== TaskManager 运行槽释放 ====================
+
+class FailingCrawler:
+    """放行后抛出异常"""
+    base_url = 'https://example.com'
+
+    def __init__(self, gate: threading.Event):
+        self.gate = gate
+
+    def run(self):
+        self.gate.wait(5)
+        raise RuntimeError('站点解析失败')
+
+
+class BlockingCrawler:
+    """运行到收到停止信号为止"""
+    base_url = 'https://example.com'
+
+    def __init__(self, task):
+        self.task = task
+        self.started = threading.Event()
+
+    def run(self):
+        self.started.set()
+        self.task.stop_flag.wait(5)
+        return False
+
+
+class QuickCrawler:
+    base_url = 'https://example.com'
+
+    def run(self):
+        return True
+
+
+def create_manager():
+    manager = create_task_manager(create_sqlite_database())
+    manager.queue = TaskQueue(max_running=1, worker_budget=10, on_admit=manager._run_admitted)
+    return manager
+
+
+def test_slot_released_on_failure(wait_until):
+    """任务失败后释放运行槽，排队的任务开始运行"""
+    manager = create_manager()
+    failing = manager.create_task('a.json', '1')
+    queued = manager.create_task('a.json', '2')
+
+    gate = threading.Event()
+    assert manager.start_task(failing, lambda task: FailingCrawler(gate))
+    assert manager.start_task(queued, lambda task: QuickCrawler())
+    assert manager.queue.position(queued) == 1
+
+    gate.set()
+    assert wait_until(lambda: manager.get_task(queued).status.value == 'completed')
+    assert manager.get_task(failing).status.value == 'failed'
+    assert '站点解析失败' in manager.get_task(failing).error_message
+    assert wait_until(lambda: manager.queue.get_stats()['running'] == 0)
+
+
+def test_slot_released_on_stop(wait_until):
+    """停止运行中的任务后释放运行槽；停止排队中的任务直接移出队列"""
+    manager = create_manager()
+    running = manager.create_task('a.json', '1')
+    cancelled = manager.create_task('a.json', '2')
+    queued = manager.create_task('a.json', '3')
+
+    crawlers = {}
+
+    def blocking_factory(task):
+        crawlers[task.task_id] = BlockingCrawler(task)
+        return crawlers[task.task_id]
+
+    assert manager.start_task(running, blocking_factory)
+    assert manager.start_task(cancelled, lambda task: QuickCrawler())
+    assert manager.start_task(queued, lambda task: QuickCrawler())
+    assert wait_until(lambda: running in crawlers and crawlers[running].started.is_set())
+
+    assert manager.stop_task(cancelled)
+    assert manager.get_task(cancelled).status.value == 'stopped'
+    assert not manager.queue.is_queued(cancelled)
+
+    assert manager.stop_task(running)
+    assert wait_until(lambda: manager.get_task(queued).status.value == 'completed')
+    assert manager.get_task(running).status.value == 'stopped'
+    assert wait_until(lambda: manager.queue.get_stats()['running'] == 0)
+
+
+# ==================== 线程预算 ====================
+
+class MockSite:
+    """本地模拟站点（每章3页），记录同时处理的请求数峰值"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak = 0
+        self.base_url = None
+        self.loop = asyncio.new_event_loop()
+        self.runner = None
+
+    async def chapter_page(self, request):
+        with self.lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            index, page = re.match(r'(\d+)(?:_(\d+))?\.html', request.match_info['name']).groups()
+            return web.Response(text=build_chapter_page(int(index), int(page or 1), max_pages=3, paragraphs=3),
+                                content_type='text/html', charset='utf-8')
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    def start(self):
+        app = web.Application()
+        app.router.add_get('/book/1/{name}', self.chapter_page)
+        self.runner = web.AppRunner(app, access_log=None)
+        self.loop.run_until_complete(self.runner.setup())
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        self.loop.run_until_complete(site.start())
+        self.base_url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self.runner.cleanup(), self.loop).result(timeout=5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+@pytest.fixture(scope='module')
+def mock_site():
+    site = MockSite()
+    site.start()
+    yield site
+    site.stop()
+
+
+class ChapterDownloadCrawler:
+    """只下载并记录章节内容（不解析目录、不写数据库）"""
+
+    def __init__(self, config_file, max_workers, chapters):
+        self.crawler = GenericNovelCrawler(config_file, '1', max_workers=max_workers)
+        self.crawler.chapters = build_records(chapters)
+        self.crawler._save_chapter = self._save_chapter
+        self.base_url = self.crawler.base_url
+        self.contents = {}
+
+    def _save_chapter(self, index, content):
+        self.contents[index] = content
+        return True
+
+    def run(self):
+        self.crawler._run_chapter_downloads(range(len(self.crawler.chapters)), '下载失败')
+        return True
+
+
+@pytest.mark.parametrize('engine', ['thread', 'asyncio'])
+def test_requests_within_granted_workers(engine, mock_site, tmp_path, wait_until):
+    """任务申请8个线程、只分配到3个时，自适应并发和asyncio引擎的配置上限更大也最多同时发出3个请求"""
+    config = {
+        'site_info': {'name': 'test', 'base_url': mock_site.base_url},
+        'url_templates': {'book_detail': '/book/{book_id}',
+                          'chapter_content_page': '/book/{book_id}/{chapter_id}_{page}.html'},
+        'parsers': {'novel_info': NOVEL_INFO_CONFIG, 'chapter_list': CHAPTER_LIST_CONFIG,
+                    'chapter_content': CHAPTER_CONTENT_CONFIG},
+        'crawler_config': {'delay': 0, 'engine': engine, 'async_concurrency': 100,
+                           'adaptive_concurrency': {'enabled': True, 'max': 64}}
+    }
+    config_file = tmp_path / 'site.json'
+    config_file.write_text(json.dumps(config), encoding='utf-8')
+    chapters = [{'url': f'{mock_site.base_url}/book/1/{i}.html', 'title': f'第{i}章'} for i in range(1, 31)]
+
+    manager = create_task_manager(create_sqlite_database())
+    manager.queue = TaskQueue(max_running=2, worker_budget=3, on_admit=manager._run_admitted)
+    mock_site.peak = 0
+    crawlers = []
+
+    def factory(task):
+        crawlers.append(ChapterDownloadCrawler(str(config_file), task.granted_workers, chapters))
+        return crawlers[0]
+
+    task_id = manager.create_task('site.json', '1', max_workers=8)
+    assert manager.start_task(task_id, factory)
+    assert wait_until(lambda: manager.get_task(task_id).status.value == 'completed', timeout=30)
+
+    task = manager.get_task(task_id)
+    crawler = crawlers[0].crawler
+    assert task.granted_workers == 3
+    assert crawler.adaptive_concurrency.max_limit <= 3
+    assert crawler.download_workers <= 3
+    assert 0 < mock_site.peak <= 3
+    assert len(crawlers[0].contents) == 30
+    assert all('第3页' in content for content in crawlers[0].contents.values())
+
+
+# ==================== 定时计划领取 ====================
+
+def test_concurrent_claim_schedule(tmp_path):
+    """多个线程同时领取同一次到期计划，只有一个成功"""
+    db = create_sqlite_database(tmp_path / 'schedules.db')
+    due = datetime.now().replace(microsecond=0) - timedelta(minutes=1)
+    schedule = db.create_schedule('a.json', '1', due, interval_minutes=60)
+
+    barrier = threading.Barrier(8)
+    results = []
+
+    def claim():
+        barrier.wait()
+        results.append(db.claim_schedule(schedule['id'], due, due + timedelta(hours=1)))
+
+    threads = [threading.Thread(target=claim) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results.count(True) == 1
+    assert db.get_schedule_by_id(schedule['id'])['next_run_time'] == (due + timedelta(hours=1)).isoformat()
+
+
+class FakeTaskManager:
+    """只记录创建的任务"""
+
+    def __init__(self, db):
+        self.db = db
+        self.lock = threading.Lock()
+        self.created = []
+
+    def find_active_task(self, config_filename, book_id):
+        return None
+
+    def create_task(self, config_filename, book_id, **kwargs):
+        with self.lock:
+            self.created.append(book_id)
+            return f'task-{len(self.created)}'
+
+    def get_task(self, task_id):
+        return type('Task', (), {'add_log': lambda self, level, message: None})()
+
+    def start_task(self, task_id, crawler_factory, priority=PRIORITY_INTERACTIVE):
+        return True
+
+
+def test_concurrent_schedulers_launch_once(tmp_path):
+    """多个调度器同时检查到期计划，每个计划只启动一次"""
+    db = create_sqlite_database(tmp_path / 'schedulers.db')
+    due = datetime.now().replace(microsecond=0) - timedelta(minutes=1)
+    for book_id in ('1', '2', '3'):
+        db.create_schedule('a.json', book_id, due, interval_minutes=60, jitter_seconds=0)
+
+    manager = FakeTaskManager(db)
+    schedulers = [TaskScheduler(manager, lambda config_filename: (lambda task: None)) for _ in range(4)]
+    now = datetime.now()
+    barrier = threading.Barrier(len(schedulers))
+
+    def run(scheduler):
+        barrier.wait()
+        scheduler.run_due(now)
+
+    threads = [threading.Thread(target=run, args=(scheduler,)) for scheduler in schedulers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(manager.created) == ['1', '2', '3']
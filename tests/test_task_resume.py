@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+任务检查点和服务重启恢复测试
+- 检查点保存、章节状态更新和读取（TaskCheckpoint / 爬虫从检查点恢复章节列表）
+- 启动时只恢复运行中、暂停和已加入任务队列的任务，创建后未启动的任务保持不变
+- 中断的任务只被认领一次；其他服务实例心跳未超时的任务不被认领，心跳超时后可再次认领
+运行: python -m pytest -q tests/test_task_resume.py
+"""
+import json
+import sys
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.chapter_record import DONE, FAILED, PENDING
+from backend.generic_crawler import GenericNovelCrawler
+from backend.task_checkpoint import TaskCheckpoint
+from backend.task_queue import TaskQueue
+from shared.models.models import CrawlerTask as CrawlerTaskModel
+from tests.benchmarks.fixtures import NOVEL_INFO_CONFIG, CHAPTER_LIST_CONFIG, CHAPTER_CONTENT_CONFIG
+from tests.sqlite_database import create_sqlite_database, create_task_manager
+
+CHAPTERS = [{'url': f'https://example.com/book/1/{i}.html', 'title': f'第{i}章'} for i in range(1, 6)]
+
+
+# ==================== 检查点 ====================
+
+def test_checkpoint_round_trip():
+    """保存检查点和章节状态后，新的检查点对象读取到相同内容"""
+    db = create_sqlite_database()
+    checkpoint = TaskCheckpoint(db, 'task-1', save_interval=0)
+    checkpoint.save(CHAPTERS, novel_id=7, incremental=True, novel_info={'title': '书名', 'author': '作者'},
+                    chapter_offset=100, catalog_fingerprint='fp')
+    checkpoint.mark([0, 1, 3], DONE)
+    checkpoint.mark([2], FAILED)
+
+    restored = TaskCheckpoint(db, 'task-1')
+    data = restored.load()
+    assert [chapter['url'] for chapter in data['chapters']] == [chapter['url'] for chapter in CHAPTERS]
+    assert data['novel_id'] == 7 and data['incremental'] is True
+    assert data['novel_info'] == {'title': '书名', 'author': '作者'}
+    assert data['chapter_offset'] == 100 and data['catalog_fingerprint'] == 'fp'
+    assert data['chapter_states'] == DONE + DONE + FAILED + DONE + PENDING
+    assert restored.done_indices() == {0, 1, 3}
+
+
+def test_checkpoint_states_flushed_by_interval():
+    """章节状态按 save_interval 合并写入，flush() 立即写入"""
+    db = create_sqlite_database()
+    checkpoint = TaskCheckpoint(db, 'task-1', save_interval=60)
+    checkpoint.save(CHAPTERS, novel_id=1, incremental=False, novel_info={}, chapter_offset=0,
+                    catalog_fingerprint=None)
+    checkpoint.mark([0, 1], DONE)
+    assert db.get_task_checkpoint('task-1')['chapter_states'] == PENDING * 5
+
+    checkpoint.flush()
+    assert db.get_task_checkpoint('task-1')['chapter_states'] == DONE * 2 + PENDING * 3
+
+
+def test_missing_checkpoint():
+    db = create_sqlite_database()
+    assert TaskCheckpoint(db, 'missing').load() is None
+
+
+def test_crawler_restores_checkpoint():
+    """爬虫从检查点恢复章节列表、小说信息和已保存的章节"""
+    db = create_sqlite_database()
+    saved = TaskCheckpoint(db, 'task-1', save_interval=0)
+    saved.save(CHAPTERS, novel_id=3, incremental=True, novel_info={'title': '书名'}, chapter_offset=20,
+               catalog_fingerprint='fp')
+    saved.mark([0, 2], DONE)
+
+    config = {
+        'site_info': {'name': 'test', 'base_url': 'https://example.com'},
+        'url_templates': {'book_detail': '/book/{book_id}'},
+        'parsers': {'novel_info': NOVEL_INFO_CONFIG, 'chapter_list': CHAPTER_LIST_CONFIG,
+                    'chapter_content': CHAPTER_CONTENT_CONFIG},
+        'crawler_config': {'delay': 0}
+    }
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False, encoding='utf-8') as f:
+        json.dump(config, f)
+    try:
+        crawler = GenericNovelCrawler(f.name, '1')
+    finally:
+        Path(f.name).unlink()
+    crawler.checkpoint = TaskCheckpoint(db, 'task-1')
+
+    assert crawler._restore_checkpoint()
+    assert [chapter.url for chapter in crawler.chapters] == [chapter['url'] for chapter in CHAPTERS]
+    assert [chapter.status for chapter in crawler.chapters] == [DONE, PENDING, DONE, PENDING, PENDING]
+    assert crawler.novel_id == 3 and crawler.incremental is True
+    assert crawler.chapter_offset == 20 and crawler.catalog_fingerprint == 'fp'
+
+
+# ==================== 启动时恢复 ====================
+
+class RecordingCrawler:
+    base_url = 'https://example.com'
+
+    def __init__(self, task, runs):
+        self.task = task
+        self.runs = runs
+
+    def run(self):
+        self.runs.append((self.task.task_id, self.task.incremental))
+        return True
+
+
+def factory_builder(runs):
+    """configs 中存在 a.json，其他配置文件不存在"""
+    def build(config_filename):
+        if config_filename != 'a.json':
+            return None
+        return lambda task: RecordingCrawler(task, runs)
+    return build
+
+
+def test_resume_only_started_tasks(wait_until):
+    """恢复运行中、暂停和已入队的任务；创建后未启动的任务和已结束的任务不恢复"""
+    db = create_sqlite_database()
+    db.create_task('created', 'a.json', '1')
+    db.create_task('queued', 'a.json', '2', incremental=True)
+    db.update_task('queued', stage='queued')
+    db.create_task('running', 'a.json', '3')
+    db.update_task('running', status='running', stage='downloading')
+    db.create_task('paused', 'a.json', '4')
+    db.update_task('paused', status='paused')
+    db.create_task('completed', 'a.json', '5')
+    db.update_task('completed', status='completed')
+
+    runs = []
+    manager = create_task_manager(db)
+    assert manager.resume_interrupted_tasks(factory_builder(runs)) == 3
+    assert wait_until(lambda: len(runs) == 3)
+    assert sorted(runs) == [('paused', False), ('queued', True), ('running', False)]
+
+    created = db.get_task_by_id('created')
+    assert created['status'] == 'pending' and created['stage'] == 'pending'
+    assert 'created' not in manager.tasks
+    assert db.get_task_by_id('completed')['status'] == 'completed'
+
+
+def test_start_task_persists_queued_marker():
+    """任务加入队列时立即写入 stage=queued，服务重启后会被恢复"""
+    db = create_sqlite_database()
+    manager = create_task_manager(db)
+    manager.queue = TaskQueue(max_running=1, worker_budget=10, on_admit=lambda task_id, workers: None)
+    manager.queue.running['other'] = 5  # 占用唯一的运行槽
+
+    task_id = manager.create_task('a.json', '1')
+    assert db.get_interrupted_tasks() == []
+    assert manager.start_task(task_id, lambda task: None)
+    assert db.get_task_by_id(task_id)['stage'] == 'queued'
+    assert [task['task_id'] for task in db.get_interrupted_tasks()] == [task_id]
+
+
+def test_resume_with_checkpoint(wait_until):
+    """有检查点的任务恢复后保留检查点（由爬虫读取），缺少配置文件的任务记为失败并删除检查点"""
+    db = create_sqlite_database()
+    db.create_task('resumable', 'a.json', '1')
+    db.update_task('resumable', status='running')
+    db.save_task_checkpoint('resumable', CHAPTERS, novel_id=1, chapter_states=DONE * 5)
+    db.create_task('orphan', 'gone.json', '2')
+    db.update_task('orphan', status='running')
+    db.save_task_checkpoint('orphan', CHAPTERS, novel_id=2)
+
+    checkpoints = []
+
+    def build(config_filename):
+        if config_filename != 'a.json':
+            return None
+
+        def create(task):
+            checkpoints.append(db.get_task_checkpoint(task.task_id))
+            return RecordingCrawler(task, [])
+        return create
+
+    manager = create_task_manager(db)
+    assert manager.resume_interrupted_tasks(build) == 1
+    assert wait_until(lambda: manager.get_task('resumable').status.value == 'completed')
+    assert checkpoints[0]['chapter_states'] == DONE * 5
+    assert any('从检查点恢复' in log['message'] for log in manager.get_task('resumable').logs)
+    assert db.get_task_checkpoint('resumable') is None
+
+    orphan = db.get_task_by_id('orphan')
+    assert orphan['status'] == 'failed' and 'gone.json' in orphan['error_message']
+    assert db.get_task_checkpoint('orphan') is None
+
+
+def test_concurrent_resume_claims_once(tmp_path, wait_until):
+    """多个进程同时启动时每个中断的任务只被恢复一次"""
+    db = create_sqlite_database(tmp_path / 'resume.db')
+    for index in range(5):
+        db.create_task(f'task-{index}', 'a.json', str(index))
+        db.update_task(f'task-{index}', status='running')
+
+    runs = []
+    managers = [create_task_manager(db) for _ in range(3)]
+    barrier = threading.Barrier(len(managers))
+    resumed = []
+
+    def resume(manager):
+        barrier.wait()
+        resumed.append(manager.resume_interrupted_tasks(factory_builder(runs)))
+
+    threads = [threading.Thread(target=resume, args=(manager,)) for manager in managers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(resumed) == 5
+    assert wait_until(lambda: len(runs) == 5)
+    assert sorted(task_id for task_id, _ in runs) == [f'task-{index}' for index in range(5)]
+
+
+def test_stale_heartbeat_reclaimed():
+    """认领后未重新入队的任务（认领的实例已退出）在心跳超时后可被其他实例再次认领"""
+    db = create_sqlite_database()
+    db.create_task('task-1', 'a.json', '1')
+    db.update_task('task-1', status='running')
+    assert db.claim_interrupted_task('task-1', 'running', 'host-a:1:a', heartbeat_timeout=60)
+    assert not db.claim_interrupted_task('task-1', 'pending', 'host-b:1:b', heartbeat_timeout=60)
+    assert [task['task_id'] for task in db.get_interrupted_tasks()] == ['task-1']
+
+    with db.get_session() as session:
+        session.query(CrawlerTaskModel).filter(CrawlerTaskModel.task_id == 'task-1').update(
+            {'heartbeat_at': datetime.now() - timedelta(seconds=61)})
+    assert db.claim_interrupted_task('task-1', 'pending', 'host-b:1:b', heartbeat_timeout=60)
+
+
+def test_live_owner_not_claimed():
+    """其他服务实例正在运行的任务（心跳未超时）不被认领，本实例持有的任务定期刷新心跳"""
+    db = create_sqlite_database()
+    db.create_task('live', 'a.json', '1')
+    db.update_task('live', status='running', stage='downloading')
+    db.touch_tasks(['live'], 'other-host:1:abc')
+
+    runs = []
+    manager = create_task_manager(db)
+    assert manager.resume_interrupted_tasks(factory_builder(runs)) == 0
+    live = db.get_task_by_id('live')
+    assert live['status'] == 'running' and live['stage'] == 'downloading'
+    assert 'live' not in manager.tasks
+
+    task_id = manager.create_task('a.json', '2')
+    manager.queue = TaskQueue(max_running=1, worker_budget=10, on_admit=lambda task_id, workers: None)
+    manager.queue.running['other'] = 5  # 任务保持排队
+    assert manager.start_task(task_id, lambda task: None)
+    with db.get_session() as session:
+        session.query(CrawlerTaskModel).filter(CrawlerTaskModel.task_id == task_id).update(
+            {'heartbeat_at': datetime.now() - timedelta(seconds=61)})
+    manager.state_syncer.heartbeat()
+    assert not db.claim_interrupted_task(task_id, 'pending', 'other-host:1:abc', heartbeat_timeout=60)